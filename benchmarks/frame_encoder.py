@@ -0,0 +1,113 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Micro-benchmark of the UART frame encoder.
+#
+# Counts the number of `write()` calls (i.e. write syscalls) that each driver
+# command makes, and compares it to the previous approach of writing each
+# header, the command word, and the payload separately. Also times the host
+# side cost of encoding, and sending a frame.
+#
+# Run from the project directory:
+#   python -m benchmarks.frame_encoder
+################################################################################
+import time
+from nrf24l01_control import nRF24L01
+
+ITERATIONS = 20000
+
+
+class CountingPort:
+    """Stand-in for an open serial port that counts the calls made to it."""
+
+    is_open = True
+    timeout = 1
+
+    def __init__(self):
+        self.writes = 0
+        self.bytes_written = 0
+
+    def write(self, data):
+        self.writes += 1
+        self.bytes_written += len(data)
+        return len(data)
+
+    def read(self, size):
+        return bytes(size)
+
+    def close(self):
+        pass
+
+
+def legacy_writes(payload_length):
+    # The previous implementation wrote the 3 length headers, the command
+    # word, and the payload (if any) with separate calls.
+    return 3 + 1 + (1 if payload_length else 0)
+
+
+# Each benchmarked command: (name, call, payload length)
+COMMANDS = [
+    ('r_register(CONFIG)', lambda d: d.r_register('CONFIG'), 0),
+    ('r_register(TX_ADDR)', lambda d: d.r_register('TX_ADDR'), 0),
+    ('w_register(CONFIG)', lambda d: d.w_register('CONFIG', b'\x0e'), 1),
+    (
+        'w_register(TX_ADDR)',
+        lambda d: d.w_register('TX_ADDR', b'\xe7' * 5),
+        5,
+    ),
+    ('r_rx_payload(32)', lambda d: d.r_rx_payload(32), 0),
+    ('w_tx_payload(32)', lambda d: d.w_tx_payload(bytes(32)), 32),
+    ('flush_tx', lambda d: d.flush_tx(), 0),
+    ('flush_rx', lambda d: d.flush_rx(), 0),
+    ('reuse_tx_pl', lambda d: d.reuse_tx_pl(), 0),
+    ('r_rx_pl_wid', lambda d: d.r_rx_pl_wid(), 0),
+    ('w_ack_payload(32)', lambda d: d.w_ack_payload(bytes(32), 0), 32),
+    ('w_tx_payload_noack(32)', lambda d: d.w_tx_payload_noack(bytes(32)), 32),
+    ('nop', lambda d: d.nop(), 0),
+]
+
+
+def main():
+    nrf24l01 = nRF24L01('bench')
+    port = CountingPort()
+    # Attach the counting port as if a session were open.
+    nrf24l01._serial = port
+    nrf24l01._session = True
+    print(
+        '{0:<24} {1:>8} {2:>8} {3:>10}'.format(
+            'command', 'before', 'after', 'us/call'
+        )
+    )
+    for name, call, payload_length in COMMANDS:
+        port.writes = 0
+        start = time.perf_counter()
+        for _ in range(ITERATIONS):
+            call(nrf24l01)
+        elapsed = time.perf_counter() - start
+        print(
+            '{0:<24} {1:>8} {2:>8} {3:>10.2f}'.format(
+                name,
+                legacy_writes(payload_length),
+                port.writes / ITERATIONS,
+                elapsed / ITERATIONS * 1e6,
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
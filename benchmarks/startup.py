@@ -0,0 +1,126 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Benchmark of the start up time of the CLI.
+#
+# Measures the import time of the CLI with `python -X importtime`, and compares
+# it to importing everything up front (the CLI, every module that the commands
+# import lazily, and the slow standard library, and pyserial imports that the
+# driver defers). Also times building the argument parser for a single command,
+# compared to building the parsers of every command.
+#
+# Run from the project directory:
+#   python -m benchmarks.startup
+################################################################################
+import os
+import statistics
+import subprocess
+import sys
+import time
+import nrf24l01_cli
+
+RUNS = 15
+ITERATIONS = 200
+
+# Everything that used to be imported when the CLI started.
+EAGER_IMPORTS = [
+    'nrf24l01_cli',
+    'nrf24l01_autotune',
+    'nrf24l01_bench',
+    'nrf24l01_compress',
+    'nrf24l01_fec',
+    'nrf24l01_hopping',
+    'nrf24l01_manager',
+    'nrf24l01_monitor',
+    'nrf24l01_profile',
+    'nrf24l01_trace',
+    'nrf24l01_transfer',
+    'asyncio',
+    'concurrent.futures',
+    'serial',
+    'tempfile',
+]
+
+
+def import_time(modules):
+    """Return the median total import time (us) of a list of modules."""
+    environment = dict(os.environ)
+    # Time the imports from cached bytecode, as an installed package would.
+    environment.pop('PYTHONDONTWRITEBYTECODE', None)
+    code = 'import ' + ', '.join(modules)
+    totals = []
+    for run in range(RUNS + 1):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            env=environment,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        # Sum the cumulative times of the top level imports (the ones that
+        # aren't indented).
+        total = 0
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            fields = line.split('|')
+            if fields[2].startswith('  ') or not fields[1].strip().isdigit():
+                continue
+            total += int(fields[1])
+        # The first run compiles the bytecode.
+        if run:
+            totals.append(total)
+    return statistics.median(totals)
+
+
+def parser_time(command_name, all_commands):
+    """Return the mean time (us) of building the parser for a command."""
+    argv = [command_name]
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        if all_commands:
+            parser = nrf24l01_cli.argparse.ArgumentParser()
+            nrf24l01_cli.add_global_arguments(parser)
+            subparsers = parser.add_subparsers(dest='command_name')
+            for name, add_arguments in nrf24l01_cli.COMMAND_ARGUMENTS.items():
+                command_parser = subparsers.add_parser(name)
+                if add_arguments is not None:
+                    add_arguments(command_parser)
+            parser.parse_args(argv)
+        else:
+            nrf24l01_cli.get_args(argv)
+    return (time.perf_counter() - start) / ITERATIONS * 1e6
+
+
+def main():
+    eager = import_time(EAGER_IMPORTS)
+    lazy = import_time(['nrf24l01_cli'])
+    print('{0:<28} {1:>12} {2:>12}'.format('', 'eager (us)', 'lazy (us)'))
+    print('{0:<28} {1:>12.0f} {2:>12.0f}'.format('import', eager, lazy))
+    for command_name in ['status', 'config', 'transmit']:
+        print(
+            '{0:<28} {1:>12.0f} {2:>12.0f}'.format(
+                'get_args({0})'.format(command_name),
+                parser_time(command_name, True),
+                parser_time(command_name, False),
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
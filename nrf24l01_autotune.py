@@ -0,0 +1,291 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Documentation:
+# 1. [nRF24L01 Datasheet](<project_directory>/nRF24L01-datasheet.pdf)
+################################################################################
+# Automatic tuning of the auto retransmit delay (ARD), and count (ARC) in
+# SETUP_RETR.
+#
+# Each setting in a grid of ARD, and ARC values is probed by sending a number
+# of packets one at a time, and waiting for each to either be acknowledged
+# (TX_DS), or given up on (MAX_RT). The ARC_CNT of every acknowledged packet
+# is recorded, along with its latency from the write of the payload. The
+# setting with the best score for the chosen objective is then written:
+#   goodput -- The most payload bytes delivered per second.
+#   latency -- The lowest expected time to deliver a packet, i.e. the mean
+#   latency of the delivered packets divided by the fraction delivered (as
+#   though each lost packet was sent again).
+# Ties go to the lower ARC, and then the lower ARD, since they give up on a
+# dead link sooner.
+#
+# The radio must already be powered up in TX mode, with TX_ADDR pointing at a
+# receiver.
+################################################################################
+import collections
+import math
+import time
+from nrf24l01_control import REGISTERS
+
+OBJECTIVES = ('goodput', 'latency')
+# The ARD, and ARC values that are probed by default.
+DEFAULT_ARDS = (0, 1, 3, 5, 7, 15)
+DEFAULT_ARCS = (1, 3, 5, 10, 15)
+# How long to wait for TX_DS, or MAX_RT before giving up on the radio.
+PACKET_TIMEOUT = 1.0
+
+# The result of probing one setting. `arc_cnt` is the number of acknowledged
+# packets for each value of ARC_CNT [0,15], and `latency` the mean time (s)
+# from writing the payload of an acknowledged packet to seeing its TX_DS.
+ProbeResult = collections.namedtuple(
+    'ProbeResult',
+    [
+        'ard',
+        'arc',
+        'packets',
+        'delivered',
+        'max_rt',
+        'arc_cnt',
+        'seconds',
+        'goodput',
+        'latency',
+    ],
+)
+
+
+def ard_us(ard: int) -> int:
+    """Return the auto retransmit delay (us) of an ARD value.
+
+    Documentation:
+        See [1] Section 9.1 (Table 27) for SETUP_RETR.
+    """
+    return 250 * (ard + 1)
+
+
+def expected_latency(result: ProbeResult) -> float:
+    """The mean time to deliver a packet, if lost packets are sent again."""
+    if not result.delivered:
+        return math.inf
+    return result.latency * result.packets / result.delivered
+
+
+def mean_arc_cnt(result: ProbeResult) -> float:
+    """The mean number of retransmits of the acknowledged packets."""
+    if not result.delivered:
+        return 0.0
+    return (
+        sum(count * value for value, count in enumerate(result.arc_cnt))
+        / result.delivered
+    )
+
+
+def _score(result: ProbeResult, objective: str) -> tuple:
+    # A key that sorts the best result first.
+    if objective == 'goodput':
+        primary = -result.goodput
+    else:
+        primary = expected_latency(result)
+    return (primary, result.arc, result.ard)
+
+
+def probe(
+    nrf24l01, ard: int, arc: int, packets: int = 50, width: int = 32
+) -> ProbeResult:
+    """Send a probe workload with a setting of SETUP_RETR, and measure it.
+
+    Keyword arguments:
+        nrf24l01 -- The radio, powered up in TX mode.
+        ard -- The auto retransmit delay. [0,15]
+        arc -- The auto retransmit count. [0,15]
+        packets -- The number of packets to send.
+        width -- The payload width of the packets. [1,32]
+    Documentation:
+        See [1] Section 7.4.2 for auto retransmission, and Section 9.1
+        (Table 27) for SETUP_RETR, and OBSERVE_TX.
+    """
+    if not (0 <= ard <= 15 and 0 <= arc <= 15):
+        raise ValueError("ARD, and ARC must be in the range [0,15].")
+    if packets < 1:
+        raise ValueError("The number of probe packets must be at least 1.")
+    status_fields = REGISTERS['STATUS'].fields
+    tx_ds = status_fields['TX_DS'].mask
+    max_rt = status_fields['MAX_RT'].mask
+    clear = (tx_ds | max_rt).to_bytes(1, 'big')
+    arc_cnt_field = REGISTERS['OBSERVE_TX'].fields['ARC_CNT']
+    nrf24l01.set_fields('SETUP_RETR', ARD=ard, ARC=arc)
+    with nrf24l01.batch() as batch:
+        batch.flush_tx()
+        batch.w_register('STATUS', clear)
+    payload = bytes(width)
+    arc_cnt = [0] * 16
+    delivered = 0
+    max_rt_count = 0
+    latency = 0.0
+    start = time.perf_counter()
+    for _ in range(packets):
+        sent = time.perf_counter()
+        nrf24l01.w_tx_payload(payload)
+        # W_TX_PAYLOAD returns the STATUS from before the write, so poll
+        # with NOPs until the packet completes.
+        status = nrf24l01.nop()
+        while not status & (tx_ds | max_rt):
+            if time.perf_counter() - sent > PACKET_TIMEOUT:
+                raise RuntimeError(
+                    "The radio didn't finish sending a packet. Is it powered "
+                    "up in TX mode?"
+                )
+            status = nrf24l01.nop()
+        completed = time.perf_counter()
+        with nrf24l01.batch() as batch:
+            observe_tx = batch.r_register('OBSERVE_TX')
+            batch.w_register('STATUS', clear)
+            # The payload of a lost packet stays in the TX FIFO.
+            if status & max_rt:
+                batch.flush_tx()
+        if status & tx_ds:
+            delivered += 1
+            arc_cnt[arc_cnt_field.extract(observe_tx.result()[0])] += 1
+            latency += completed - sent
+        else:
+            max_rt_count += 1
+    seconds = time.perf_counter() - start
+    return ProbeResult(
+        ard,
+        arc,
+        packets,
+        delivered,
+        max_rt_count,
+        tuple(arc_cnt),
+        seconds,
+        delivered * width / seconds if seconds else 0.0,
+        latency / delivered if delivered else 0.0,
+    )
+
+
+def autotune(
+    nrf24l01,
+    ards=DEFAULT_ARDS,
+    arcs=DEFAULT_ARCS,
+    objective: str = 'goodput',
+    packets: int = 50,
+    width: int = 32,
+) -> tuple:
+    """Probe every combination of ARD, and ARC, and write the best one.
+
+    Returns the best ProbeResult, and the results of every setting in the
+    order that they were probed. SETUP_RETR is restored if probing fails.
+
+    Keyword arguments:
+        nrf24l01 -- The radio, powered up in TX mode.
+        ards -- The ARD values to probe. [0,15]
+        arcs -- The ARC values to probe. [0,15]
+        objective -- 'goodput', or 'latency'.
+        packets -- The number of packets to send with each setting.
+        width -- The payload width of the packets. [1,32]
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(
+            "The objective must be one of: {0}.".format(', '.join(OBJECTIVES))
+        )
+    setup_retr = nrf24l01.r_register('SETUP_RETR')
+    results = []
+    try:
+        for ard in ards:
+            for arc in arcs:
+                results.append(probe(nrf24l01, ard, arc, packets, width))
+    except BaseException:
+        nrf24l01.w_register('SETUP_RETR', setup_retr)
+        raise
+    best = min(results, key=lambda result: _score(result, objective))
+    nrf24l01.set_fields('SETUP_RETR', ARD=best.ard, ARC=best.arc)
+    return best, results
+
+
+def neighbours(ard: int, arc: int, ards, arcs) -> list:
+    """Return the setting, and its neighbours on the grid of ARD, and ARC."""
+    ards = sorted(set(ards) | {ard})
+    arcs = sorted(set(arcs) | {arc})
+    ard_index = ards.index(ard)
+    arc_index = arcs.index(arc)
+    settings = [(ard, arc)]
+    for index, values in ((ard_index, ards), (arc_index, arcs)):
+        for step in (-1, 1):
+            if 0 <= index + step < len(values):
+                if values is ards:
+                    settings.append((values[index + step], arc))
+                else:
+                    settings.append((ard, values[index + step]))
+    return settings
+
+
+def retune(
+    nrf24l01,
+    current: ProbeResult,
+    ards=DEFAULT_ARDS,
+    arcs=DEFAULT_ARCS,
+    objective: str = 'goodput',
+    packets: int = 50,
+    width: int = 32,
+) -> ProbeResult:
+    """Probe the current setting, and its neighbours, and move to the best.
+
+    A cheaper step of the tuning than a whole grid, to follow a link whose
+    conditions change. Returns the ProbeResult of the setting that was
+    written. SETUP_RETR is restored if probing fails.
+    """
+    setup_retr = nrf24l01.r_register('SETUP_RETR')
+    try:
+        results = [
+            probe(nrf24l01, ard, arc, packets, width)
+            for ard, arc in neighbours(current.ard, current.arc, ards, arcs)
+        ]
+    except BaseException:
+        nrf24l01.w_register('SETUP_RETR', setup_retr)
+        raise
+    best = min(results, key=lambda result: _score(result, objective))
+    nrf24l01.set_fields('SETUP_RETR', ARD=best.ard, ARC=best.arc)
+    return best
+
+
+def format_table(results: list) -> str:
+    heading = '{0:>8} {1:>4} {2:>10} {3:>7} {4:>10} {5:>12} {6:>12}'
+    row = '{0:>8} {1:>4} {2:>10} {3:>7} {4:>10.2f} {5:>12.1f} {6:>12.1f}'
+    lines = [
+        heading.format(
+            'ARD (us)',
+            'ARC',
+            'delivered',
+            'MAX_RT',
+            'ARC_CNT',
+            'goodput B/s',
+            'latency us',
+        )
+    ]
+    for result in results:
+        lines.append(
+            row.format(
+                ard_us(result.ard),
+                result.arc,
+                '{0}/{1}'.format(result.delivered, result.packets),
+                result.max_rt,
+                mean_arc_cnt(result),
+                result.goodput,
+                expected_latency(result) * 1e6,
+            )
+        )
+    return '\n'.join(lines)
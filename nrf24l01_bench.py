@@ -0,0 +1,204 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Benchmarks of the latency, and throughput of each driver command.
+#
+# Every command is timed individually over a number of iterations, against
+# either a real interface board, or the emulator. Run it with the `bench`
+# command of the CLI, or directly:
+#   python nrf24l01_bench.py --emulate --baud 9600 --json
+#
+# NOTE: Commands that have no response (the flushes) are only timed until
+# their frame has been written, since there is nothing to wait for.
+################################################################################
+import argparse
+import collections
+import json
+import math
+import time
+from nrf24l01_control import nRF24L01
+
+
+# The result of benchmarking one command. Latencies are in microseconds.
+BenchResult = collections.namedtuple(
+    'BenchResult',
+    [
+        'name',
+        'iterations',
+        'p50',
+        'p95',
+        'p99',
+        'transactions_per_second',
+        'payload_bytes_per_second',
+    ],
+)
+
+# The payload sizes that W_TX_PAYLOAD is timed with.
+PAYLOAD_SIZES = [1, 2, 4, 8, 16, 32]
+
+
+def benchmarks() -> list:
+    """Return each benchmark as (name, call, payload bytes per call).
+
+    The payload bytes are the data bytes that the command carries to or from
+    the radio, not counting the command word, and the STATUS byte.
+    """
+    benchmarks = [
+        ('r_register(CONFIG)', lambda d: d.r_register('CONFIG'), 1),
+        ('r_register(TX_ADDR)', lambda d: d.r_register('TX_ADDR'), 5),
+        ('w_register(RF_CH)', lambda d: d.w_register('RF_CH', b'\x02'), 1),
+    ]
+    for size in PAYLOAD_SIZES:
+        payload = bytes(size)
+        benchmarks.append(
+            (
+                'w_tx_payload({0})'.format(size),
+                lambda d, payload=payload: d.w_tx_payload(payload),
+                size,
+            )
+        )
+    benchmarks += [
+        ('r_rx_payload(32)', lambda d: d.r_rx_payload(32), 32),
+        ('flush_tx', lambda d: d.flush_tx(), 0),
+        ('flush_rx', lambda d: d.flush_rx(), 0),
+        ('nop', lambda d: d.nop(), 0),
+    ]
+    return benchmarks
+
+
+def percentile(sorted_values: list, fraction: float):
+    """Return the nearest-rank percentile of an already sorted list."""
+    rank = math.ceil(fraction * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def run_benchmarks(nrf24l01: nRF24L01, iterations: int = 200) -> list:
+    """Time every benchmarked command, and return a BenchResult for each.
+
+    The radio is powered down for the duration, so that nothing written to
+    the TX FIFO is transmitted, and the register cache is bypassed so that
+    every register access goes to the device. CONFIG, and RF_CH are restored
+    afterwards.
+    """
+    if iterations < 1:
+        raise ValueError("The number of iterations must be at least 1.")
+    cache = nrf24l01.cache
+    nrf24l01.cache = False
+    config = nrf24l01.r_register('CONFIG')
+    rf_ch = nrf24l01.r_register('RF_CH')
+    nrf24l01.set_fields('CONFIG', PWR_UP=0)
+    results = []
+    try:
+        for name, call, payload_length in benchmarks():
+            latencies = []
+            for iteration in range(iterations):
+                # Make room in the TX FIFO outside of the timed call.
+                if name.startswith('w_tx_payload') and iteration % 3 == 0:
+                    nrf24l01.flush_tx()
+                start = time.perf_counter_ns()
+                call(nrf24l01)
+                latencies.append(time.perf_counter_ns() - start)
+            total = sum(latencies) / 1e9
+            latencies.sort()
+            results.append(
+                BenchResult(
+                    name,
+                    iterations,
+                    percentile(latencies, 0.50) / 1e3,
+                    percentile(latencies, 0.95) / 1e3,
+                    percentile(latencies, 0.99) / 1e3,
+                    iterations / total,
+                    iterations * payload_length / total,
+                )
+            )
+    finally:
+        nrf24l01.flush_tx()
+        nrf24l01.w_register('RF_CH', rf_ch)
+        nrf24l01.w_register('CONFIG', config)
+        nrf24l01.cache = cache
+    return results
+
+
+def format_table(results: list) -> str:
+    heading = '{0:<22} {1:>10} {2:>10} {3:>10} {4:>10} {5:>12}'
+    row = '{0:<22} {1:>10.1f} {2:>10.1f} {3:>10.1f} {4:>10.1f} {5:>12.1f}'
+    lines = [
+        heading.format(
+            'command',
+            'p50 (us)',
+            'p95 (us)',
+            'p99 (us)',
+            'txn/s',
+            'payload B/s',
+        )
+    ]
+    for result in results:
+        lines.append(
+            row.format(
+                result.name,
+                result.p50,
+                result.p95,
+                result.p99,
+                result.transactions_per_second,
+                result.payload_bytes_per_second,
+            )
+        )
+    return '\n'.join(lines)
+
+
+def format_json(results: list) -> str:
+    return json.dumps([result._asdict() for result in results], indent=2)
+
+
+def bench(port: str, iterations: int, emulate: bool, baud: int = None):
+    """Benchmark the device on a port, or on a fresh emulator."""
+    if emulate:
+        # Imported here so that the emulator is only loaded when it is used.
+        from nrf24l01_emulator import Emulator
+
+        with Emulator(baud=baud) as emulator:
+            with nRF24L01(emulator.port) as nrf24l01:
+                return run_benchmarks(nrf24l01, iterations)
+    with nRF24L01(port) as nrf24l01:
+        return run_benchmarks(nrf24l01, iterations)
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the nRF24L01 driver commands."
+    )
+    parser.add_argument('--port', '-p', action='store', default='/dev/ttyUSB0')
+    parser.add_argument(
+        '--iterations', '-n', action='store', type=int, default=200
+    )
+    # Benchmark against the emulator instead of a real interface board.
+    parser.add_argument('--emulate', action='store_true')
+    # The baud rate that the emulator simulates, if any.
+    parser.add_argument('--baud', action='store', type=int, default=None)
+    parser.add_argument('--json', action='store_true')
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    results = bench(args.port, args.iterations, args.emulate, args.baud)
+    print(format_json(results) if args.json else format_table(results))
+
+
+if __name__ == '__main__':
+    main()
@@ -20,7 +20,26 @@
 # 1. [nRF24L01 Datasheet](<project_directory>/nRF24L01-datasheet.pdf)
 ################################################################################
 import argparse
-from nrf24l01_control import nRF24L01, REGISTER_MAP
+import glob
+import io
+import os
+import sys
+import time
+from nrf24l01_control import (
+    nRF24L01,
+    REGISTER_MAP,
+    REGISTERS,
+    split_runs,
+    TransactionStats,
+)
+import nrf24l01_daemon
+
+# NOTE: The modules that only some of the commands need (nrf24l01_bench,
+# nrf24l01_manager, and nrf24l01_trace) are imported by those commands, so
+# that they don't slow down the start up of every other command.
+
+# The port of the interface board, unless otherwise specified.
+DEFAULT_PORT = '/dev/ttyUSB0'
 
 # nrf24l01 = nRF24L01('/dev/ttyUSB0')
 
@@ -35,22 +54,35 @@ def byte_length(i):
 
 
 # Define the command line subcommands and arguments
-def get_args():
-    parser = argparse.ArgumentParser(
-        description="Debug and control an nRF24L01 module from the command \
-                line."
-    )
+def add_global_arguments(parser):
+    # The options that come before the command name.
     parser.add_argument('--version', '-v', action='store_true')
-
-    subparsers = parser.add_subparsers(
-        dest='command_name', help="Commands to interract with the nRF24L01."
+    # The port(s) of the interface board(s). This may be given more than once,
+    # and may be a glob pattern (e.g. '/dev/ttyUSB*') to run the command on
+    # several devices at once.
+    parser.add_argument(
+        '--port', '-p', dest='port', action='append', metavar='PORT'
+    )
+    # Run the command on every interface board that is plugged in.
+    parser.add_argument(
+        '--all-devices', dest='all_devices', action='store_true'
     )
+    # Print statistics of the UART transactions when the command exits.
+    parser.add_argument('--stats', action='store_true')
+    # Record every UART transaction to a binary trace file. With several
+    # devices, each one gets its own file, suffixed with the name of its port.
+    parser.add_argument('--trace', action='store', metavar='FILE')
+    # The socket of the daemon (See the `daemon` command). Defaults to one
+    # named after the port.
+    parser.add_argument('--socket', action='store', metavar='PATH')
+    # Don't forward the command to a daemon, even if one is running.
+    parser.add_argument('--no-daemon', dest='no_daemon', action='store_true')
 
-    ############################################################################
-    # The `status` command:
-    # The status command fetches the contents of the STATUS, and FIFO_STATUS
-    # registers, and prints them.
-    status_parser = subparsers.add_parser('status')
+
+# The `status` command:
+# The status command fetches the contents of the STATUS, and FIFO_STATUS
+# registers, and prints them.
+def add_status_arguments(status_parser):
     # Allows the user to switch between the default output of the total value
     # of the status registers, and the broken down bit mnemonic values
     status_parser.add_argument('--verbose', '-v', action='store_true')
@@ -67,18 +99,20 @@ def get_args():
     # status_parser_number_format.add_argument(
     # '--decimal', '-d', action='store_true'
     # )
-    ############################################################################
-    # The `reset` command:
-    # The reset command resets all registers to their default value.
-    # TODO Perhaps add a reset --mode option to reset only the tx or rx state
-    # to power down or standby or something.
-    reset_parser = subparsers.add_parser('reset')
+
+
+# The `reset` command:
+# The reset command resets all registers to their default value.
+# TODO Perhaps add a reset --mode option to reset only the tx or rx state
+# to power down or standby or something.
+def add_reset_arguments(reset_parser):
     # Print the operational output of the reset command.
     reset_parser.add_argument('--verbose', '-v', action='store_true')
-    ############################################################################
-    # The `config` command:
-    # The config command provides a means to cofigure
-    config_parser = subparsers.add_parser('config')
+
+
+# The `config` command:
+# The config command provides a means to cofigure
+def add_config_arguments(config_parser):
     config_parser.add_argument(
         '--rx-dr-irq',
         dest='rx_dr_irq',
@@ -115,12 +149,13 @@ def get_args():
         default=None,
         choices=['1', '2', 'disable'],
     )
-    # NOTE: Perhaps combine ard and arc into one auto-retransmit option;
-    # although, I am unsure the proper way to get the data. For Now I am going
-    # to hold of on these to as I'm not sure on the best way to set up the
-    # option.
-    config_parser.add_argument('--ard', action='store', type=int)
-    config_parser.add_argument('--arc', action='store')
+    # NOTE: Perhaps combine ard and arc into one auto-retransmit option.
+    config_parser.add_argument(
+        '--ard', action='store', type=int, metavar='[0...15]'
+    )
+    config_parser.add_argument(
+        '--arc', action='store', type=int, metavar='[0...15]'
+    )
     config_parser.add_argument(
         '--rf-ch',
         dest='rf_ch',
@@ -179,6 +214,42 @@ def get_args():
             'max',
         ],
     )
+    config_parser.add_argument(
+        '--en-dpl',
+        dest='en_dpl',
+        action='store',
+        nargs='?',
+        const=True,
+        default=None,
+        choices=['enable', 'disable'],
+    )
+    config_parser.add_argument(
+        '--en-ack-pay',
+        dest='en_ack_pay',
+        action='store',
+        nargs='?',
+        const=True,
+        default=None,
+        choices=['enable', 'disable'],
+    )
+    config_parser.add_argument(
+        '--en-dyn-ack',
+        dest='en_dyn_ack',
+        action='store',
+        nargs='?',
+        const=True,
+        default=None,
+        choices=['enable', 'disable'],
+    )
+    config_parser.add_argument(
+        '--dynpd',
+        dest='dynpd',
+        action='store',
+        nargs='?',
+        const=True,
+        default=None,
+        choices=['enable', 'disable'],
+    )
     config_parser.add_argument(
         '--rx-addr-p0',
         dest='rx_addr_p0',
@@ -235,9 +306,13 @@ def get_args():
         const=True,
         default=None,
     )
-    ############################################################################
-    # The `dump` command:
-    dump_parser = subparsers.add_parser('dump')
+    # Print the planned register reads, and writes, and the number of
+    # transactions that they will cost, without touching the device.
+    config_parser.add_argument('--dry-run', dest='dry_run', action='store_true')
+
+
+# The `dump` command:
+def add_dump_arguments(dump_parser):
     dump_parser.add_argument(
         '--verbose', '-v', dest='verbose', action='store_true'
     )
@@ -245,9 +320,10 @@ def get_args():
     dump_parser.add_argument('-d', dest='decimal', action='store_true')
     dump_parser.add_argument('-x', dest='hexadecimal', action='store_true')
     dump_parser.add_argument('register', action='store')
-    ############################################################################
-    # The `load` command:
-    load_parser = subparsers.add_parser('load')
+
+
+# The `load` command:
+def add_load_arguments(load_parser):
     load_parser.add_argument(
         '--verbose', '-v', dest='verbose', action='store_true'
     )
@@ -256,18 +332,49 @@ def get_args():
     load_parser.add_argument('-x', dest='hexadecimal', action='store_true')
     load_parser.add_argument('register', action='store')
     load_parser.add_argument('payload', action='store')
-    ############################################################################
-    # The `transmit` command:
-    # TODO add metavar for pipe and width to show their ranges.
-    # TODO make the payload format options all mutually exclusive as it doesn't
-    # make sense for say binary and decimal to be specified at the same time.
-    transmit_parser = subparsers.add_parser('transmit')
+
+
+# Frequency hopping, for `transmit`, and `receive`. Both ends hop through the
+# channels in the order given by the seed, spending --hop-interval seconds on
+# each, and timed by the wall clock, so their clocks must agree.
+def add_hopping_arguments(parser):
+    parser.add_argument(
+        '--hop', action='store', type=int, default=None, metavar='SEED'
+    )
+    parser.add_argument(
+        '--hop-interval',
+        dest='hop_interval',
+        action='store',
+        type=float,
+        default=0.1,
+        metavar='SECONDS',
+    )
+    parser.add_argument(
+        '--hop-channels',
+        dest='hop_channels',
+        action='store',
+        type=int,
+        nargs=2,
+        default=[0, 83],
+        metavar=('FIRST', 'LAST'),
+    )
+
+
+# The `transmit` command:
+# TODO add metavar for pipe and width to show their ranges.
+# TODO make the payload format options all mutually exclusive as it doesn't
+# make sense for say binary and decimal to be specified at the same time.
+def add_transmit_arguments(transmit_parser):
     transmit_parser.add_argument('--hexadecimal', '-x', action='store_true')
     transmit_parser.add_argument('--binary', '-b', action='store_true')
     transmit_parser.add_argument('--decimal', '-d', action='store_true')
     transmit_parser.add_argument('--string', '-s', action='store_true')
     transmit_parser.add_argument(
-        'payload', action='store'  # lambda x: int(x, 0),
+        'payload', action='store', nargs='?'  # lambda x: int(x, 0),
+    )
+    # Stream the payload from a file instead (`-` for stdin).
+    transmit_parser.add_argument(
+        '--file', '-f', dest='file', action='store', default=None
     )
     transmit_parser.add_argument(
         '--pipe', action='store', type=int, default=None
@@ -275,9 +382,77 @@ def get_args():
     transmit_parser.add_argument(
         '--width', action='store', type=int, default=None
     )
-    ############################################################################
-    # The `receive` command:
-    receive_parser = subparsers.add_parser('receive')
+    # Burst mode: send each packet once with W_TX_PAYLOAD_NOACK, instead of
+    # waiting for it to be acknowledged.
+    transmit_parser.add_argument('--noack', action='store_true')
+    # Forward error correction: follow every group of this many packets with
+    # a parity packet, from which the receiver can rebuild a lost packet.
+    transmit_parser.add_argument(
+        '--fec', action='store', type=int, default=None, metavar='GROUP_SIZE'
+    )
+    # Compress the data as one stream before it is split into packets.
+    transmit_parser.add_argument(
+        '--compress', action='store', choices=['zlib', 'lzma'], default=None
+    )
+    transmit_parser.add_argument(
+        '--level', action='store', type=int, default=None, metavar='[0...9]'
+    )
+    # A preset dictionary (zlib only) of content that is typical of the data,
+    # for short messages. The receiver needs the same file.
+    transmit_parser.add_argument(
+        '--dictionary', action='store', default=None, metavar='FILE'
+    )
+    add_hopping_arguments(transmit_parser)
+    # Sit out a channel while the fraction of its packets that reach MAX_RT
+    # is over this, when hopping.
+    transmit_parser.add_argument(
+        '--blacklist-loss',
+        dest='blacklist_loss',
+        action='store',
+        type=float,
+        default=0.5,
+        metavar='FRACTION',
+    )
+    # Full duplex: collect the ACK payloads that the receiver sends back with
+    # its acknowledgements, and write them to a file (`-` for stdout).
+    transmit_parser.add_argument(
+        '--ack-output',
+        dest='ack_output',
+        action='store',
+        default=None,
+        metavar='FILE',
+    )
+    # The largest ACK payload that the receiver sends back (its --ack-width),
+    # which sets the shortest ARD that gives it time to arrive.
+    transmit_parser.add_argument(
+        '--ack-width',
+        dest='ack_width',
+        action='store',
+        type=int,
+        default=15,
+    )
+    # Sample the link quality statistics while transmitting, and print a
+    # summary of the last --monitor-window samples every --monitor seconds,
+    # as one line of key=value pairs.
+    transmit_parser.add_argument(
+        '--monitor',
+        dest='report_every',
+        action='store',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+    )
+    transmit_parser.add_argument(
+        '--monitor-window',
+        dest='monitor_window',
+        action='store',
+        type=int,
+        default=100,
+    )
+
+
+# The `receive` command:
+def add_receive_arguments(receive_parser):
     # Enable the receiver to receive in the background, to receive the
     # specified number of bytes.
     # TODO: Change these two options to be mutually exclusive. They don't make
@@ -302,8 +477,275 @@ def get_args():
         action='store',
         type=int,
     )
-    ############################################################################
-    return parser.parse_args()
+    # The range of the time between polls of the RX FIFO. Polling backs off
+    # towards the maximum while no packets are arriving.
+    receive_parser.add_argument(
+        '--min-interval',
+        dest='min_interval',
+        action='store',
+        type=float,
+        default=0.001,
+        metavar='SECONDS',
+    )
+    receive_parser.add_argument(
+        '--max-interval',
+        dest='max_interval',
+        action='store',
+        type=float,
+        default=0.05,
+        metavar='SECONDS',
+    )
+    # Decode the forward error correction of `transmit --fec`. The group size
+    # must match the transmitter.
+    receive_parser.add_argument(
+        '--fec', action='store', type=int, default=None, metavar='GROUP_SIZE'
+    )
+    # Decompress the data of `transmit --compress`, and write it to stdout as
+    # it arrives. Receiving stops at the end of the compressed stream.
+    receive_parser.add_argument(
+        '--compress', action='store', choices=['zlib', 'lzma'], default=None
+    )
+    receive_parser.add_argument(
+        '--dictionary', action='store', default=None, metavar='FILE'
+    )
+    add_hopping_arguments(receive_parser)
+    # Full duplex: send a file (`-` for stdin) back to the transmitter in the
+    # ACK payloads of the packets received on --pipe (pipe 0 by default), in
+    # chunks of --ack-width bytes. ACK payloads of up to 15 bytes fit in the
+    # shortest ARD at 2Mbps. Longer ones need the transmitter's --ack-width
+    # to match, so that it raises ARD.
+    receive_parser.add_argument(
+        '--ack-file',
+        dest='ack_file',
+        action='store',
+        default=None,
+        metavar='FILE',
+    )
+    receive_parser.add_argument(
+        '--ack-width',
+        dest='ack_width',
+        action='store',
+        type=int,
+        default=15,
+    )
+
+
+# The `sweep` command:
+# Survey how busy each RF channel is with the received power detector.
+def add_sweep_arguments(sweep_parser):
+    sweep_parser.add_argument(
+        '--passes', '-n', action='store', type=int, default=10
+    )
+    sweep_parser.add_argument(
+        '--dwell', action='store', type=float, default=0.0, metavar='SECONDS'
+    )
+    sweep_parser.add_argument(
+        '--first', action='store', type=int, default=0, metavar='[0...125]'
+    )
+    sweep_parser.add_argument(
+        '--last', action='store', type=int, default=125, metavar='[0...125]'
+    )
+    # Print the result of every pass instead of the totals.
+    sweep_parser.add_argument('--heatmap', action='store_true')
+
+
+# The `bench` command:
+# Time each driver command. See nrf24l01_bench.
+def add_bench_arguments(bench_parser):
+    bench_parser.add_argument(
+        '--iterations', '-n', action='store', type=int, default=200
+    )
+    # Benchmark against the emulator instead of the interface board.
+    bench_parser.add_argument('--emulate', action='store_true')
+    # The baud rate that the emulator simulates, if any.
+    bench_parser.add_argument('--baud', action='store', type=int, default=None)
+    bench_parser.add_argument('--json', action='store_true')
+
+
+# The `replay` command:
+# Send the transactions that were recorded with --trace to the device.
+def add_replay_arguments(replay_parser):
+    replay_parser.add_argument('trace_file', action='store', metavar='FILE')
+    # Replay as fast as possible, instead of at the original pacing.
+    replay_parser.add_argument('--fast', action='store_true')
+
+
+# The `send-file`, and `recv-file` commands:
+# Transfer a file reliably between two radios. Both ends use pipe 0, so the
+# TX_ADDR of the sender must match the RX_ADDR_P0 of the receiver.
+def add_send_file_arguments(send_file_parser):
+    # The file to send (`-` for stdin).
+    send_file_parser.add_argument('file', action='store', metavar='FILE')
+    # The number of packets in flight. It must match the receiver.
+    send_file_parser.add_argument(
+        '--window', '-w', action='store', type=int, default=32
+    )
+    # Give up if the receiver doesn't acknowledge anything for this long.
+    send_file_parser.add_argument(
+        '--timeout',
+        action='store',
+        type=float,
+        default=10.0,
+        metavar='SECONDS',
+    )
+
+
+def add_recv_file_arguments(recv_file_parser):
+    # The file to write (`-` for stdout).
+    recv_file_parser.add_argument('file', action='store', metavar='FILE')
+    recv_file_parser.add_argument(
+        '--window', '-w', action='store', type=int, default=32
+    )
+
+
+# The `monitor` command:
+# Monitor the link by sending probe packets of --width bytes to the receiver
+# every --interval seconds (see `transmit --monitor` to monitor a stream of
+# data instead).
+def add_monitor_arguments(monitor_parser):
+    monitor_parser.add_argument(
+        '--interval',
+        action='store',
+        type=float,
+        default=0.01,
+        metavar='SECONDS',
+    )
+    monitor_parser.add_argument('--width', action='store', type=int, default=32)
+    monitor_parser.add_argument(
+        '--window',
+        '-w',
+        dest='monitor_window',
+        action='store',
+        type=int,
+        default=100,
+    )
+    monitor_parser.add_argument(
+        '--report-every',
+        dest='report_every',
+        action='store',
+        type=float,
+        default=1.0,
+        metavar='SECONDS',
+    )
+    # Stop after this many summaries, instead of when interrupted.
+    monitor_parser.add_argument(
+        '--count', '-n', action='store', type=int, default=None
+    )
+
+
+# The `autotune-retr` command:
+# Probe a grid of ARD, and ARC values in SETUP_RETR, and write the best one.
+def add_autotune_retr_arguments(autotune_parser):
+    autotune_parser.add_argument(
+        '--ard', action='store', type=int, nargs='+', metavar='[0...15]'
+    )
+    autotune_parser.add_argument(
+        '--arc', action='store', type=int, nargs='+', metavar='[0...15]'
+    )
+    autotune_parser.add_argument(
+        '--objective',
+        action='store',
+        choices=['goodput', 'latency'],
+        default='goodput',
+    )
+    # The number of probe packets sent with each setting, and their width.
+    autotune_parser.add_argument(
+        '--packets', '-n', action='store', type=int, default=50
+    )
+    autotune_parser.add_argument(
+        '--width', action='store', type=int, default=32
+    )
+    # Keep re-tuning every this many seconds, by probing the chosen setting,
+    # and its neighbours on the grid, until interrupted.
+    autotune_parser.add_argument(
+        '--continuous',
+        action='store',
+        type=float,
+        default=None,
+        metavar='SECONDS',
+    )
+
+
+# The `save-profile`, and `apply-profile` commands:
+# Save the writable register file to a file (`-` for stdout/stdin), and
+# restore it, writing only the registers that differ.
+def add_save_profile_arguments(save_profile_parser):
+    save_profile_parser.add_argument('file', action='store', metavar='FILE')
+
+
+def add_apply_profile_arguments(apply_profile_parser):
+    apply_profile_parser.add_argument('file', action='store', metavar='FILE')
+
+
+# Add the arguments of each command to its parser. Only the parser of the
+# command that is being run is built. See `get_args()`.
+COMMAND_ARGUMENTS = {
+    'status': add_status_arguments,
+    'reset': add_reset_arguments,
+    'config': add_config_arguments,
+    'dump': add_dump_arguments,
+    'load': add_load_arguments,
+    'transmit': add_transmit_arguments,
+    'receive': add_receive_arguments,
+    'sweep': add_sweep_arguments,
+    'bench': add_bench_arguments,
+    'replay': add_replay_arguments,
+    'send-file': add_send_file_arguments,
+    'recv-file': add_recv_file_arguments,
+    'monitor': add_monitor_arguments,
+    'autotune-retr': add_autotune_retr_arguments,
+    'save-profile': add_save_profile_arguments,
+    'apply-profile': add_apply_profile_arguments,
+    # The daemon holds the port open, and runs the commands of other
+    # invocations on it. It has no arguments of its own.
+    'daemon': None,
+}
+
+
+def parse_global_arguments(argv):
+    # Parse only the options that come before the command name. The command
+    # name, and everything after it is left in `command`.
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    add_global_arguments(parser)
+    parser.add_argument('command', nargs=argparse.REMAINDER)
+    try:
+        args, _ = parser.parse_known_args(argv)
+    except SystemExit:
+        return None
+    return args
+
+
+def get_args(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+        description="Debug and control an nRF24L01 module from the command \
+                line."
+    )
+    add_global_arguments(parser)
+
+    subparsers = parser.add_subparsers(
+        dest='command_name', help="Commands to interract with the nRF24L01."
+    )
+
+    # Only the parser of the command that is being run is built. If there
+    # isn't a valid command, every command is named (without its arguments),
+    # so that they all show up in the help, and in the error message.
+    global_args = parse_global_arguments(argv)
+    if global_args is not None and global_args.command:
+        command_name = global_args.command[0]
+    else:
+        command_name = None
+    if command_name in COMMAND_ARGUMENTS:
+        command_names = [command_name]
+    else:
+        command_names = COMMAND_ARGUMENTS
+    for name in command_names:
+        command_parser = subparsers.add_parser(name)
+        add_arguments = COMMAND_ARGUMENTS[name]
+        if name == command_name and add_arguments is not None:
+            add_arguments(command_parser)
+    return parser.parse_args(argv)
 
 
 def status(args, nrf24l01):
@@ -311,48 +753,16 @@ def status(args, nrf24l01):
     status = int.from_bytes(nrf24l01.r_register('STATUS'), 'big')
     fifo_status = int.from_bytes(nrf24l01.r_register('FIFO_STATUS'), 'big')
     if args.verbose:
-        print("STATUS:")
-        # Extract the values of each bit mnemonic and print them.
-        for bit_mnemonic in REGISTER_MAP['STATUS']:
-            # NOTE: I don't like that I need this if statement. I need to
-            # alter the memory map to not need this if statement.
-            if (
-                bit_mnemonic != 'ADDRESS'
-                and bit_mnemonic != 'NUMBER_OF_DATA_BYTES'
-                and bit_mnemonic != 'RESET_VALUE'
-            ):
-                bit_mnemonic_value = extract_bit_value(
-                    status,
-                    REGISTER_MAP['STATUS'][bit_mnemonic]['LENGTH'],
-                    REGISTER_MAP['STATUS'][bit_mnemonic]['OFFSET'],
-                )
-                if args.hexadecimal:
-                    bit_mnemonic_value = format(bit_mnemonic_value, 'X')
-                elif args.binary:
-                    bit_mnemonic_value = format(bit_mnemonic_value, 'b')
-                # Default to printing in decimal. NOTE: possbly change this
-                # to default to printing in binary, since it would be of
-                # more use.
-                else:
-                    bit_mnemonic_value = format(bit_mnemonic_value, 'd')
-                print("  {0}: {1}".format(bit_mnemonic, bit_mnemonic_value))
-        print("\n", end='')
-        print("FIFO_STATUS:")
-        for bit_mnemonic in REGISTER_MAP['FIFO_STATUS']:
-            # NOTE: I don't like that I need this if statement. I need to
-            # alter the memory map to not need this if statement.
-            if (
-                bit_mnemonic != 'ADDRESS'
-                and bit_mnemonic != 'NUMBER_OF_DATA_BYTES'
-                and bit_mnemonic != 'RESET_VALUE'
-            ):
-                # TODO: Create a local function for bit excraction instead
-                # of using the function local to the nrf24l01 module.
-                bit_mnemonic_value = extract_bit_value(
-                    status,
-                    REGISTER_MAP['FIFO_STATUS'][bit_mnemonic]['LENGTH'],
-                    REGISTER_MAP['FIFO_STATUS'][bit_mnemonic]['OFFSET'],
-                )
+        for register_name, register_value in [
+            ('STATUS', status),
+            ('FIFO_STATUS', fifo_status),
+        ]:
+            if register_name != 'STATUS':
+                print("\n", end='')
+            print(register_name + ":")
+            # Extract the values of each bit mnemonic and print them.
+            for field in REGISTERS[register_name].fields.values():
+                bit_mnemonic_value = field.extract(register_value)
                 if args.hexadecimal:
                     bit_mnemonic_value = format(bit_mnemonic_value, 'X')
                 elif args.binary:
@@ -362,7 +772,7 @@ def status(args, nrf24l01):
                 # more use.
                 else:
                     bit_mnemonic_value = format(bit_mnemonic_value, 'd')
-                print("  {0}: {1}".format(bit_mnemonic, bit_mnemonic_value))
+                print("  {0}: {1}".format(field.name, bit_mnemonic_value))
     elif not args.verbose:
         if args.hexadecimal:
             status = format(status, 'X')
@@ -379,7 +789,13 @@ def status(args, nrf24l01):
 
 def reset(args, nrf24l01):
     verification_failure = False
-    # NOTE: Should a verification step be performed afterwards?
+    # Every write, and verification read is queued up in a single batch so
+    # that the reset costs a round trip for each of the multi-byte address
+    # registers (see `Batch`), instead of two per register.
+    batch = nrf24l01.batch()
+    # The stored value read back from each register after its reset.
+    stored_values = {}
+    reset_values = {}
     # Reset all registers.
     for register_name in REGISTER_MAP:
         if register_name not in [
@@ -406,462 +822,425 @@ def reset(args, nrf24l01):
                     )
                 )
             # Write the reset value to the register.
-            nrf24l01.w_register(register_name, reset_value)
-            # Perform a verification step to check if the register was
-            # successfully reset.
-            # TODO: Clean up the command line output. It's somewhat messy.
-            if args.verbose:
-                print("Verifying " + register_name + "... ", end='')
-            stored_value = nrf24l01.r_register(register_name)
-            if stored_value == reset_value:
-                if args.verbose:
-                    print("PASSED")
-            elif stored_value != reset_value:
-                if args.verbose:
-                    print("FAILED")
-                verification_failure = True
-        # Flush tx, and rx
-        if args.verbose:
-            print("Flushing TX_DATA...")
-        nrf24l01.flush_tx()
-        if args.verbose:
-            print("Flushing RX_DATA...")
-        nrf24l01.flush_rx()
+            batch.w_register(register_name, reset_value)
+            # Read the register back to verify that it was successfully reset.
+            reset_values[register_name] = reset_value
+            stored_values[register_name] = batch.r_register(register_name)
+    # Flush tx, and rx
+    if args.verbose:
+        print("Flushing TX_DATA...")
+    batch.flush_tx()
+    if args.verbose:
+        print("Flushing RX_DATA...")
+    batch.flush_rx()
+    batch.execute()
+    # Perform a verification step to check if each register was successfully
+    # reset.
+    # TODO: Clean up the command line output. It's somewhat messy.
+    for register_name, reset_value in reset_values.items():
         if args.verbose:
-            print("Done")
-        # Let the user know that there werer errors in the reset regardless of
-        # the specified verbosity.
-        if verification_failure:
-            print("Reset failed due to 1, or more errors.")
+            print("Verifying " + register_name + "... ", end='')
+        stored_value = stored_values[register_name].result()
+        if stored_value == reset_value:
+            if args.verbose:
+                print("PASSED")
+        elif stored_value != reset_value:
+            if args.verbose:
+                print("FAILED")
+            verification_failure = True
+    if args.verbose:
+        print("Done")
+    # Let the user know that there werer errors in the reset regardless of
+    # the specified verbosity.
+    if verification_failure:
+        print("Reset failed due to 1, or more errors.")
 
 
-def config(args, nrf24l01):
-    # TODO: Perhaps look into simplifying some of these options by
-    # condensing them into one itterative operation. Probably store a
-    # dictionary of option names, and itterate over it.
-    # The `--rx-dr-irq` option:
-    if args.rx_dr_irq:  # TODO: Change to the new simplified version.
-        # Retrieve and store the value of the CONFIG register
-        current_register_value = int.from_bytes(
-            nrf24l01.r_register('CONFIG'), 'big'
-        )
-        # Clear CONFIG:MASK_RX_DR to enable it
-        if args.rx_dr_irq == 'enable':
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['CONFIG']['MASK_RX_DR']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # Set CONFIG:MASK_RX_DR to disable it
-        elif args.rx_dr_irq == 'disable':
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['CONFIG']['MASK_RX_DR']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # Possibly change this one.
-        # List the value in CONFIG:MASK_RX_DR
-        elif args.rx_dr_irq is True:
-            bit_value = extract_bit_value(
-                current_register_value,
-                REGISTER_MAP['CONFIG']['MASK_RX_DR']['LENGTH'],
-                REGISTER_MAP['CONFIG']['MASK_RX_DR']['OFFSET'],
-            )
-            print("MASK_RX_DR = {0}".format(bit_value))
-    # The `--tx-ds-irq` option:
-    if args.tx_ds_irq:  # TODO: Change to the new simplified version.
-        # Retrieve and store the value of the CONFIG register
-        current_register_value = int.from_bytes(
-            nrf24l01.r_register('CONFIG'), 'big'
-        )
-        # Clear CONFIG:MASK_TX_DS to enable it
-        if args.tx_ds_irq == 'enable':
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['CONFIG']['MASK_TX_DS']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # Set CONFIG:MASK_TX_DS to disable it
-        elif args.tx_ds_irq == 'disable':
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['CONFIG']['MASK_TX_DS']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # Possibly change this one.
-        # List the value in CONFIG:MASK_TX_DS
-        elif args.tx_ds_irq is True:
-            bit_value = extract_bit_value(
-                current_register_value,
-                REGISTER_MAP['CONFIG']['MASK_TX_DS']['LENGTH'],
-                REGISTER_MAP['CONFIG']['MASK_TX_DS']['OFFSET'],
-            )
-            print("MASK_TX_DS = {0}".format(bit_value))
-    # The `--max-rt-irq` option:
-    if args.max_rt_irq:  # TODO: Change to the new simplified version.
-        # Retrieve and store the value of the CONFIG register
-        current_register_value = int.from_bytes(
-            nrf24l01.r_register('CONFIG'), 'big'
-        )
-        # Clear CONFIG:MASK_MAX_RT to enable it
-        if args.max_rt_irq == 'enable':
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['CONFIG']['MASK_MAX_RT']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # Set CONFIG:MASK_MAX_RT to disable it
-        elif args.max_rt_irq == 'disable':
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['CONFIG']['MASK_MAX_RT']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # Possibly change this one.
-        # List the value in CONFIG:MASK_MAX_RT
-        elif args.max_rt_irq is True:
-            bit_value = extract_bit_value(
-                current_register_value,
-                REGISTER_MAP['CONFIG']['MASK_MAX_RT']['LENGTH'],
-                REGISTER_MAP['CONFIG']['MASK_MAX_RT']['OFFSET'],
-            )
-            print("MASK_MAX_RT = {0}".format(bit_value))
-    # The `--crc` option:
-    if args.crc:
-        # The CRC encoding scheme specified as 1 byte
-        if args.crc == '1':
-            # Ensure that CRC is enabled by setting CONFIG:EN_CRC NOTE:
-            # perhaps put this in its own if statement:
-            # if args.crc == '1' or args.crc == '2'
-            # Store the current value of the CONFIG register
-            current_register_value = int.from_bytes(
-                nrf24l01.r_register('CONFIG'), 'big'
-            )
-            # Set CONFIG:EN_CRC
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['CONFIG']['EN_CRC']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-            # Set the CRC encoding scheme to 1 byte by clearing CONFIG:CRCO.
-            # Store the current value of the CONFIG register
-            current_register_value = int.from_bytes(
-                nrf24l01.r_register('CONFIG'), 'big'
-            )
-            # Clear CONFIG:CRCO
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['CONFIG']['CRCO']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # The CRC encoding scheme specified as 2 bytes
-        elif args.crc == '2':
-            # Ensure that CRC is enabled by setting CONFIG:EN_CRC
-            # Store the current value of the CONFIG register
-            current_register_value = int.from_bytes(
-                nrf24l01.r_register('CONFIG'), 'big'
-            )
-            # Set CONFIG:EN_CRC
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['CONFIG']['EN_CRC']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-            # Set the CRC encoding scheme to 2 bytes by setting CONFIG:CRCO
-            # Store the currente value of the CONFIG register
-            current_register_value = int.from_bytes(
-                nrf24l01.r_register('CONFIG'), 'big'
-            )
-            # Set CONFIG:CRCO
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['CONFIG']['CRCO']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # Disable the CRC by clearing CONFIG:EN_CRC
-        elif args.crc == 'disable':
-            # Retrieve and store the value of the CONFIG register
-            current_register_value = int.from_bytes(
-                nrf24l01.r_register('CONFIG'), 'big'
-            )
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['CONFIG']['EN_CRC']['OFFSET']
-            )
-            nrf24l01.w_register('CONFIG', new_register_value.to_bytes(1, 'big'))
-        # List the configuration of the CRC
-        elif args.crc is True:
-            # Retrieve and store the value of the CONFIG register
-            current_register_value = int.from_bytes(
-                nrf24l01.r_register('CONFIG'), 'big'
-            )
+# Describe the value of a bit mnemonic as enabled, or disabled.
+def describe_enabled(bit_value):
+    if bit_value == 1:
+        return "enabled"
+    return "disabled"
+
+
+def describe_crc(config_value):
+    fields = REGISTERS['CONFIG'].fields
+    if fields['EN_CRC'].extract(config_value) == 1:
+        if fields['CRCO'].extract(config_value) == 0:
+            return "1 byte"
+        return "2 bytes"
+    return "disabled"
+
+
+def describe_rf_dr(rf_setup_value):
+    fields = REGISTERS['RF_SETUP'].fields
+    rf_dr = fields['RF_DR_HIGH'].extract(rf_setup_value) << 1 | fields[
+        'RF_DR_LOW'
+    ].extract(rf_setup_value)
+    return {
+        0b00: "med (1Mbps)",
+        0b01: "high (2Mbps)",
+        0b10: "low (250kbps)",
+    }.get(rf_dr, "unknown")
+
+
+def describe_rf_pwr(rf_setup_value):
+    return [
+        "min power (-18dBm)",
+        "low power (-12dBm)",
+        "med power (-6dBm)",
+        "max power (0dBm)",
+    ][REGISTERS['RF_SETUP'].fields['RF_PWR'].extract(rf_setup_value)]
+
+
+def describe_dynpd(dynpd_value):
+    fields = REGISTERS['DYNPD'].fields
+    pipes = [
+        str(pipe)
+        for pipe in range(6)
+        if fields['DPL_P' + str(pipe)].extract(dynpd_value) == 1
+    ]
+    if pipes:
+        return "enabled on pipes " + ', '.join(pipes)
+    return "disabled"
+
+
+# The `config` options that set bit mnemonics. Each option maps to the register
+# that it changes, the bit mnemonic values that each of its choices sets, and a
+# function that describes its current setting from the value of the register
+# when the option is given without a choice.
+CONFIG_FIELD_OPTIONS = {
+    'rx_dr_irq': (
+        'CONFIG',
+        {'enable': {'MASK_RX_DR': 0}, 'disable': {'MASK_RX_DR': 1}},
+        lambda value: "MASK_RX_DR = {0}".format(
+            REGISTERS['CONFIG'].fields['MASK_RX_DR'].extract(value)
+        ),
+    ),
+    'tx_ds_irq': (
+        'CONFIG',
+        {'enable': {'MASK_TX_DS': 0}, 'disable': {'MASK_TX_DS': 1}},
+        lambda value: "MASK_TX_DS = {0}".format(
+            REGISTERS['CONFIG'].fields['MASK_TX_DS'].extract(value)
+        ),
+    ),
+    'max_rt_irq': (
+        'CONFIG',
+        {'enable': {'MASK_MAX_RT': 0}, 'disable': {'MASK_MAX_RT': 1}},
+        lambda value: "MASK_MAX_RT = {0}".format(
+            REGISTERS['CONFIG'].fields['MASK_MAX_RT'].extract(value)
+        ),
+    ),
+    'crc': (
+        'CONFIG',
+        {
+            '1': {'EN_CRC': 1, 'CRCO': 0},
+            '2': {'EN_CRC': 1, 'CRCO': 1},
+            'disable': {'EN_CRC': 0},
+        },
+        describe_crc,
+    ),
+    'cont_wave': (
+        'RF_SETUP',
+        {'enable': {'CONT_WAVE': 1}, 'disable': {'CONT_WAVE': 0}},
+        lambda value: describe_enabled(
+            REGISTERS['RF_SETUP'].fields['CONT_WAVE'].extract(value)
+        ),
+    ),
+    'rf_dr': (
+        'RF_SETUP',
+        {
+            'low': {'RF_DR_LOW': 0, 'RF_DR_HIGH': 1},
+            'med': {'RF_DR_LOW': 0, 'RF_DR_HIGH': 0},
+            'high': {'RF_DR_LOW': 1, 'RF_DR_HIGH': 0},
+        },
+        describe_rf_dr,
+    ),
+    'pll_lock': (
+        'RF_SETUP',
+        {'enable': {'PLL_LOCK': 1}, 'disable': {'PLL_LOCK': 0}},
+        lambda value: describe_enabled(
+            REGISTERS['RF_SETUP'].fields['PLL_LOCK'].extract(value)
+        ),
+    ),
+    'rf_pwr': (
+        'RF_SETUP',
+        {
+            'min': {'RF_PWR': 0b00},
+            'low': {'RF_PWR': 0b01},
+            'med': {'RF_PWR': 0b10},
+            'max': {'RF_PWR': 0b11},
+        },
+        describe_rf_pwr,
+    ),
+    'en_dpl': (
+        'FEATURE',
+        {'enable': {'EN_DPL': 1}, 'disable': {'EN_DPL': 0}},
+        lambda value: describe_enabled(
+            REGISTERS['FEATURE'].fields['EN_DPL'].extract(value)
+        ),
+    ),
+    'en_ack_pay': (
+        'FEATURE',
+        {'enable': {'EN_ACK_PAY': 1}, 'disable': {'EN_ACK_PAY': 0}},
+        lambda value: describe_enabled(
+            REGISTERS['FEATURE'].fields['EN_ACK_PAY'].extract(value)
+        ),
+    ),
+    'en_dyn_ack': (
+        'FEATURE',
+        {'enable': {'EN_DYN_ACK': 1}, 'disable': {'EN_DYN_ACK': 0}},
+        lambda value: describe_enabled(
+            REGISTERS['FEATURE'].fields['EN_DYN_ACK'].extract(value)
+        ),
+    ),
+    # Dynamic payload length on every pipe.
+    'dynpd': (
+        'DYNPD',
+        {
+            'enable': {'DPL_P' + str(pipe): 1 for pipe in range(6)},
+            'disable': {'DPL_P' + str(pipe): 0 for pipe in range(6)},
+        },
+        describe_dynpd,
+    ),
+}
+# The `config` options that take an integer value for a single bit mnemonic.
+CONFIG_VALUE_OPTIONS = {
+    'ard': ('SETUP_RETR', 'ARD'),
+    'arc': ('SETUP_RETR', 'ARC'),
+    'rf_ch': ('RF_CH', 'RF_CH'),
+}
+# The `config` options that take a hexadecimal address for a whole register.
+CONFIG_ADDRESS_OPTIONS = {
+    'rx_addr_p0': 'RX_ADDR_P0',
+    'rx_addr_p1': 'RX_ADDR_P1',
+    'rx_addr_p2': 'RX_ADDR_P2',
+    'rx_addr_p3': 'RX_ADDR_P3',
+    'rx_addr_p4': 'RX_ADDR_P4',
+    'rx_addr_p5': 'RX_ADDR_P5',
+    'tx_addr': 'TX_ADDR',
+}
+# The order in which the `config` options are applied, and reported.
+CONFIG_OPTIONS = [
+    'rx_dr_irq',
+    'tx_ds_irq',
+    'max_rt_irq',
+    'crc',
+    'ard',
+    'arc',
+    'rf_ch',
+    'cont_wave',
+    'rf_dr',
+    'pll_lock',
+    'rf_pwr',
+    'en_dpl',
+    'en_ack_pay',
+    'en_dyn_ack',
+    'dynpd',
+    'rx_addr_p0',
+    'rx_addr_p1',
+    'rx_addr_p2',
+    'rx_addr_p3',
+    'rx_addr_p4',
+    'rx_addr_p5',
+    'tx_addr',
+]
+
+
+class ConfigPlan:
+    """The changes, and queries that a `config` command makes per register.
+
+    All of the options that touch the same register are merged, so that each
+    affected register is read at most once, and written at most once, no
+    matter how many options are given.
+    """
+
+    def __init__(self):
+        # The bit mnemonic values to set in each register.
+        self.fields = {}
+        # The whole new contents of each register that is overwritten.
+        self.contents = {}
+        # Each requested query: (register_name, describe), in order.
+        self.queries = []
+
+    def set_fields(self, register_name, field_values):
+        register = REGISTERS[register_name]
+        for field_name, field_value in field_values.items():
+            # Validate the value before anything is sent to the device.
+            register.fields[field_name].insert(0, field_value)
+        self.fields.setdefault(register_name, {}).update(field_values)
+
+    def set_contents(self, register_name, contents):
+        self.contents[register_name] = contents
+
+    def query(self, register_name, describe):
+        self.queries.append((register_name, describe))
+
+    def registers_to_read(self):
+        # A register has to be read if it is queried, or if only some of its
+        # bit mnemonics are changed; otherwise, its unchanged bits would be
+        # lost.
+        registers = []
+        for register_name, _ in self.queries:
+            if register_name not in registers:
+                registers.append(register_name)
+        for register_name, field_values in self.fields.items():
+            register = REGISTERS[register_name]
+            changed_mask = 0
+            for field_name in field_values:
+                changed_mask |= register.fields[field_name].mask
+            all_fields_mask = 0
+            for field in register.fields.values():
+                all_fields_mask |= field.mask
             if (
-                extract_bit_value(
-                    current_register_value,
-                    REGISTER_MAP['CONFIG']['EN_CRC']['LENGTH'],
-                    REGISTER_MAP['CONFIG']['EN_CRC']['OFFSET'],
-                )
-                == 1
+                changed_mask != all_fields_mask
+                and register_name not in registers
             ):
-                crco = extract_bit_value(
-                    current_register_value,
-                    REGISTER_MAP['CONFIG']['CRCO']['LENGTH'],
-                    REGISTER_MAP['CONFIG']['CRCO']['OFFSET'],
+                registers.append(register_name)
+        return registers
+
+    def registers_to_write(self):
+        registers = list(self.fields)
+        for register_name in self.contents:
+            if register_name not in registers:
+                registers.append(register_name)
+        return registers
+
+    def transaction_count(self):
+        # The reads, and writes are each sent as a batch. Every write, and
+        # read of a single byte register can be pipelined, but each read of a
+        # multi-byte register ends a round trip (see `Batch`).
+        registers_to_read = self.registers_to_read()
+        writes = len(self.registers_to_write())
+        round_trips = len(
+            split_runs(
+                [
+                    1 + REGISTERS[register_name].number_of_data_bytes
+                    for register_name in registers_to_read
+                ]
+            )
+        ) + (1 if writes else 0)
+        return len(registers_to_read), writes, round_trips
+
+    def report(self):
+        registers_to_read = self.registers_to_read()
+        for register_name in registers_to_read + [
+            register_name
+            for register_name in self.registers_to_write()
+            if register_name not in registers_to_read
+        ]:
+            steps = []
+            if register_name in registers_to_read:
+                steps.append("read")
+            if register_name in self.fields:
+                steps.append(
+                    "set "
+                    + ' '.join(
+                        "{0}={1}".format(field_name, field_value)
+                        for field_name, field_value in self.fields[
+                            register_name
+                        ].items()
+                    )
                 )
-                if crco == 0:
-                    print("1 byte")
-                elif crco == 1:
-                    print("2 bytes")
-            else:
-                print("disabled")
-    if args.rf_ch != None:
-        # If a value was given, use it to set the channel
-        if type(args.rf_ch) == int:
-            if 0 <= args.rf_ch <= 127:
-                nrf24l01.w_register('RF_CH', args.rf_ch.to_bytes(1, 'big'))
-            else:
-                # NOTE: Not sure if its best to raise the error or just
-                # print a standard message. probably best to raise the error
-                # for successful command completion purposes.
-                raise ValueError(
-                    "Specified channel must be in the range: [0,127]"
+            if register_name in self.contents:
+                steps.append(
+                    "set {0}".format(self.contents[register_name].hex().upper())
                 )
-        # If a value was not given, print the current channel
-        elif args.rf_ch is True:
-            print(int.from_bytes(nrf24l01.r_register('RF_CH'), 'big'))
-    if args.cont_wave:
-        current_register_value = int.from_bytes(
-            nrf24l01.r_register('RF_SETUP'), 'big'
-        )
-        # Print the value of RF_SETUP:CONT_WAVE
-        if args.cont_wave is True:
-            # Get the current value of RF_SETUP:CONT_WAVE
-            cont_wave_value = extract_bit_value(
-                current_register_value,
-                REGISTER_MAP['RF_SETUP']['CONT_WAVE']['LENGTH'],
-                REGISTER_MAP['RF_SETUP']['CONT_WAVE']['OFFSET'],
-            )
-            if cont_wave_value == 1:
-                print("enabled")
-            elif cont_wave_value == 0:
-                print("disabled")
-        # Enable continuous carrier transmit by setting RF_SETUP:CONT_WAVE
-        elif args.cont_wave == 'enable':
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['RF_SETUP']['CONT_WAVE']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-        # Disable continuous carrier transmit by clearing RF_SETUP:CONT_WAVE
-        elif args.cont_wave == 'disable':
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['RF_SETUP']['CONT_WAVE']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-    if args.rf_dr:
-        current_register_value = int.from_bytes(
-            nrf24l01.r_register('RF_SETUP'), 'big'
-        )
-        # Print the RF data rate
-        if args.rf_dr is True:
-            rf_dr = extract_bit_value(
-                current_register_value,
-                REGISTER_MAP['RF_SETUP']['RF_DR_HIGH']['LENGTH'],
-                REGISTER_MAP['RF_SETUP']['RF_DR_HIGH']['OFFSET'],
-            ) << 1 | extract_bit_value(
-                current_register_value,
-                REGISTER_MAP['RF_SETUP']['RF_DR_LOW']['LENGTH'],
-                REGISTER_MAP['RF_SETUP']['RF_DR_LOW']['OFFSET'],
-            )
-            if rf_dr == 0b00:
-                print("med (1Mbps)")
-            elif rf_dr == 0b01:
-                print("high (2Mbps)")
-            elif rf_dr == 0b10:
-                print("low (250kbps)")
-        # Set the RF data rate to 250kbps
-        elif args.rf_dr == 'low':
-            # Clear RF_SETUP:RF_DR_LOW and Set RF_SETUP:RF_DR_HIGH
-            # Clear RF_SETUP:RF_DR_LOW
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['RF_SETUP']['RF_DR_LOW']['OFFSET']
-            )
-            # Set RF_SETUP:RF_DR_HIGH
-            new_register_value |= (
-                1 << REGISTER_MAP['RF_SETUP']['RF_DR_HIGH']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-        # Set the RF data rate to 1Mbps
-        elif args.rf_dr == 'med':
-            # Clear RF_SETUP:RF_DR_LOW and clear RF_SETUP:RF_DR_HIGH
-            # Clear RF_SETUP:RF_DR_LOW
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['RF_SETUP']['RF_DR_LOW']['OFFSET']
-            )
-            # Clear RF_SETUP:RF_DR_HIGH
-            new_register_value &= ~(
-                1 << REGISTER_MAP['RF_SETUP']['RF_DR_HIGH']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-        # Set the RF data rate to 2Mbps
-        elif args.rf_dr == 'high':
-            # Set RF_SETUP:RF_DR_LOW and clear RF_SETUP:RF_DR_HIGH
-            # Set RF_SETUP:RF_DR_LOW
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['RF_SETUP']['RF_DR_LOW']['OFFSET']
+            if register_name in self.registers_to_write():
+                steps.append("write")
+            print("{0}: {1}".format(register_name, ', '.join(steps)))
+        reads, writes, round_trips = self.transaction_count()
+        print(
+            "{0} reads, {1} writes ({2} transactions, {3} round trips)".format(
+                reads, writes, reads + writes, round_trips
             )
-            # Clear RF_SETUP:RF_DR_HIGH
-            new_register_value &= ~(
-                1 << REGISTER_MAP['RF_SETUP']['RF_DR_HIGH']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-    if args.pll_lock:
-        current_register_value = int.from_bytes(
-            nrf24l01.r_register('RF_SETUP'), 'big'
-        )
-        # Print the value of RF_SETUP:PLL_LOCK
-        if args.pll_lock is True:
-            # Get the current value of RF_SETUP:PLL_LOCK
-            pll_lock_value = extract_bit_value(
-                current_register_value,
-                REGISTER_MAP['RF_SETUP']['PLL_LOCK']['LENGTH'],
-                REGISTER_MAP['RF_SETUP']['PLL_LOCK']['OFFSET'],
-            )
-            if pll_lock_value == 1:
-                print("enabled")
-            elif pll_lock_value == 0:
-                print("disabled")
-        # Enable continuous carrier transmit by setting RF_SETUP:PLL_LOCK
-        elif args.pll_lock == 'enable':
-            new_register_value = current_register_value | (
-                1 << REGISTER_MAP['RF_SETUP']['PLL_LOCK']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-        # Disable continuous carrier transmit by clearing RF_SETUP:PLL_LOCK
-        elif args.pll_lock == 'disable':
-            new_register_value = current_register_value & ~(
-                1 << REGISTER_MAP['RF_SETUP']['PLL_LOCK']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-    if args.rf_pwr:
-        # Get, and store the current value of the RF_SETUP register
-        current_register_value = int.from_bytes(
-            nrf24l01.r_register('RF_SETUP'), 'big'
         )
-        if args.rf_pwr is True:
-            rf_pwr = extract_bit_value(
-                current_register_value,
-                REGISTER_MAP['RF_SETUP']['RF_PWR']['LENGTH'],
-                REGISTER_MAP['RF_SETUP']['RF_PWR']['OFFSET'],
-            )
-            if rf_pwr == 0b00:
-                print("min power (-18dBm)")
-            elif rf_pwr == 0b01:
-                print("low power (-12dBm)")
-            elif rf_pwr == 0b10:
-                print("med power (-6dBm)")
-            elif rf_pwr == 0b11:
-                print("max power (0dBm)")
-        elif args.rf_pwr == 'min':
-            new_register_value = current_register_value & (
-                0 << REGISTER_MAP['RF_SETUP']['RF_PWR']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-        elif args.rf_pwr == 'low':
-            new_register_value = current_register_value & (
-                1 << REGISTER_MAP['RF_SETUP']['RF_PWR']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-        elif args.rf_pwr == 'med':
-            new_register_value = current_register_value & (
-                2 << REGISTER_MAP['RF_SETUP']['RF_PWR']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-        elif args.rf_pwr == 'max':
-            new_register_value = current_register_value & (
-                3 << REGISTER_MAP['RF_SETUP']['RF_PWR']['OFFSET']
-            )
-            nrf24l01.w_register(
-                'RF_SETUP', new_register_value.to_bytes(1, 'big')
-            )
-    if args.rx_addr_p0:
-        if args.rx_addr_p0 is True:
-            rx_addr_p0 = int.from_bytes(
-                nrf24l01.r_register('RX_ADDR_P0'), 'big'
-            )
-            print(format(rx_addr_p0, 'X'))
-        else:
-            if len(int(args.rx_addr_p0, 16).to_bytes(5, 'big')) == 5:
-                rx_addr_p0 = int(args.rx_addr_p0, 16)
-                nrf24l01.w_register('RX_ADDR_P0', rx_addr_p0.to_bytes(5, 'big'))
-            else:
-                print("Error: Addreses length must be 5 bytes.")
-    if args.rx_addr_p1:
-        if args.rx_addr_p1 is True:
-            rx_addr_p1 = int.from_bytes(
-                nrf24l01.r_register('RX_ADDR_P1'), 'big'
-            )
-            print(format(rx_addr_p1, 'X'))
-        else:
-            if len(int(args.rx_addr_p1, 16).to_bytes(5, 'big')) == 5:
-                rx_addr_p1 = int(args.rx_addr_p1, 16)
-                nrf24l01.w_register('RX_ADDR_P1', rx_addr_p1.to_bytes(5, 'big'))
-            else:
-                print("Error: Addreses length must be 5 bytes.")
-    if args.rx_addr_p3:
-        if args.rx_addr_p3 is True:
-            rx_addr_p3 = int.from_bytes(
-                nrf24l01.r_register('RX_ADDR_P3'), 'big'
-            )
-            print(format(rx_addr_p3, 'X'))
-        else:
-            if len(int(args.rx_addr_p3, 16).to_bytes(1, 'big')) == 5:
-                rx_addr_p3 = int(args.rx_addr_p3, 16)
-                nrf24l01.w_register('RX_ADDR_P3', rx_addr_p3.to_bytes(1, 'big'))
-            else:
-                print("Error: Addreses length must be 1 byte.")
-    if args.rx_addr_p4:
-        if args.rx_addr_p4 is True:
-            rx_addr_p4 = int.from_bytes(
-                nrf24l01.r_register('RX_ADDR_P4'), 'big'
-            )
-            print(format(rx_addr_p4, 'X'))
-        else:
-            if len(int(args.rx_addr_p4, 16).to_bytes(1, 'big')) == 5:
-                rx_addr_p4 = int(args.rx_addr_p4, 16)
-                nrf24l01.w_register('RX_ADDR_P4', rx_addr_p4.to_bytes(1, 'big'))
-            else:
-                print("Error: Addreses length must be 1 byte.")
-    if args.rx_addr_p5:
-        if args.rx_addr_p5 is True:
-            rx_addr_p5 = int.from_bytes(
-                nrf24l01.r_register('RX_ADDR_P5'), 'big'
+
+    def execute(self, nrf24l01):
+        # Read every register that needs to be read at once.
+        read_futures = {}
+        with nrf24l01.batch() as batch:
+            for register_name in self.registers_to_read():
+                read_futures[register_name] = batch.r_register(register_name)
+        # Work out the new value of every register.
+        register_values = {}
+        for register_name, future in read_futures.items():
+            register_values[register_name] = int.from_bytes(
+                future.result(), 'big'
             )
-            print(format(rx_addr_p5, 'X'))
-        else:
-            if len(int(args.rx_addr_p5, 16).to_bytes(1, 'big')) == 5:
-                rx_addr_p5 = int(args.rx_addr_p5, 16)
-                nrf24l01.w_register('RX_ADDR_P5', rx_addr_p5.to_bytes(1, 'big'))
-            else:
-                print("Error: Addreses length must be 1 byte.")
-    if args.tx_addr:
-        if args.tx_addr is True:
-            tx_addr = int.from_bytes(nrf24l01.r_register('TX_ADDR'), 'big')
-            print(format(tx_addr, 'X'))
-        else:
-            if len(int(args.tx_addr, 16).to_bytes(5, 'big')) == 5:
-                tx_addr = int(args.tx_addr, 16)
-                nrf24l01.w_register('TX_ADDR', tx_addr.to_bytes(5, 'big'))
-            else:
-                print("Error: Addreses length must be 5 bytes.")
+        for register_name, field_values in self.fields.items():
+            register = REGISTERS[register_name]
+            register_value = register_values.get(register_name, 0)
+            for field_name, field_value in field_values.items():
+                register_value = register.fields[field_name].insert(
+                    register_value, field_value
+                )
+            register_values[register_name] = register_value
+        for register_name, contents in self.contents.items():
+            register_values[register_name] = int.from_bytes(contents, 'big')
+        # Write every changed register at once.
+        with nrf24l01.batch() as batch:
+            for register_name in self.registers_to_write():
+                batch.w_register(
+                    register_name,
+                    register_values[register_name].to_bytes(
+                        REGISTERS[register_name].number_of_data_bytes, 'big'
+                    ),
+                )
+        # Describe the queried settings as they are after the changes.
+        for register_name, describe in self.queries:
+            print(describe(register_values[register_name]))
+
+
+def plan_config(args):
+    plan = ConfigPlan()
+    for option in CONFIG_OPTIONS:
+        if option in CONFIG_FIELD_OPTIONS:
+            register_name, choices, describe = CONFIG_FIELD_OPTIONS[option]
+            choice = getattr(args, option)
+            # List the current setting of the option.
+            if choice is True:
+                plan.query(register_name, describe)
+            elif choice:
+                plan.set_fields(register_name, choices[choice])
+        elif option in CONFIG_VALUE_OPTIONS:
+            register_name, field_name = CONFIG_VALUE_OPTIONS[option]
+            value = getattr(args, option)
+            if value is True:
+                plan.query(register_name, lambda value: format(value, 'd'))
+            elif value is not None:
+                plan.set_fields(register_name, {field_name: value})
+        elif option in CONFIG_ADDRESS_OPTIONS:
+            register_name = CONFIG_ADDRESS_OPTIONS[option]
+            number_of_data_bytes = REGISTERS[register_name].number_of_data_bytes
+            address = getattr(args, option)
+            if address is True:
+                plan.query(register_name, lambda value: format(value, 'X'))
+            elif address:
+                address = int(address, 16)
+                if address >= 1 << (8 * number_of_data_bytes):
+                    print(
+                        "Error: Addreses length must be {0} byte{1}.".format(
+                            number_of_data_bytes,
+                            's' if number_of_data_bytes > 1 else '',
+                        )
+                    )
+                else:
+                    plan.set_contents(
+                        register_name,
+                        address.to_bytes(number_of_data_bytes, 'big'),
+                    )
+    return plan
+
+
+def config(args, nrf24l01):
+    # Collect every requested change into a plan first, so that each affected
+    # register is only read, and written once.
+    plan = plan_config(args)
+    if args.dry_run:
+        plan.report()
+    else:
+        plan.execute(nrf24l01)
 
 
 def dump(args, nrf24l01):
@@ -922,32 +1301,140 @@ def load(args, nrf24l01):
         )
 
 
+# The number of bytes to read from a file at a time when streaming it.
+STREAM_CHUNK_SIZE = 4096
+
+
+def iter_packets(stream, width, chunk_size=STREAM_CHUNK_SIZE):
+    """Split a binary stream into packets of `width` bytes.
+
+    The packets are slices of a memoryview over each chunk read from the
+    stream, so that the data is not copied. If the stream ends partway through
+    a packet, the last packet is padded with zeros.
+
+    Keyword arguments:
+        stream -- A binary file object.
+        width -- The number of bytes in each packet. [1,32]
+        chunk_size -- The number of bytes to read from the stream at a time.
+    """
+    # Reading from a pipe (i.e. stdin) with `read1()` returns as soon as any
+    # data is available, instead of blocking until a whole chunk arrives.
+    read = getattr(stream, 'read1', stream.read)
+    remainder = b''
+    while True:
+        chunk = read(chunk_size)
+        if not chunk:
+            break
+        if remainder:
+            chunk = remainder + chunk
+        view = memoryview(chunk)
+        end = len(view) - len(view) % width
+        for offset in range(0, end, width):
+            yield view[offset : offset + width]
+        remainder = bytes(view[end:])
+    if remainder:
+        yield remainder + bytes(width - len(remainder))
+
+
+def ack_payload_ard(rf_setup_value, ack_width):
+    # The shortest ARD that leaves the transmitter time to receive an ACK
+    # payload of ack_width bytes at the data rate of RF_SETUP, or it gives up
+    # on the ACK before it has arrived. See [1] Section 7.4.2.
+    fields = REGISTERS['RF_SETUP'].fields
+    if fields['RF_DR_LOW'].extract(rf_setup_value):
+        # 250kbps
+        delay = 1500
+    elif fields['RF_DR_HIGH'].extract(rf_setup_value):
+        # 2Mbps
+        delay = 500 if ack_width > 15 else 250
+    else:
+        # 1Mbps
+        delay = 500 if ack_width > 5 else 250
+    return delay // 250 - 1
+
+
+def enable_features(nrf24l01, **field_values):
+    # Set bit mnemonics of FEATURE. The nRF24L01 ignores writes to FEATURE
+    # until ACTIVATE has been sent, but ACTIVATE also turns the features back
+    # off if they were already on, so it is only sent if the write didn't
+    # take. A batch reads FEATURE from the device, rather than the cache.
+    nrf24l01.set_fields('FEATURE', **field_values)
+    with nrf24l01.batch() as batch:
+        feature = batch.r_register('FEATURE')
+    fields = REGISTERS['FEATURE'].fields
+    feature = int.from_bytes(feature.result(), 'big')
+    if all(
+        fields[field_name].extract(feature) == field_value
+        for field_name, field_value in field_values.items()
+    ):
+        return
+    nrf24l01.activate()
+    # The cache holds the write that didn't take, so set_fields() would skip
+    # the write.
+    for field_name, field_value in field_values.items():
+        feature = fields[field_name].insert(feature, field_value)
+    nrf24l01.w_register('FEATURE', feature.to_bytes(1, 'big'))
+
+
+def enable_ack_payloads(nrf24l01, pipes, ack_width=None):
+    # ACK payloads need dynamic payload lengths, both on the pipes that the
+    # payloads are sent back to, and on pipe 0 of the transmitter, which
+    # receives them. See [1] Section 7.4.1.
+    enable_features(nrf24l01, EN_DPL=1, EN_ACK_PAY=1)
+    nrf24l01.set_fields('DYNPD', **{'DPL_P' + str(pipe): 1 for pipe in pipes})
+    # On the transmitter, make sure that ARD is long enough for the ACK
+    # payloads of up to ack_width bytes that it will receive.
+    if ack_width is not None:
+        ard = ack_payload_ard(
+            int.from_bytes(nrf24l01.r_register('RF_SETUP'), 'big'), ack_width
+        )
+        setup_retr = int.from_bytes(nrf24l01.r_register('SETUP_RETR'), 'big')
+        if REGISTERS['SETUP_RETR'].fields['ARD'].extract(setup_retr) < ard:
+            nrf24l01.set_fields('SETUP_RETR', ARD=ard)
+
+
+def read_dictionary(path):
+    # Read the preset dictionary for compression, if there is one.
+    if path is None:
+        return None
+    with open(path, 'rb') as dictionary_file:
+        return dictionary_file.read()
+
+
+def create_hopper(args, nrf24l01, transmitter):
+    # Follow the channel sequence of --hop, if it is given.
+    if args.hop is None:
+        return None
+    import nrf24l01_hopping
+
+    first, last = args.hop_channels
+    return nrf24l01_hopping.Hopper(
+        nrf24l01,
+        args.hop,
+        args.hop_interval,
+        range(first, last + 1),
+        transmitter=transmitter,
+        loss_threshold=args.blacklist_loss if transmitter else None,
+    )
+
+
+def print_channel_stats(hopper, file=None):
+    import nrf24l01_hopping
+
+    print(nrf24l01_hopping.format_table(hopper.report()), file=file)
+
+
+def format_rate(payload_bytes, seconds):
+    return "{0:.1f} bytes/s".format(payload_bytes / seconds if seconds else 0)
+
+
 def transmit(args, nrf24l01):
     # 1. set PWR_UP to false to ensure that the module is taken out of any
     # previously set mode:
-    # Get the current value of the CONFIG register
-    config_register_value = int.from_bytes(nrf24l01.r_register('CONFIG'), 'big')
-    # Clear CONFIG:PWR_UP
-    new_config_register_value = config_register_value & ~(
-        (1 << REGISTER_MAP['CONFIG']['PWR_UP']['OFFSET'])
-    )
-    nrf24l01.w_register('CONFIG', new_config_register_value.to_bytes(1, 'big'))
-    # 2. Set PRIM_RX to false to put the module into transmit mode:
-    # Get the current value of the CONFIG register
-    config_register_value = int.from_bytes(nrf24l01.r_register('CONFIG'), 'big')
-    # Clear CONFIG:PRIM_RX
-    new_config_register_value = config_register_value & ~(
-        (1 << REGISTER_MAP['CONFIG']['PRIM_RX']['OFFSET'])
-    )
-    nrf24l01.w_register('CONFIG', new_config_register_value.to_bytes(1, 'big'))
-    # 3. set PWR_UP to true to put the module into its operational mode:
-    # Get the current value of the CONFIG register
-    config_register_value = int.from_bytes(nrf24l01.r_register('CONFIG'), 'big')
-    # Set CONFIG:PWR_UP
-    modified_register_value = config_register_value | (
-        (1 << REGISTER_MAP['CONFIG']['PWR_UP']['OFFSET'])
-    )
-    nrf24l01.w_register('CONFIG', modified_register_value.to_bytes(1, 'big'))
+    nrf24l01.set_fields('CONFIG', PWR_UP=0)
+    # 2. Set PRIM_RX to false to put the module into transmit mode, and 3. set
+    # PWR_UP to true to put the module into its operational mode:
+    nrf24l01.set_fields('CONFIG', PRIM_RX=0, PWR_UP=1)
     # Set the Tx address to the specified pipe address; otherwise, if the
     # pipe address is not specified, default the pipe to pipe 0.
     # NOTE: For the sake of simplicity, I want to keep the address to
@@ -980,8 +1467,12 @@ def transmit(args, nrf24l01):
             )
     else:  # Specify a default payload width of 1
         transmit_payload_width = 1
+    if args.payload is None and args.file is None:
+        raise ValueError("Either a payload, or --file must be specified.")
     # Format the payload as specified by the user
-    if args.hexadecimal:
+    if args.file is not None:
+        pass
+    elif args.hexadecimal:
         transmit_payload = int(args.payload, 16)
         transmit_payload = transmit_payload.to_bytes(
             byte_length(transmit_payload), 'big'
@@ -1000,49 +1491,160 @@ def transmit(args, nrf24l01):
         # TODO: When picking the length to transmit, assume each character
         # in the string is 8 bits (1 byte) and just convert the string to
         # a list and count.
-        transmit_payload = args.payload
+        transmit_payload = args.payload.encode()
     else:
         # NOTE: should probably give a warning that the default is used.
-        transmit_payload = args.payload
-    print(transmit_payload)
-    # This clears the interrupt flags. TODO remove magic numbers.
-    nrf24l01.w_register('STATUS', (0x70).to_bytes(1, 'big'))
-    packet_bytes = []
-    for index, byte in enumerate(transmit_payload):
-        packet_bytes.append(byte.to_bytes(1, 'big'))
-        if len(packet_bytes) == transmit_payload_width:
-            packet = b''.join(packet_bytes)
-            print(packet)
-            nrf24l01.w_tx_payload(packet)
-            packet_bytes = []
-        elif index == len(transmit_payload) - 1 and len(packet_bytes) > 0:
-            while len(packet_bytes) < transmit_payload_width:
-                packet_bytes.append(b'\x00')
-                packet = b''.join(packet_bytes)
-                print("2")
-                print(packet)
-                nrf24l01.w_tx_payload(packet)
-                packet_bytes = []
+        transmit_payload = args.payload.encode()
+    # Write the ACK payloads that come back to the output file as they
+    # arrive.
+    ack_output = None
+    on_ack_payload = None
+    if args.ack_output is not None:
+        if not 1 <= args.ack_width <= 32:
+            raise ValueError(
+                "The specified ACK payload width must be in the range [1,32]"
+            )
+        enable_ack_payloads(nrf24l01, [0], args.ack_width)
+        if args.ack_output == '-':
+            ack_output = sys.stdout.buffer
+        else:
+            ack_output = open(args.ack_output, 'wb')
+        on_ack_payload = ack_output.write
+    # Burst mode: send every packet once, without waiting for an ACK.
+    if args.noack:
+        if ack_output is not None:
+            raise ValueError("--noack, and --ack-output can't be combined.")
+        enable_features(nrf24l01, EN_DYN_ACK=1)
+    # With forward error correction, each packet loses the room for the FEC
+    # header, and a parity packet follows each group.
+    packet_width = transmit_payload_width
+    if args.fec is not None:
+        import nrf24l01_fec
+
+        packet_width -= nrf24l01_fec.FEC_HEADER.size
+        if packet_width < 1:
+            raise ValueError(
+                "The payload width must be at least {0} with --fec.".format(
+                    nrf24l01_fec.FEC_HEADER.size + 1
+                )
+            )
+    # Compress the stream before it is split into packets.
+    reader = None
+    if args.compress is not None:
+        import nrf24l01_compress
+
+        dictionary = read_dictionary(args.dictionary)
+    elif args.level is not None or args.dictionary is not None:
+        raise ValueError("--level, and --dictionary need --compress.")
+
+    hopper = create_hopper(args, nrf24l01, transmitter=True)
+    # The summary goes to stderr when the ACK payloads are written to stdout.
+    summary = sys.stderr if args.ack_output == '-' else sys.stdout
+    # Every hop writes RF_CH, which resets the PLOS_CNT that the monitor
+    # counts the lost packets from.
+    link_monitor = None
+    if args.report_every is not None:
+        if hopper is not None:
+            raise ValueError("--monitor, and --hop can't be combined.")
+        import nrf24l01_monitor
+
+        link_monitor = nrf24l01_monitor.LinkMonitor(
+            nrf24l01, args.monitor_window, args.report_every, summary
+        )
+
+    def send(stream):
+        nonlocal reader
+        if args.compress is not None:
+            stream = reader = nrf24l01_compress.CompressedReader(
+                stream, args.compress, args.level, dictionary
+            )
+        packets = iter_packets(stream, packet_width)
+        if args.fec is not None:
+            packets = nrf24l01_fec.fec_encode(packets, args.fec)
+        if hopper is None:
+            return nrf24l01.transmit_stream(
+                packets,
+                on_ack_payload=on_ack_payload,
+                noack=args.noack,
+                on_poll=link_monitor.poll if link_monitor is not None else None,
+            )
+        try:
+            return nrf24l01.transmit_stream(
+                hopper.track(packets),
+                on_ack_payload=on_ack_payload,
+                noack=args.noack,
+                on_poll=hopper.poll,
+            )
+        finally:
+            hopper.finish()
+
+    # Clear the interrupt flags, and any stale packets out of the RX FIFO, so
+    # that only this stream's ACK payloads are collected.
+    nrf24l01.set_fields('STATUS', RX_DR=1, TX_DS=1, MAX_RT=1)
+    if ack_output is not None:
+        nrf24l01.flush_rx()
+    try:
+        if args.file is not None:
+            if args.file == '-':
+                report = send(sys.stdin.buffer)
+            else:
+                with open(args.file, 'rb') as stream:
+                    report = send(stream)
+        else:
+            report = send(io.BytesIO(transmit_payload))
+    finally:
+        if args.ack_output == '-':
+            ack_output.flush()
+        elif ack_output is not None:
+            ack_output.close()
+    print(
+        "Transmitted {0} packets ({1} bytes) in {2:.3f} s ({3}, {4:.1f} "
+        "packets/s).".format(
+            report.packets,
+            report.payload_bytes,
+            report.seconds,
+            format_rate(report.payload_bytes, report.seconds),
+            report.packets / report.seconds if report.seconds else 0,
+        ),
+        file=summary,
+    )
+    if reader is not None:
+        print(
+            "Compressed {0} bytes to {1} bytes ({2:.2f}:1, {3} of "
+            "uncompressed data).".format(
+                reader.raw_bytes,
+                reader.compressed_bytes,
+                reader.ratio,
+                format_rate(reader.raw_bytes, report.seconds),
+            ),
+            file=summary,
+        )
+    if ack_output is not None:
+        print(
+            "Received {0} ACK payloads ({1} bytes, {2}).".format(
+                report.ack_packets,
+                report.ack_payload_bytes,
+                format_rate(report.ack_payload_bytes, report.seconds),
+            ),
+            file=summary,
+        )
+    if report.max_rt:
+        print(
+            "The maximum number of retransmits was reached {0} times.".format(
+                report.max_rt
+            ),
+            file=summary,
+        )
+    if hopper is not None:
+        print_channel_stats(hopper, file=summary)
 
 
 def receive(args, nrf24l01):
     # 1. set PWR_UP to false to ensure that the module is taken out of any
     # previously set mode:
-    # Get the current value of the CONFIG register
-    config_register_value = int.from_bytes(nrf24l01.r_register('CONFIG'), 'big')
-    # Clear CONFIG:PWR_UP
-    new_config_register_value = config_register_value & ~(
-        (1 << REGISTER_MAP['CONFIG']['PWR_UP']['OFFSET'])
-    )
-    nrf24l01.w_register('CONFIG', new_config_register_value.to_bytes(1, 'big'))
+    nrf24l01.set_fields('CONFIG', PWR_UP=0)
     # 2. Set PRIM_RX to true to put the module into receive mode:
-    # Get the current value of the CONFIG register
-    config_register_value = int.from_bytes(nrf24l01.r_register('CONFIG'), 'big')
-    # Set CONFIG:PRIM_RX
-    new_config_register_value = config_register_value | (
-        (1 << REGISTER_MAP['CONFIG']['PRIM_RX']['OFFSET'])
-    )
-    nrf24l01.w_register('CONFIG', new_config_register_value.to_bytes(1, 'big'))
+    nrf24l01.set_fields('CONFIG', PRIM_RX=1)
     # TODO add  option for auto acknowledgement. (no ack?)
     if args.pipe != None:
         # Enable the specified pipe. args.pipe is equal to the bit position
@@ -1056,71 +1658,638 @@ def receive(args, nrf24l01):
     # bits in EN_RXADDR.
     else:
         nrf24l01.w_register('EN_RXADDR', b'\xFF')
-    # If specified, set the payload width to the specified value.
+    # Set the payload width of the pipes that are listened on.
     if args.width != None:
+        if not 1 <= args.width <= 32:
+            raise ValueError(
+                "The specified payload width must be in the range [1,32]"
+            )
         # If the user specifies a pipe, only set the width of that specific
-        # pipe. NOTE: This is probably superfluous.
-        if args.pipe != None:
-            pass
-        # If the user does not specify a pipe, then set the width to
+        # pipe. If the user does not specify a pipe, then set the width to
         # data pipes accross the device.
+        pipes = [args.pipe] if args.pipe != None else range(6)
+        for pipe in pipes:
+            register_name = 'RX_PW_P' + str(pipe)
+            nrf24l01.set_fields(register_name, **{register_name: args.width})
+    # Queue the contents of the ACK file to go back to the transmitter with
+    # the acknowledgements.
+    ack_stream = None
+    ack_payloads = None
+    if args.ack_file is not None:
+        if not 1 <= args.ack_width <= 32:
+            raise ValueError(
+                "The specified ACK payload width must be in the range [1,32]"
+            )
+        ack_pipe = args.pipe if args.pipe != None else 0
+        enable_ack_payloads(
+            nrf24l01, [args.pipe] if args.pipe != None else range(6)
+        )
+        # Drop any ACK payloads that were left over from before.
+        nrf24l01.flush_tx()
+        if args.ack_file == '-':
+            ack_stream = sys.stdin.buffer
         else:
-            pass
+            ack_stream = open(args.ack_file, 'rb')
+        ack_payloads = {ack_pipe: iter_packets(ack_stream, args.ack_width)}
+    if args.detach and args.hop is not None:
+        raise ValueError("--hop can't be used with --detach.")
+    # 3. set PWR_UP to true to put the module into its operational mode:
+    nrf24l01.set_fields('CONFIG', PWR_UP=1)
     if args.detach:
-        # 3. set PWR_UP to true to put the module into its operational mode:
-        # Get the current value of the CONFIG register
-        config_register_value = int.from_bytes(
-            nrf24l01.r_register('CONFIG'), 'big'
-        )
-        # Set CONFIG:PWR_UP
-        modified_register_value = config_register_value | (
-            (1 << REGISTER_MAP['CONFIG']['PWR_UP']['OFFSET'])
-        )
-        nrf24l01.w_register(
-            'CONFIG', modified_register_value.to_bytes(1, 'big')
-        )
+        # NOTE: Only as many ACK payloads as fit in the TX FIFO can be queued
+        # without a receiver polling the radio.
+        if ack_payloads is not None:
+            nrf24l01.receiver(ack_payloads=ack_payloads).poll()
+            if args.ack_file != '-':
+                ack_stream.close()
     else:
-        # Poll the data received bit, and when set, print it to the display.
-        # either print continuous or only print one packet that was
-        # specified (by length?)
-        # If number-of-packets is specified, then only print out/receive
-        # that many and then break, otherwise receive infinitely. Although,
-        # that may introduce other problems as it would require the user to
-        # send an interrupt signal to the running python program which could
-        # interrupt a data transfer in progress which would then put the
-        # mcu or the uart fifo in an undesireable state that would need to
-        # be fixed with a power cycle. The other way to get around this
-        # would be to fix the code of the microcotroller to implement either
-        # a watchdog timer, or a timered clear of the values. Although a
-        # watchdog timer might actually be the best route. Good practice too.
+        # Poll the RX FIFO, and print each packet as it is received. If
+        # number-of-packets is specified, then only receive that many and
+        # then stop, otherwise receive until interrupted. Stopping between
+        # round trips is safe, since each command is sent to the interface
+        # as a single frame.
         # TODO Add the functionality to be able to print the received pipe
         # along with the receivd data. (should this be something that is
         # part of a verbose option?)
+        # With dynamic payload lengths, the width of each payload is read
+        # from the radio.
+        feature = int.from_bytes(nrf24l01.r_register('FEATURE'), 'big')
+        if REGISTERS['FEATURE'].fields['EN_DPL'].extract(feature):
+            width = None
+        else:
+            width = args.width
+        # Hop channels at the start of each poll, so keep --max-interval
+        # well under --hop-interval.
+        hopper = create_hopper(args, nrf24l01, transmitter=False)
+        receiver = nrf24l01.receiver(
+            width=width,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            ack_payloads=ack_payloads,
+            on_poll=hopper.poll if hopper is not None else None,
+        )
+        # Strip the FEC headers, and rebuild the lost packets that can be.
+        fec_decoder = None
+        if args.fec is not None:
+            import nrf24l01_fec
+
+            fec_decoder = nrf24l01_fec.FecDecoder(args.fec)
+        # Decompress the data, and write it to stdout as it is, instead of
+        # printing each packet. The summary goes to stderr.
+        decompressor = None
+        summary = sys.stdout
+        if args.compress is not None:
+            import nrf24l01_compress
+
+            decompressor = nrf24l01_compress.Decompressor(
+                args.compress, read_dictionary(args.dictionary)
+            )
+            summary = sys.stderr
+        elif args.dictionary is not None:
+            raise ValueError("--dictionary needs --compress.")
+
+        # A gap in the compressed stream (e.g. a packet that was lost with
+        # --noack) makes the rest of it impossible to decompress, so
+        # receiving stops there.
+        stream_error = None
+        # With --fec, --number-of-packets counts the data packets that come
+        # out of the decoder, rather than the packets that are received,
+        # which include the parity packets.
         number_of_received_packets = 0
+
+        def output(data):
+            nonlocal stream_error, number_of_received_packets
+            if number_of_received_packets == args.number_of_packets:
+                return
+            number_of_received_packets += 1
+            if decompressor is None:
+                print(data)
+            elif stream_error is None:
+                try:
+                    data = decompressor.feed(data)
+                except ValueError as error:
+                    stream_error = error
+                    return
+                sys.stdout.buffer.write(data)
+                sys.stdout.buffer.flush()
+
+        try:
+            for _, received_data in receiver:
+                if hopper is not None:
+                    hopper.record(len(received_data))
+                if fec_decoder is not None:
+                    for data in fec_decoder.feed(received_data):
+                        output(data)
+                else:
+                    output(received_data)
+                if decompressor is not None and (
+                    decompressor.eof or stream_error is not None
+                ):
+                    break
+                if number_of_received_packets == args.number_of_packets:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if ack_stream is not None and args.ack_file != '-':
+                ack_stream.close()
+            if hopper is not None:
+                hopper.finish()
+        if fec_decoder is not None:
+            for data in fec_decoder.flush():
+                output(data)
+        elapsed = (
+            time.perf_counter() - receiver.started
+            if receiver.started is not None
+            else 0
+        )
+        print(
+            "Received {0} packets in {1} polls ({2:.1f} packets/s, "
+            "{3:.1f} polls per packet).".format(
+                receiver.packets,
+                receiver.polls,
+                receiver.packets_per_second,
+                receiver.polls_per_packet,
+            ),
+            file=summary,
+        )
+        if fec_decoder is not None:
+            print(
+                "Rebuilt {0} lost packets from the parity ({1} could not "
+                "be{2}).".format(
+                    fec_decoder.recovered,
+                    fec_decoder.lost,
+                    (
+                        ", and an unknown number were lost from the end"
+                        if fec_decoder.lost_unknown
+                        else ''
+                    ),
+                ),
+                file=summary,
+            )
+        if hopper is not None:
+            print_channel_stats(hopper, file=summary)
+        if decompressor is not None:
+            print(
+                "Decompressed {0} bytes to {1} bytes ({2:.2f}:1, {3} of "
+                "uncompressed data){4}.".format(
+                    decompressor.compressed_bytes,
+                    decompressor.raw_bytes,
+                    decompressor.ratio,
+                    format_rate(decompressor.raw_bytes, elapsed),
+                    '' if decompressor.eof else ", but the stream is truncated",
+                ),
+                file=summary,
+            )
+            if stream_error is not None:
+                print(stream_error, file=summary)
+        if ack_payloads is not None:
+            # The ACK payloads that are left in the TX FIFO were queued, but
+            # never sent. FIFO_STATUS only tells how many of them there are
+            # when it is empty, or full.
+            fifo_status = int.from_bytes(
+                nrf24l01.r_register('FIFO_STATUS'), 'big'
+            )
+            fields = REGISTERS['FIFO_STATUS'].fields
+            if fields['TX_EMPTY'].extract(fifo_status):
+                unsent = "none"
+            elif fields['TX_FULL'].extract(fifo_status):
+                unsent = "3"
+            else:
+                unsent = "1 or 2"
+            print(
+                "Received {0} bytes ({1}), and queued {2} ACK payloads "
+                "({3} bytes, {4}), {5} of them left unsent in the TX "
+                "FIFO.".format(
+                    receiver.payload_bytes,
+                    format_rate(receiver.payload_bytes, elapsed),
+                    receiver.ack_packets,
+                    receiver.ack_payload_bytes,
+                    format_rate(receiver.ack_payload_bytes, elapsed),
+                    unsent,
+                ),
+                file=summary,
+            )
+        if decompressor is not None and not decompressor.eof:
+            sys.exit(1)
+
+
+def sweep(args, nrf24l01):
+    if not 0 <= args.first <= args.last <= 125:
+        raise ValueError(
+            "The channels must satisfy 0 <= --first <= --last <= 125."
+        )
+    if args.passes < 1:
+        raise ValueError("The number of passes must be at least 1.")
+    channels = range(args.first, args.last + 1)
+    # The received power detector only works in RX mode, so put the module
+    # into RX mode for the duration of the sweep.
+    config = nrf24l01.r_register('CONFIG')
+    nrf24l01.set_fields('CONFIG', PWR_UP=0)
+    nrf24l01.set_fields('CONFIG', PRIM_RX=1, PWR_UP=1)
+    passes = []
+    start = time.perf_counter()
+    try:
+        for _ in range(args.passes):
+            passes.append(nrf24l01.scan_channels(channels, args.dwell))
+    finally:
+        elapsed = time.perf_counter() - start
+        nrf24l01.w_register('CONFIG', config)
+    occupancy = [sum(samples) for samples in zip(*passes)]
+    if args.heatmap:
+        # One row per pass, and one column per channel. A column heading is
+        # printed every 10 channels.
+        print(
+            ''.join(
+                str(channel // 10 % 10) if channel % 10 == 0 else ' '
+                for channel in channels
+            )
+        )
+        for samples in passes:
+            print(''.join('#' if sample else '.' for sample in samples))
+    else:
+        for channel, count in zip(channels, occupancy):
+            # Channel frequencies are 2400 + RF_CH MHz. See [1] Section 6.3.
+            print(
+                "{0:>3} {1} MHz {2:>4}/{3} {4}".format(
+                    channel,
+                    2400 + channel,
+                    count,
+                    args.passes,
+                    '#' * round(count * 40 / args.passes),
+                ).rstrip()
+            )
+    quietest = sorted(zip(occupancy, channels))[:5]
+    print(
+        "Quietest channels: {0}".format(
+            ', '.join(str(channel) for _, channel in quietest)
+        )
+    )
+    number_of_samples = len(channels) * args.passes
+    print(
+        "Swept {0} channels {1} times in {2:.3f} s ({3:.1f} channels/s).".format(
+            len(channels),
+            args.passes,
+            elapsed,
+            number_of_samples / elapsed if elapsed else 0,
+        )
+    )
+
+
+def bench(args, nrf24l01):
+    import nrf24l01_bench
+
+    if args.emulate:
+        results = nrf24l01_bench.bench(
+            None, args.iterations, emulate=True, baud=args.baud
+        )
+    else:
+        results = nrf24l01_bench.run_benchmarks(nrf24l01, args.iterations)
+    if args.json:
+        print(nrf24l01_bench.format_json(results))
+    else:
+        print(nrf24l01_bench.format_table(results))
+
+
+def replay(args, nrf24l01):
+    import nrf24l01_trace
+
+    report = nrf24l01_trace.replay(
+        args.trace_file, nrf24l01, paced=not args.fast
+    )
+    print(
+        "Replayed {0} transactions in {1:.3f} s ({2} responses differed from "
+        "the trace).".format(
+            report.transactions, report.seconds, report.mismatches
+        )
+    )
+
+
+def send_file(args, nrf24l01):
+    import nrf24l01_transfer
+
+    # Put the module into TX mode, sending to pipe 0, with the ACK payloads
+    # that carry the receiver's progress enabled.
+    nrf24l01.set_fields('CONFIG', PWR_UP=0)
+    nrf24l01.set_fields('CONFIG', PRIM_RX=0, PWR_UP=1)
+    nrf24l01.w_register('TX_ADDR', nrf24l01.r_register('RX_ADDR_P0'))
+    enable_ack_payloads(
+        nrf24l01, [0], nrf24l01_transfer.ack_payload_width(args.window)
+    )
+    nrf24l01.flush_tx()
+    nrf24l01.flush_rx()
+    nrf24l01.set_fields('STATUS', RX_DR=1, TX_DS=1, MAX_RT=1)
+    if args.file == '-':
+        report = nrf24l01_transfer.send_file(
+            nrf24l01, sys.stdin.buffer, args.window, args.timeout
+        )
+    else:
+        with open(args.file, 'rb') as stream:
+            report = nrf24l01_transfer.send_file(
+                nrf24l01, stream, args.window, args.timeout
+            )
+    print(
+        "Sent {0} bytes in {1:.3f} s (goodput {2}), CRC-32 {3:08X} "
+        "verified.".format(
+            report.payload_bytes,
+            report.seconds,
+            format_rate(report.payload_bytes, report.seconds),
+            report.crc32,
+        )
+    )
+    print(
+        "{0} packets, {1} retransmitted, the maximum number of retransmits "
+        "was reached {2} times, {3} lost (PLOS_CNT).".format(
+            report.packets, report.retransmits, report.max_rt, report.lost
+        )
+    )
+
+
+def recv_file(args, nrf24l01):
+    import nrf24l01_transfer
+
+    # Put the module into RX mode, listening on pipe 0.
+    nrf24l01.set_fields('CONFIG', PWR_UP=0)
+    nrf24l01.set_fields('CONFIG', PRIM_RX=1)
+    nrf24l01.set_fields('EN_RXADDR', ERX_P0=1)
+    enable_ack_payloads(nrf24l01, [0])
+    nrf24l01.flush_tx()
+    nrf24l01.flush_rx()
+    nrf24l01.set_fields('STATUS', RX_DR=1, TX_DS=1, MAX_RT=1)
+    nrf24l01.set_fields('CONFIG', PWR_UP=1)
+    # Poll often while idle, so that the sender isn't kept waiting on a full
+    # RX FIFO when the transfer starts.
+    if args.file == '-':
+        report = nrf24l01_transfer.recv_file(
+            nrf24l01, sys.stdout.buffer, args.window, max_interval=0.005
+        )
+    else:
+        with open(args.file, 'wb') as stream:
+            report = nrf24l01_transfer.recv_file(
+                nrf24l01, stream, args.window, max_interval=0.005
+            )
+    # The summary goes to stderr when the file is written to stdout.
+    print(
+        "Received {0} bytes in {1:.3f} s (goodput {2}), CRC-32 {3:08X} "
+        "{4}.".format(
+            report.payload_bytes,
+            report.seconds,
+            format_rate(report.payload_bytes, report.seconds),
+            report.crc32,
+            "verified" if report.verified else "NOT verified",
+        ),
+        file=sys.stderr if args.file == '-' else sys.stdout,
+    )
+    if not report.verified:
+        sys.exit(1)
+
+
+def monitor(args, nrf24l01):
+    import nrf24l01_monitor
+
+    if args.interval < 0 or args.report_every <= 0:
+        raise ValueError(
+            "--interval must be at least 0, and --report-every more than 0."
+        )
+    if not 1 <= args.width <= 32:
+        raise ValueError(
+            "The specified payload width must be in the range [1,32]"
+        )
+    # Put the module into TX mode, sending to the address of pipe 0 (as
+    # `transmit` does by default), which is also where the ACKs arrive.
+    nrf24l01.set_fields('CONFIG', PWR_UP=0)
+    nrf24l01.set_fields('CONFIG', PRIM_RX=0, PWR_UP=1)
+    nrf24l01.w_register('TX_ADDR', nrf24l01.r_register('RX_ADDR_P0'))
+    nrf24l01.set_fields('STATUS', TX_DS=1, MAX_RT=1)
+    link_monitor = nrf24l01_monitor.LinkMonitor(
+        nrf24l01, args.monitor_window, args.report_every
+    )
+    probe = bytes(args.width)
+
+    class Finished(Exception):
+        pass
+
+    def probes():
+        while True:
+            yield probe
+            if args.interval:
+                time.sleep(args.interval)
+
+    # Stop from the poll, rather than the probes, since while the link is
+    # down the TX FIFO stays full, and no more probes are taken.
+    def poll():
+        link_monitor.poll()
+        if args.count is not None and link_monitor.reports >= args.count:
+            raise Finished
+
+    try:
+        # Keep going while the link is down, so that the loss shows up in
+        # the summaries.
+        nrf24l01.transmit_stream(
+            probes(), max_rt_limit=float('inf'), on_poll=poll
+        )
+    except (Finished, KeyboardInterrupt):
+        pass
+    # Drop the probes that weren't sent.
+    nrf24l01.flush_tx()
+
+
+def autotune_retr(args, nrf24l01):
+    import nrf24l01_autotune
+
+    if not 1 <= args.width <= 32:
+        raise ValueError(
+            "The specified payload width must be in the range [1,32]"
+        )
+    ards = args.ard or nrf24l01_autotune.DEFAULT_ARDS
+    arcs = args.arc or nrf24l01_autotune.DEFAULT_ARCS
+    # Put the module into TX mode, sending to the address of pipe 0 (as
+    # `transmit` does by default), which is also where the ACKs arrive.
+    nrf24l01.set_fields('CONFIG', PWR_UP=0)
+    nrf24l01.set_fields('CONFIG', PRIM_RX=0, PWR_UP=1)
+    nrf24l01.w_register('TX_ADDR', nrf24l01.r_register('RX_ADDR_P0'))
+    best, results = nrf24l01_autotune.autotune(
+        nrf24l01, ards, arcs, args.objective, args.packets, args.width
+    )
+    print(nrf24l01_autotune.format_table(results))
+    print(
+        "Wrote SETUP_RETR: ARD={0} ({1} us), ARC={2}.".format(
+            best.ard, nrf24l01_autotune.ard_us(best.ard), best.arc
+        ),
+        flush=True,
+    )
+    if args.continuous is None:
+        return
+    try:
         while True:
-            status_value = int.from_bytes(nrf24l01.r_register('STATUS'), 'big')
-            rx_dr_value = extract_bit_value(
-                status_value,
-                REGISTER_MAP['STATUS']['RX_DR']['LENGTH'],
-                REGISTER_MAP['STATUS']['RX_DR']['OFFSET'],
+            time.sleep(args.continuous)
+            best = nrf24l01_autotune.retune(
+                nrf24l01,
+                best,
+                ards,
+                arcs,
+                args.objective,
+                args.packets,
+                args.width,
             )
-            if rx_dr_value == 1:
-                received_data = nrf24l01.r_rx_payload(nrf24l01.r_rx_pl_wid())
-                print(received_data)
-                if args.number_of_packets != None:
-                    number_of_received_packets += 1
-                    if number_of_received_packets == args.number_of_packets:
-                        break
+            print(
+                "time={0:.3f} ard={1.ard} arc={1.arc} delivered={1.delivered} "
+                "max_rt={1.max_rt} goodput={1.goodput:.1f} "
+                "latency={2:.6f}".format(
+                    time.time(),
+                    best,
+                    nrf24l01_autotune.expected_latency(best),
+                ),
+                flush=True,
+            )
+    except KeyboardInterrupt:
+        pass
+
+
+def save_profile(args, nrf24l01):
+    import nrf24l01_profile
+
+    profile = nrf24l01_profile.read_profile(nrf24l01)
+    if args.file == '-':
+        nrf24l01_profile.save_profile(profile, sys.stdout)
+    else:
+        with open(args.file, 'w') as profile_file:
+            nrf24l01_profile.save_profile(profile, profile_file)
+        print("Saved {0} registers to {1}.".format(len(profile), args.file))
+
+
+def apply_profile(args, nrf24l01):
+    import nrf24l01_profile
+
+    if args.file == '-':
+        profile = nrf24l01_profile.load_profile(sys.stdin)
+    else:
+        with open(args.file) as profile_file:
+            profile = nrf24l01_profile.load_profile(profile_file)
+    report = nrf24l01_profile.apply_profile(nrf24l01, profile)
+    print(
+        "Wrote {0} registers, and skipped {1} that already matched.".format(
+            report.written, report.skipped
+        )
+    )
+    if report.failed:
+        print(
+            "Failed to write: {0}".format(', '.join(report.failed)),
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+def attach_trace(args, nrf24l01, suffix=None):
+    # Record every UART transaction if --trace is given.
+    if args.trace is None:
+        return None
+    import nrf24l01_trace
+
+    path = args.trace
+    if suffix is not None:
+        path += '.' + suffix
+    trace = nrf24l01_trace.TraceWriter(path)
+    trace.attach(nrf24l01)
+    return trace
+
+
+def attach_stats(args, nrf24l01):
+    # Collect the statistics of every UART transaction if --stats is given.
+    if not args.stats:
+        return None
+    stats = TransactionStats()
+    stats.attach(nrf24l01)
+    return stats
+
+
+def run_on_device(args, nrf24l01):
+    # Run a command on a single device, with the instrumentation that was
+    # asked for.
+    stats = attach_stats(args, nrf24l01)
+    trace = attach_trace(args, nrf24l01)
+    try:
+        run_command(args, nrf24l01)
+    finally:
+        if trace is not None:
+            trace.close()
+        if stats is not None:
+            print(stats.summary(), file=sys.stderr)
+
+
+def get_port(args):
+    # The port of the single device that a command runs on, or None if it
+    # runs on several.
+    if args.all_devices:
+        return None
+    ports = args.port or [DEFAULT_PORT]
+    if len(ports) == 1 and not glob.has_magic(ports[0]):
+        return ports[0]
+    return None
+
+
+def get_daemon_socket(argv):
+    # Find the socket of the daemon that a command line should be forwarded
+    # to, if any. Only the options that come before the command name matter,
+    # so they are parsed on their own, rather than building the full parser.
+    args = parse_global_arguments(argv)
+    if args is None or args.no_daemon:
+        return None
+    port = get_port(args)
+    if port is None:
+        return None
+    if not args.command or args.command[0] == 'daemon':
+        return None
+    return args.socket or nrf24l01_daemon.socket_path(port)
+
+
+# The options of each command that read from stdin when they are given `-`.
+# The daemon has no way to forward stdin from a client.
+STDIN_OPTIONS = {
+    'transmit': [('--file', 'file')],
+    'receive': [('--ack-file', 'ack_file')],
+    'send-file': [('FILE', 'file')],
+    'apply-profile': [('FILE', 'file')],
+}
+
+
+def daemon(args):
+    port = get_port(args)
+    if port is None:
+        raise ValueError("The daemon can only serve a single port.")
+    path = args.socket or nrf24l01_daemon.socket_path(port)
+    with nRF24L01(port, cache=True) as nrf24l01:
+
+        def run(argv):
+            request = get_args(argv)
+            if request.version:
+                print("dev")
+            if request.command_name in (None, 'daemon'):
+                return 0
+            for option_name, dest in STDIN_OPTIONS.get(
+                request.command_name, ()
+            ):
+                if getattr(request, dest) == '-':
+                    raise ValueError(
+                        "{0} can't read from stdin through the daemon. Use a "
+                        "file, or stop the daemon.".format(option_name)
+                    )
+            # The registers may have changed between requests (e.g. the board
+            # was power cycled, or another program used the port while the
+            # daemon wasn't looking), so the register cache only lasts for a
+            # single request.
+            nrf24l01.invalidate_cache()
+            if request.command_name == 'bench' and request.emulate:
+                bench(request, None)
             else:
-                pass
+                run_on_device(request, nrf24l01)
+            return 0
 
+        print("Serving {0} on {1}".format(port, path), flush=True)
+        nrf24l01_daemon.serve(path, run)
 
-def main():
-    # Create an instance of the module at the specified port.
-    nrf24l01 = nRF24L01('/dev/ttyUSB0')
-    args = get_args()
-    if args.version:
-        print("dev")
+
+def run_command(args, nrf24l01):
     ############################################################################
     if args.command_name == 'status':
         status(args, nrf24l01)
@@ -1138,15 +2307,115 @@ def main():
     elif args.command_name == 'load':
         load(args, nrf24l01)
     ############################################################################
-    # # TODO: Add to the `transmit` command with --noack option (EN_ACK_PAY and
-    # # EN_DYN_ACK?) (maybe also the --reuse-tx-pl option with no arguments)
-    # # Before transmitting, the chip is powered down, and then the prim_rx
-    # # bit is cleared and then then PWR_UP is set.
+    # # TODO: Add to the `transmit` command with the --reuse-tx-pl option
+    # # (with no arguments) Before transmitting, the chip is powered down,
+    # # and then the prim_rx bit is cleared and then then PWR_UP is set.
     elif args.command_name == 'transmit':
         transmit(args, nrf24l01)
     ############################################################################
     elif args.command_name == 'receive':
         receive(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'sweep':
+        sweep(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'bench':
+        bench(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'replay':
+        replay(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'send-file':
+        send_file(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'recv-file':
+        recv_file(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'monitor':
+        monitor(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'autotune-retr':
+        autotune_retr(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'save-profile':
+        save_profile(args, nrf24l01)
+    ############################################################################
+    elif args.command_name == 'apply-profile':
+        apply_profile(args, nrf24l01)
+
+
+def main():
+    argv = sys.argv[1:]
+    # If a daemon is holding the port, let it run the command.
+    path = get_daemon_socket(argv)
+    if path is not None:
+        exit_status = nrf24l01_daemon.forward(path, argv)
+        if exit_status is not None:
+            sys.exit(exit_status)
+    args = get_args(argv)
+    if args.version:
+        print("dev")
+    if args.command_name is None:
+        return
+    # The emulator stands in for the interface board, so no port is needed.
+    if args.command_name == 'bench' and args.emulate:
+        bench(args, None)
+        return
+    if args.command_name == 'daemon':
+        daemon(args)
+        return
+    port = get_port(args)
+    if port is not None:
+        # Create an instance of the module at the specified port, and hold the
+        # port open for the duration of the command. Nothing else should be
+        # writing to the registers in the meantime, so they can safely be
+        # cached.
+        with nRF24L01(port, cache=True) as nrf24l01:
+            run_on_device(args, nrf24l01)
+        return
+    from nrf24l01_manager import DeviceManager, DEFAULT_PORT_PATTERNS
+
+    if args.all_devices:
+        ports = (args.port or []) + DEFAULT_PORT_PATTERNS
+    else:
+        ports = args.port
+    # Fan the command out across every device in parallel, and then print the
+    # output of each device in turn.
+    with DeviceManager(ports, cache=True) as manager:
+        if len(manager) == 0:
+            raise ValueError("No devices were found.")
+        stats = {
+            port: attach_stats(args, nrf24l01)
+            for port, nrf24l01 in manager.devices.items()
+        }
+        traces = [
+            attach_trace(args, nrf24l01, os.path.basename(port))
+            for port, nrf24l01 in manager.devices.items()
+        ]
+        start = time.perf_counter()
+        try:
+            results = manager.run(lambda nrf24l01: run_command(args, nrf24l01))
+        finally:
+            for trace in traces:
+                if trace is not None:
+                    trace.close()
+        elapsed = time.perf_counter() - start
+    failures = 0
+    for result in results:
+        print("{0}: ({1:.3f} s)".format(result.port, result.seconds))
+        print(result.output, end='')
+        if result.error is not None:
+            failures += 1
+            print("Error: {0}".format(result.error))
+        if stats[result.port] is not None:
+            print(stats[result.port].summary(), file=sys.stderr)
+    print(
+        "Ran `{0}` on {1} devices in {2:.3f} s ({3} failed).".format(
+            args.command_name, len(results), elapsed, failures
+        )
+    )
+    if failures:
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -1155,9 +2424,8 @@ if __name__ == '__main__':
 # TODO - Future Version: Change this command line interface to use click?
 # Argparse is not ideal. No nesting of mutually exclusive, or regular groups,
 # no different logical command requirements, very verbose etc.
-# TODO Ability to store, and restore settings from a config file.
 # TODO Sweep Channels command. an option for transmitting to sweep channels to
-# find an optimal one?
+# find an optimal one? (See the `sweep` command for a receive-only survey.)
 # TODO: Add more visual feedback with each communication (verbosity setting) to
 # show if communications are being successful, and at what point the
 # communications are at.
@@ -0,0 +1,179 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Compression of the data that is streamed through `transmit`, and `receive`.
+#
+# The data is compressed as one continuous stream (zlib, or lzma), which is
+# then split into packets, so a packet usually holds the end of one compressed
+# block, and the start of the next. The receiver feeds the packets into the
+# matching decompressor in order, and stops at the end of the compressed
+# stream, which also discards the zeros that pad the last packet.
+#
+# For short messages, most of what zlib saves comes from matching against
+# earlier data, so a preset dictionary of typical content (e.g. the keys of
+# the JSON telemetry) can be given to both ends instead.
+################################################################################
+import lzma
+import zlib
+
+METHODS = ('zlib', 'lzma')
+# The number of bytes to read from the uncompressed stream at a time.
+CHUNK_SIZE = 4096
+
+
+def _check(method: str, level, dictionary) -> None:
+    if method not in METHODS:
+        raise ValueError(
+            "The compression method must be one of: {0}.".format(
+                ', '.join(METHODS)
+            )
+        )
+    if level is not None and not 0 <= level <= 9:
+        raise ValueError("The compression level must be in the range [0,9].")
+    if dictionary is not None and method != 'zlib':
+        raise ValueError("A preset dictionary is only supported by zlib.")
+
+
+class CompressedReader:
+    """A binary file object that reads a stream, and returns it compressed.
+
+    e.g.
+
+        with open('log.txt', 'rb') as stream:
+            reader = CompressedReader(stream, 'zlib', level=9)
+            for packet in iter_packets(reader, 32):
+                ...
+
+    `read()` returns whatever compressed data is ready, which may be more, or
+    less than the size that was asked for, and b'' at the end of the stream.
+    With zlib, the compressor is flushed after each chunk that is read, so
+    that data read from a pipe is sent as it arrives, rather than when the
+    compressor's buffer fills up.
+
+    Keyword arguments:
+        stream -- The uncompressed binary file object.
+        method -- 'zlib', or 'lzma'.
+        level -- The compression level [0,9], or None for the default.
+        dictionary -- A preset dictionary (zlib only), or None.
+    """
+
+    def __init__(self, stream, method: str, level=None, dictionary=None):
+        _check(method, level, dictionary)
+        # Reading a pipe with `read1()` returns as soon as any data is
+        # available.
+        self._read = getattr(stream, 'read1', stream.read)
+        if method == 'zlib':
+            options = {} if dictionary is None else {'zdict': dictionary}
+            self._compressor = zlib.compressobj(
+                zlib.Z_DEFAULT_COMPRESSION if level is None else level,
+                **options,
+            )
+        else:
+            self._compressor = lzma.LZMACompressor(preset=level)
+        self._sync = method == 'zlib'
+        self._finished = False
+        # Statistics.
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    @property
+    def ratio(self) -> float:
+        """The number of uncompressed bytes per compressed byte."""
+        if not self.compressed_bytes:
+            return 0.0
+        return self.raw_bytes / self.compressed_bytes
+
+    def read(self, size: int = -1) -> bytes:
+        while not self._finished:
+            chunk = self._read(size if size > 0 else CHUNK_SIZE)
+            if chunk:
+                self.raw_bytes += len(chunk)
+                data = self._compressor.compress(chunk)
+                if self._sync:
+                    data += self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            else:
+                data = self._compressor.flush()
+                self._finished = True
+            if data:
+                self.compressed_bytes += len(data)
+                return data
+        return b''
+
+    read1 = read
+
+
+class Decompressor:
+    """Decompress a stream that was compressed by `CompressedReader`.
+
+    e.g.
+
+        decompressor = Decompressor('zlib')
+        for packet in received_packets:
+            output.write(decompressor.feed(packet))
+            if decompressor.eof:
+                break
+
+    Keyword arguments:
+        method -- 'zlib', or 'lzma'. It must match the sender.
+        dictionary -- The preset dictionary of the sender (zlib only), or
+        None.
+    """
+
+    def __init__(self, method: str, dictionary=None):
+        _check(method, None, dictionary)
+        if method == 'zlib':
+            options = {} if dictionary is None else {'zdict': dictionary}
+            self._decompressor = zlib.decompressobj(**options)
+        else:
+            self._decompressor = lzma.LZMADecompressor()
+        # Statistics.
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    @property
+    def eof(self) -> bool:
+        """True once the end of the compressed stream has been reached."""
+        return self._decompressor.eof
+
+    @property
+    def ratio(self) -> float:
+        """The number of uncompressed bytes per compressed byte."""
+        if not self.compressed_bytes:
+            return 0.0
+        return self.raw_bytes / self.compressed_bytes
+
+    def feed(self, data: bytes) -> bytes:
+        """Take the next packet, and return the data that it decompresses to.
+
+        Anything after the end of the compressed stream is ignored.
+        """
+        if self.eof:
+            return b''
+        try:
+            decompressed = self._decompressor.decompress(data)
+        except (zlib.error, lzma.LZMAError) as error:
+            raise ValueError(
+                "The compressed stream is corrupt ({0}).".format(error)
+            ) from None
+        self.compressed_bytes += len(data) - len(self._unused_data())
+        self.raw_bytes += len(decompressed)
+        return decompressed
+
+    def _unused_data(self) -> bytes:
+        # The padding after the end of the stream, in the last packet.
+        return self._decompressor.unused_data if self.eof else b''
@@ -19,7 +19,14 @@
 # Documentation:
 # 1. [nRF24L01 Datasheet](<project_directory>/nRF24L01-datasheet.pdf)
 ################################################################################
-import serial
+# NOTE: asyncio, concurrent.futures, and serial (pyserial) are slow to import
+# compared to everything else that the CLI needs to start, so each of them is
+# only imported by the code that first needs it.
+import collections
+import contextlib
+import functools
+import os
+import time
 
 
 # Command names and words. See [1] Section 8.3.1 Table 19.
@@ -35,18 +42,24 @@ COMMANDS = {
     'R_RX_PL_WID': 0x60,
     'W_ACK_PAYLOAD': 0xA8,
     'W_TX_PAYLOAD_NOACK': 0xB0,
+    'ACTIVATE': 0x50,
     'NOP': 0xFF,
 }
+# The data byte of ACTIVATE that toggles the features in FEATURE, and DYNPD.
+ACTIVATE_FEATURES = 0x73
 
 
 # Register mnemonics and addresses with their bit mnemonics and bit positions.
 # See [1] Section 9.1 Table 27.
+# Registers marked as VOLATILE are changed by the nRF24L01 itself, so they must
+# always be read from the device rather than from a cached copy.
 # NOTE: Should this go in the class?
 REGISTER_MAP = {
     'CONFIG': {
         'ADDRESS': 0x00,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x08,
+        'VOLATILE': False,
         'MASK_RX_DR': {'LENGTH': 1, 'OFFSET': 6, 'RESET_VALUE': 0x00},
         'MASK_TX_DS': {'LENGTH': 1, 'OFFSET': 5, 'RESET_VALUE': 0x00},
         'MASK_MAX_RT': {'LENGTH': 1, 'OFFSET': 4, 'RESET_VALUE': 0x00},
@@ -59,6 +72,7 @@ REGISTER_MAP = {
         'ADDRESS': 0x01,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x3F,
+        'VOLATILE': False,
         'ENAA_P5': {'LENGTH': 1, 'OFFSET': 5, 'RESET_VALUE': 0x01},
         'ENAA_P4': {'LENGTH': 1, 'OFFSET': 4, 'RESET_VALUE': 0x01},
         'ENAA_P3': {'LENGTH': 1, 'OFFSET': 3, 'RESET_VALUE': 0x01},
@@ -69,7 +83,8 @@ REGISTER_MAP = {
     'EN_RXADDR': {
         'ADDRESS': 0x02,
         'NUMBER_OF_DATA_BYTES': 1,
-        'RESET_VALUE': 0x02,
+        'RESET_VALUE': 0x03,
+        'VOLATILE': False,
         'ERX_P5': {'LENGTH': 1, 'OFFSET': 5, 'RESET_VALUE': 0x00},
         'ERX_P4': {'LENGTH': 1, 'OFFSET': 4, 'RESET_VALUE': 0x00},
         'ERX_P3': {'LENGTH': 1, 'OFFSET': 3, 'RESET_VALUE': 0x00},
@@ -81,12 +96,14 @@ REGISTER_MAP = {
         'ADDRESS': 0x03,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x03,
+        'VOLATILE': False,
         'AW': {'LENGTH': 2, 'OFFSET': 0, 'RESET_VALUE': 0x03},
     },
     'SETUP_RETR': {
         'ADDRESS': 0x04,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x03,
+        'VOLATILE': False,
         'ARD': {'LENGTH': 4, 'OFFSET': 4, 'RESET_VALUE': 0x00},
         'ARC': {'LENGTH': 4, 'OFFSET': 0, 'RESET_VALUE': 0x03},
     },
@@ -94,12 +111,14 @@ REGISTER_MAP = {
         'ADDRESS': 0x05,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x02,
+        'VOLATILE': False,
         'RF_CH': {'LENGTH': 7, 'OFFSET': 0, 'RESET_VALUE': 0x02},
     },
     'RF_SETUP': {
         'ADDRESS': 0x06,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x0E,
+        'VOLATILE': False,
         'CONT_WAVE': {'LENGTH': 1, 'OFFSET': 7, 'RESET_VALUE': 0x00},
         'RF_DR_LOW': {'LENGTH': 1, 'OFFSET': 5, 'RESET_VALUE': 0x00},
         'PLL_LOCK': {'LENGTH': 1, 'OFFSET': 4, 'RESET_VALUE': 0x00},
@@ -110,6 +129,7 @@ REGISTER_MAP = {
         'ADDRESS': 0x07,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x0E,
+        'VOLATILE': True,
         'RX_DR': {'LENGTH': 1, 'OFFSET': 6, 'RESET_VALUE': 0x00},
         'TX_DS': {'LENGTH': 1, 'OFFSET': 5, 'RESET_VALUE': 0x00},
         'MAX_RT': {'LENGTH': 1, 'OFFSET': 4, 'RESET_VALUE': 0x00},
@@ -120,6 +140,7 @@ REGISTER_MAP = {
         'ADDRESS': 0x08,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x3F,
+        'VOLATILE': True,
         'PLOS_CNT': {'LENGTH': 4, 'OFFSET': 4, 'RESET_VALUE': 0x00},
         'ARC_CNT': {'LENGTH': 4, 'OFFSET': 0, 'RESET_VALUE': 0x00},
     },
@@ -127,83 +148,98 @@ REGISTER_MAP = {
         'ADDRESS': 0x09,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': True,
         'RPD': {'LENGTH': 1, 'OFFSET': 0, 'RESET_VALUE': 0x00},
     },  # RPD or CD?
     'RX_ADDR_P0': {
         'ADDRESS': 0x0A,
         'NUMBER_OF_DATA_BYTES': 5,
         'RESET_VALUE': 0xE7E7E7E7E7,
+        'VOLATILE': False,
     },
     'RX_ADDR_P1': {
         'ADDRESS': 0x0B,
         'NUMBER_OF_DATA_BYTES': 5,
         'RESET_VALUE': 0xC2C2C2C2C2,
+        'VOLATILE': False,
     },
     'RX_ADDR_P2': {
         'ADDRESS': 0x0C,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0xC3,
+        'VOLATILE': False,
     },
     'RX_ADDR_P3': {
         'ADDRESS': 0x0D,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0xC4,
+        'VOLATILE': False,
     },
     'RX_ADDR_P4': {
         'ADDRESS': 0x0E,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0xC5,
+        'VOLATILE': False,
     },
     'RX_ADDR_P5': {
         'ADDRESS': 0x0F,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0xC6,
+        'VOLATILE': False,
     },
     'TX_ADDR': {
         'ADDRESS': 0x10,
         'NUMBER_OF_DATA_BYTES': 5,
         'RESET_VALUE': 0xE7E7E7E7E7,
+        'VOLATILE': False,
     },
     'RX_PW_P0': {
         'ADDRESS': 0x11,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': False,
         'RX_PW_P0': {'LENGTH': 6, 'OFFSET': 0, 'RESET_VALUE': 0x00},
     },
     'RX_PW_P1': {
         'ADDRESS': 0x12,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': False,
         'RX_PW_P1': {'LENGTH': 6, 'OFFSET': 0, 'RESET_VALUE': 0x00},
     },
     'RX_PW_P2': {
         'ADDRESS': 0x13,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': False,
         'RX_PW_P2': {'LENGTH': 6, 'OFFSET': 0, 'RESET_VALUE': 0x00},
     },
     'RX_PW_P3': {
         'ADDRESS': 0x14,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': False,
         'RX_PW_P3': {'LENGTH': 6, 'OFFSET': 0, 'RESET_VALUE': 0x00},
     },
     'RX_PW_P4': {
         'ADDRESS': 0x15,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': False,
         'RX_PW_P4': {'LENGTH': 6, 'OFFSET': 0, 'RESET_VALUE': 0x00},
     },
     'RX_PW_P5': {
         'ADDRESS': 0x16,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': False,
         'RX_PW_P5': {'LENGTH': 6, 'OFFSET': 0, 'RESET_VALUE': 0x00},
     },
     'FIFO_STATUS': {
         'ADDRESS': 0x17,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x11,
+        'VOLATILE': True,
         'TX_REUSE': {'LENGTH': 1, 'OFFSET': 6, 'RESET_VALUE': 0x00},
         'TX_FULL': {'LENGTH': 1, 'OFFSET': 5, 'RESET_VALUE': 0x00},
         'TX_EMPTY': {'LENGTH': 1, 'OFFSET': 4, 'RESET_VALUE': 0x01},
@@ -214,6 +250,7 @@ REGISTER_MAP = {
         'ADDRESS': 0x1C,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': False,
         'DPL_P5': {'LENGTH': 1, 'OFFSET': 5, 'RESET_VALUE': 0x00},
         'DPL_P4': {'LENGTH': 1, 'OFFSET': 4, 'RESET_VALUE': 0x00},
         'DPL_P3': {'LENGTH': 1, 'OFFSET': 3, 'RESET_VALUE': 0x00},
@@ -225,6 +262,7 @@ REGISTER_MAP = {
         'ADDRESS': 0x1D,
         'NUMBER_OF_DATA_BYTES': 1,
         'RESET_VALUE': 0x00,
+        'VOLATILE': False,
         'EN_DPL': {'LENGTH': 1, 'OFFSET': 2, 'RESET_VALUE': 0x00},
         'EN_ACK_PAY': {'LENGTH': 1, 'OFFSET': 1, 'RESET_VALUE': 0x00},
         'EN_DYN_ACK': {'LENGTH': 1, 'OFFSET': 0, 'RESET_VALUE': 0x00},
@@ -232,10 +270,219 @@ REGISTER_MAP = {
 }
 
 
-class nRF24L01:
-    def __init__(self, port: str):
-        self.port = port
-        self.BAUD = 9600
+class Field:
+    """A bit mnemonic of a register, with its mask precomputed."""
+
+    __slots__ = ('name', 'length', 'offset', 'mask', 'reset_value')
+
+    def __init__(self, name: str, length: int, offset: int, reset_value: int):
+        self.name = name
+        self.length = length
+        self.offset = offset
+        self.mask = ((1 << length) - 1) << offset
+        self.reset_value = reset_value
+
+    def __repr__(self):
+        return 'Field({0!r}, mask={1:#04x})'.format(self.name, self.mask)
+
+    def extract(self, register_value: int) -> int:
+        """Return the value of the field within the value of its register."""
+        return (register_value & self.mask) >> self.offset
+
+    def insert(self, register_value: int, field_value: int) -> int:
+        """Return the value of the register with the field set to a value."""
+        if field_value < 0 or field_value > self.mask >> self.offset:
+            raise ValueError(
+                "{0} must be in the range [0,{1}].".format(
+                    self.name, self.mask >> self.offset
+                )
+            )
+        return (register_value & ~self.mask) | (field_value << self.offset)
+
+
+class Register:
+    """A register of the nRF24L01, and its bit mnemonics."""
+
+    __slots__ = (
+        'name',
+        'address',
+        'number_of_data_bytes',
+        'reset_value',
+        'volatile',
+        'fields',
+    )
+
+    def __init__(
+        self,
+        name: str,
+        address: int,
+        number_of_data_bytes: int,
+        reset_value: int,
+        volatile: bool,
+        fields: dict,
+    ):
+        self.name = name
+        self.address = address
+        self.number_of_data_bytes = number_of_data_bytes
+        self.reset_value = reset_value
+        self.volatile = volatile
+        # The bit mnemonics of the register, by name, from the most to the
+        # least significant bit.
+        self.fields = fields
+
+    def __repr__(self):
+        return 'Register({0!r}, address={1:#04x})'.format(
+            self.name, self.address
+        )
+
+
+def compile_register_map(register_map: dict) -> dict:
+    """Compile a register map into `Register` descriptors, by register name.
+
+    The metadata of each register in the map is separated from its bit
+    mnemonics, so that the bit mnemonics can be iterated over directly.
+    """
+    registers = {}
+    for register_name, register in register_map.items():
+        fields = {}
+        for key, value in register.items():
+            if isinstance(value, dict):
+                fields[key] = Field(
+                    key, value['LENGTH'], value['OFFSET'], value['RESET_VALUE']
+                )
+        registers[register_name] = Register(
+            register_name,
+            register['ADDRESS'],
+            register['NUMBER_OF_DATA_BYTES'],
+            register['RESET_VALUE'],
+            register['VOLATILE'],
+            fields,
+        )
+    return registers
+
+
+# The compiled form of REGISTER_MAP, and a reverse index of register addresses
+# to register names.
+REGISTERS = compile_register_map(REGISTER_MAP)
+REGISTER_NAMES = {
+    register.address: register_name
+    for register_name, register in REGISTERS.items()
+}
+# The number of payloads that each of the RX, and TX FIFOs holds. See [1]
+# Section 7.5.2.
+FIFO_DEPTH = 3
+
+
+# Every command is sent to the interface firmware as a UART frame made up of 3
+# length headers followed by the command itself:
+#   [command length][SPI transfer length][response length][command word][data]
+# See interface-firmware/src/atmega328p/atmega328p.c.
+FRAME_HEADER_LENGTH = 3
+# The longest command is 1 command word + 32 payload bytes.
+MAX_COMMAND_LENGTH = 33
+MAX_FRAME_LENGTH = FRAME_HEADER_LENGTH + MAX_COMMAND_LENGTH
+# The number of bits on the wire for each UART byte (start + 8 data + stop).
+BITS_PER_UART_BYTE = 10
+# The interface firmware transmits each response from within its UART receive
+# interrupt, and the ATmega328P can only hold 3 incoming bytes (the receive
+# shift register, and its 2 byte buffer) while it does. A frame can only be
+# written straight after another whose response is at most this long, or the
+# bytes of the frame that arrive while the response is sent are lost.
+MAX_PIPELINED_RESPONSE_LENGTH = 2
+
+
+def split_runs(response_lengths: list) -> list:
+    """Split a batch of frames into runs that can be written back-to-back.
+
+    Each run ends at the first frame whose response is longer than
+    MAX_PIPELINED_RESPONSE_LENGTH. Returns the (start, end) slice of each run
+    in `response_lengths`.
+    """
+    runs = []
+    start = 0
+    for index, response_length in enumerate(response_lengths):
+        if response_length > MAX_PIPELINED_RESPONSE_LENGTH:
+            runs.append((start, index + 1))
+            start = index + 1
+    if start < len(response_lengths):
+        runs.append((start, len(response_lengths)))
+    return runs
+
+
+def check_response(response: bytes, response_length: int) -> None:
+    """Raise TimeoutError if fewer bytes than expected were read back."""
+    if len(response) < response_length:
+        raise TimeoutError(
+            "The interface timed out after {0} of {1} response bytes.".format(
+                len(response), response_length
+            )
+        )
+
+
+def encode_frame(
+    buffer: bytearray,
+    offset: int,
+    command_word: int,
+    payload: bytes,
+    transfer_length: int,
+    response_length: int,
+) -> int:
+    """Encode a command frame into a buffer, and return the offset past its end.
+
+    Keyword arguments:
+        buffer -- The buffer that the frame is to be written into.
+        offset -- The position in the buffer to write the frame at.
+        command_word -- The command word. See [1] Table 19.
+        payload -- The data bytes that follow the command word.
+        transfer_length -- The number of bytes to exchange over SPI.
+        response_length -- The number of bytes to be returned over UART.
+    """
+    # 1 command word + the number of payload bytes
+    command_length = 1 + len(payload)
+    end = offset + FRAME_HEADER_LENGTH + command_length
+    buffer[offset] = command_length
+    buffer[offset + 1] = transfer_length
+    buffer[offset + 2] = response_length
+    buffer[offset + 3] = command_word
+    buffer[offset + 4 : end] = payload
+    return end
+
+
+# Decoders for the UART response to each command. The first byte of every
+# response is the STATUS register. See [1] Section 8.3.1.
+def _ignore_response(response: bytes) -> None:
+    return None
+
+
+def _strip_status(response: bytes) -> bytes:
+    return response[1:]
+
+
+def _rx_pl_wid(response: bytes) -> int:
+    return response[1]
+
+
+def _status(response: bytes) -> int:
+    return response[0]
+
+
+class _CommandSet:
+    """The nRF24L01 SPI command set. See [1] Section 8.3.1 Table 19.
+
+    Each command validates its arguments, and hands the resulting frame to
+    `_submit()`, which decides when and how it is actually sent: immediately
+    for `nRF24L01`, or queued up for `Batch`.
+    """
+
+    def _submit(
+        self,
+        decode,
+        command_word: int,
+        payload: bytes = b'',
+        transfer_length: int = None,
+        response_length: int = 0,
+    ):
+        raise NotImplementedError
 
     def r_register(self, register_name: str) -> bytes:
         """Read the command and status registers, and return their contents.
@@ -248,35 +495,19 @@ class nRF24L01:
             See [1] Section 9.1 (Table 27) for the register names, and their
             contents.
         """
-        if register_name not in REGISTER_MAP:
+        if register_name not in REGISTERS:
             raise KeyError("The specified register does not exist.")
-        # Transmit the UART reponse length header
-        command_byte = (
-            COMMANDS['R_REGISTER'] | REGISTER_MAP[register_name]['ADDRESS']
-        ).to_bytes(1, 'big')
-        command_length = len(command_byte)  # 1 command byte
+        register = REGISTERS[register_name]
         # [(tx) 1 command byte | (rx) 1 status byte] + (rx) the number of bytes
-        # at the address.
-        transfer_length = (
-            1 + REGISTER_MAP[register_name]['NUMBER_OF_DATA_BYTES']
-        )
-        # 1 status byte + the number of bytes at the address
-        response_length = (
-            1 + REGISTER_MAP[register_name]['NUMBER_OF_DATA_BYTES']
+        # at the address. The same goes for the response: 1 status byte + the
+        # number of bytes at the address.
+        # Return, from the function, all data except the status
+        return self._submit(
+            _strip_status,
+            COMMANDS['R_REGISTER'] | register.address,
+            transfer_length=1 + register.number_of_data_bytes,
+            response_length=1 + register.number_of_data_bytes,
         )
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Read the data returned over UART
-            uart_response = ser.read(response_length)[1:]
-            # Return, from the function, all data except the status
-        return uart_response
 
     def w_register(self, register_name: str, payload: bytes) -> None:
         """Write data to a specified register
@@ -294,38 +525,20 @@ class nRF24L01:
         """
         if type(payload) != bytes:
             raise TypeError("Payload must be of type <bytes>.")
-        if (
-            len(payload) > REGISTER_MAP[register_name]['NUMBER_OF_DATA_BYTES']
-            or len(payload) < 0
-        ):
-            raise ValueError("Invalid payload length.")
-        if register_name not in REGISTER_MAP:
+        if register_name not in REGISTERS:
             raise KeyError("The specified register does not exist.")
-        # Transmit the UART reponse length header
-        command_byte = (
-            COMMANDS['W_REGISTER'] | REGISTER_MAP[register_name]['ADDRESS']
-        ).to_bytes(1, 'big')
-        # 1 command byte + number of payload bytes
-        command_length = len(command_byte) + len(payload)
-        # [(tx) 1 command byte | 1 status byte (rx)] + (tx) payload bytes
-        transfer_length = 1 + len(payload)
+        register = REGISTERS[register_name]
+        if len(payload) > register.number_of_data_bytes or len(payload) < 0:
+            raise ValueError("Invalid payload length.")
         # (TODO FIX THIS) NOTE: I have no idea what is going on with the
         # response length. For some reason, It has to be a 1 otherwise
         # everything breaks.
-        response_length = 1  # 1 status byte
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Transmit the payload byte(s)
-            ser.write(payload)
-            # Read any returned data. NOTE: Probably not needed as it returns 0
-            ser.read(response_length)
+        return self._submit(
+            _ignore_response,
+            COMMANDS['W_REGISTER'] | register.address,
+            payload,
+            response_length=1,  # 1 status byte
+        )
 
     def r_rx_payload(self, number_of_bytes: int) -> bytes:
         """Read, and return the received data from the RX_PLD regiser.
@@ -342,59 +555,36 @@ class nRF24L01:
                 "The specified number of bytes to be read must be in"
                 " the range [0,32]"
             )
-        # Transmit the UART reponse length header
-        command_byte = COMMANDS['R_RX_PAYLOAD'].to_bytes(1, 'big')
-        # The command byte
-        command_length = len(command_byte)
         # [(tx) 1 command byte | 1 status byte (rx)] + RX_PAYLOAD
-        transfer_length = 1 + number_of_bytes
-        response_length = 1 + number_of_bytes  # 1 status byte + RX_PAYLOAD
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the Command byte
-            ser.write(command_byte)
-            # Read and return the read receive payload (Ignore the STATUS byte).
-            uart_response = ser.read(response_length)[1:]
-        return uart_response
-
-    def w_tx_payload(self, payload: bytes) -> None:
+        # Return the read receive payload (Ignore the STATUS byte).
+        return self._submit(
+            _strip_status,
+            COMMANDS['R_RX_PAYLOAD'],
+            transfer_length=1 + number_of_bytes,
+            response_length=1 + number_of_bytes,
+        )
+
+    def w_tx_payload(self, payload: bytes) -> int:
         """Write the data to be transmitted to the TX_PLD register
 
+        Returns the STATUS register as it was before the payload was written.
+        If its TX_FULL bit is set, the TX FIFO had no room for the payload.
+
         Keyword arguments:
             payload -- The data that is to be transmitted. The payload data is
-            of type bytes, and it can be up to 32 bytes in length.
+            of type bytes (or any other bytes-like object, such as a
+            memoryview), and it can be up to 32 bytes in length.
         Documentation:
             See [1] Table 19 for the W_TX_PAYLOAD command.
         """
-        if type(payload) != bytes:
+        if not isinstance(payload, (bytes, bytearray, memoryview)):
             raise TypeError("Payload must be of type <bytes>.")
         if len(payload) > 32:
             raise ValueError("Payload must be 0-32 bytes in length.")
-        # Transmit the UART reponse length header
-        command_byte = COMMANDS['W_TX_PAYLOAD'].to_bytes(1, 'big')
-        # 1 command byte + the number of payload bytes
-        command_length = len(command_byte) + len(payload)
         # [(tx) 1 command byte | 1 status byte (rx)] + TX_PAYLOAD bytes
-        transfer_length = 1 + len(payload)
-        response_length = 0  # 1 Status byte
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART Command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Transmit the payload
-            ser.write(payload)
-            # Read any returned data. NOTE: Probably not needed as it returns 0
-            ser.read(response_length)
+        return self._submit(
+            _status, COMMANDS['W_TX_PAYLOAD'], payload, response_length=1
+        )
 
     def flush_tx(self) -> None:
         """Flush any exising data out of the TX_PLD FIFOs.
@@ -402,22 +592,9 @@ class nRF24L01:
         Documentation:
             See [1] Table 19 for the FLUSH_TX command.
         """
-        # Setup the uart data
-        command_byte = COMMANDS['FLUSH_TX'].to_bytes(1, 'big')
-        command_length = len(command_byte)  # 1 command byte
-        transfer_length = 1  # [(tx) 1 command byte | (rx) 1 status byte]
-        response_length = 0  # None (Ignore the STATUS byte).
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Read any returned data. NOTE: Probably not needed as it returns 0
-            ser.read(response_length)
+        # [(tx) 1 command byte | (rx) 1 status byte], and ignore the STATUS
+        # byte.
+        return self._submit(_ignore_response, COMMANDS['FLUSH_TX'])
 
     def flush_rx(self) -> None:
         """Flush any exising data out of the RX_PLD FIFOs.
@@ -425,22 +602,9 @@ class nRF24L01:
         Documentation:
             See [1] Table 19 for the FLUSH_RX command.
         """
-        # Setup the uart data
-        command_byte = COMMANDS['FLUSH_RX'].to_bytes(1, 'big')
-        command_length = len(command_byte)  # 1 command byte
-        transfer_length = 1  # [(tx) 1 command byte | (rx) 1 status byte]
-        response_length = 0  # None (Ignore the STATUS byet).
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Read any returned data. NOTE: Probably not needed as it returns 0
-            ser.read(response_length)
+        # [(tx) 1 command byte | (rx) 1 status byte], and ignore the STATUS
+        # byte.
+        return self._submit(_ignore_response, COMMANDS['FLUSH_RX'])
 
     def reuse_tx_pl(self) -> None:
         """Reuse the last transmitted payload.
@@ -448,22 +612,27 @@ class nRF24L01:
         Documentation:
             See [1] Table 19 for the REUSE_TX_PL command.
         """
-        # Setup the uart data
-        command_byte = COMMANDS['REUSE_TX_PL'].to_bytes(1, 'big')
-        command_length = len(command_byte)  # 1 command byte
-        transfer_length = 1  # [(tx) 1 command byte | (rx) 1 status byte]
-        response_length = 0  # None (Ignore the STATUS byte).
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Read any returned data. NOTE: Probably not needed as it returns 0
-            ser.read(response_length)
+        # [(tx) 1 command byte | (rx) 1 status byte], and ignore the STATUS
+        # byte.
+        return self._submit(_ignore_response, COMMANDS['REUSE_TX_PL'])
+
+    def activate(self) -> None:
+        """Toggle the activation of the features in FEATURE, and DYNPD.
+
+        On the nRF24L01, FEATURE, DYNPD, R_RX_PL_WID, W_ACK_PAYLOAD, and
+        W_TX_PAYLOAD_NOACK only work once ACTIVATE has been sent, and sending
+        it again deactivates them. The nRF24L01+ doesn't need it.
+
+        Documentation:
+            See [1] Table 19 for the ACTIVATE command.
+        """
+        # [(tx) 1 command byte | (rx) 1 status byte] + (tx) 1 data byte, and
+        # ignore the STATUS byte.
+        return self._submit(
+            _ignore_response,
+            COMMANDS['ACTIVATE'],
+            ACTIVATE_FEATURES.to_bytes(1, 'big'),
+        )
 
     def r_rx_pl_wid(self) -> int:
         """Read, and return the width of the payload at the top of the RX FIFO.
@@ -471,124 +640,1218 @@ class nRF24L01:
         Documentation:
             See [1] Table 19 for the R_RX_PL_WID command.
         """
-        # Setup the uart data
-        command_byte = COMMANDS['R_RX_PL_WID'].to_bytes(1, 'big')
-        command_length = len(command_byte)  # 1 command byte
-        transfer_length = 2  # [(tx) 1 command byte | (rx) 1 status byte]
-        response_length = 2  # 1 status byte + 1 RX_PL_WID byte
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Read and return the receive payload width (Skip the STATUS byte).
-            uart_response = ser.read(response_length)[1:]
-            rx_pl_wid = int(uart_response)
-        return rx_pl_wid
-
-    def w_ack_payload(self, payload: bytes, pipe: int) -> None:
-        # TODO: This command is nonfunctoinal at the momoent, and it requires
-        # the logic for the pipe argument.
+        # [(tx) 1 command byte | (rx) 1 status byte] + (rx) 1 RX_PL_WID byte
+        # Return the receive payload width (Skip the STATUS byte).
+        return self._submit(
+            _rx_pl_wid,
+            COMMANDS['R_RX_PL_WID'],
+            transfer_length=2,
+            response_length=2,
+        )
+
+    def w_ack_payload(self, payload: bytes, pipe: int) -> int:
         """Write the payload to be transmitted together with the ACK packet.
 
+        The ACK payload is sent back with the acknowledgement of the next
+        packet that is received on the pipe. ACK payloads share the TX FIFO,
+        so at most three can be pending at once. Returns the STATUS byte; as
+        with W_TX_PAYLOAD, if TX_FULL was set, the payload was not written.
+        EN_ACK_PAY, and EN_DPL in FEATURE, and the DPL_Px bit of the pipe in
+        DYNPD must be set on both ends of the link.
+
         Keyword arguments:
             payload -- The data to be transmitted. Can be 32 bytes in length or
-            less. The payload must be of type <bytes>.
+            less. The payload is of type bytes (or any other bytes-like object).
             pipe -- The pipe to transmit the ACK payload to. The pipe is an
             integer in the range [0,5]
         Documentation:
-            See [1] Table 19 for the W_ACK_PAYLOAD command.
+            See [1] Table 19 for the W_ACK_PAYLOAD command, and Section 7.4.1
+            for ACK payloads.
         """
-        if type(payload) != bytes:
+        if not isinstance(payload, (bytes, bytearray, memoryview)):
             raise TypeError("Payload must be of type <bytes>.")
         if len(payload) > 32:
             raise ValueError("Payload must be 0-32 bytes in length.")
         if pipe < 0 or pipe > 5:
             raise ValueError("The specified pipe must be in rane [0,5].")
-        # Setup the uart data
-        command_byte = (COMMANDS['W_ACK_PAYLOAD'] | pipe).to_bytes(1, 'big')
-        # 1 command byte + payload bytes
-        command_length = len(command_byte) + len(payload)
-        # [(tx) 1 command byte | (rx) 1 status byte] + payload bytes
-        transfer_length = 1 + len(payload)
-        response_length = 0  # 1 status byte
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            # The pipe is or'd with the command byte. See [1] Section 8.3.1
-            # Table 19
-            ser.write(command_byte)
-            # Transmit the payload
-            ser.write(payload)
-            # Read any returned data. NOTE: Probably not needed as it returns 0
-            ser.read(response_length)
-
-    def w_tx_payload_noack(self, payload: bytes) -> None:
+        # [(tx) 1 command byte | (rx) 1 status byte] + (tx) payload bytes
+        # The pipe is or'd with the command byte. See [1] Section 8.3.1
+        # Table 19
+        return self._submit(
+            _status,
+            COMMANDS['W_ACK_PAYLOAD'] | pipe,
+            payload,
+            response_length=1,  # 1 status byte
+        )
+
+    def w_tx_payload_noack(self, payload: bytes) -> int:
         """Transmit the payload data with AUTOACK disabled on this packet.
 
+        Returns the STATUS register as it was before the payload was written.
+        If its TX_FULL bit is set, the TX FIFO had no room for the payload.
+        EN_DYN_ACK in FEATURE must be set.
+
         Keyword arguments:
             payload -- The data to be transmitted. Can be 32 bytes in length or
-            less. The payload must be of type <bytes>.
+            less. The payload is of type bytes (or any other bytes-like object).
         Documentation:
             See [1] Table 19 for the W_TX_PAYLOAD_NOACK command.
         """
-        if type(payload) != bytes:
+        if not isinstance(payload, (bytes, bytearray, memoryview)):
             raise TypeError("The payload data must be of type <bytes>.")
         if len(payload) > 32:
             raise ValueError("Payload must be 0-32 bytes in length.")
-        # Setup the uart data
-        command_byte = COMMANDS['W_TX_PAYLOAD_NOACK'].to_bytes(1, 'big')
-        # 1 command byte + payload bytes
-        command_length = len(command_byte) + len(payload)
         # [(tx) 1 command byte | (rx) 1 status byte] + (tx) payload bytes
-        transfer_length = 1 + len(payload)
-        response_length = 0  # None (Ignore the status byte)
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI transfer length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART reponse length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Transmit the payload
-            ser.write(payload)
-            # Read any returned data. NOTE: Probably not needed as it returns 0
-            ser.read(response_length)
-
-    def nop(self) -> None:
-        """No operation. Sends 0xFF to the nRF24L01.
+        return self._submit(
+            _status,
+            COMMANDS['W_TX_PAYLOAD_NOACK'],
+            payload,
+            response_length=1,  # 1 status byte
+        )
+
+    def nop(self) -> int:
+        """No operation. Sends 0xFF to the nRF24L01, and returns STATUS.
 
         Documentation:
             See [1] Table 19 for the NOP command.
         """
-        # Setup the UART data
-        command_byte = COMMANDS['NOP'].to_bytes(1, 'big')
-        command_length = len(command_byte)  # 1 command byte
-        transfer_length = 1  # [(tx) 1 command byte | (rx) 1 status byte]
-        response_length = 0  # Return nothing (Ignore the STATUS byte).
-        # Transceive the UART data
-        with serial.Serial(self.port, self.BAUD, timeout=1) as ser:
-            # Transmit the UART command length header
-            ser.write(command_length.to_bytes(1, 'big'))
-            # Transmit the SPI trans length header
-            ser.write(transfer_length.to_bytes(1, 'big'))
-            # Transmit the UART response length header
-            ser.write(response_length.to_bytes(1, 'big'))
-            # Transmit the command byte
-            ser.write(command_byte)
-            # Read any returned data. NOTE: Probably not needed as it returns 0
-            ser.read(response_length)
+        # [(tx) 1 command byte | (rx) 1 status byte]. Return the STATUS byte.
+        return self._submit(_status, COMMANDS['NOP'], response_length=1)
+
+
+# A single UART transaction, as it is passed to post-transaction hooks.
+# `start_ns` is when the transaction started, from `time.monotonic_ns()`. The
+# durations (ns) are of each phase: getting an open port (which only takes
+# any time when the port has to be opened), writing the frame(s), and waiting
+# for, and reading the response (which includes the device's turnaround).
+Transaction = collections.namedtuple(
+    'Transaction',
+    [
+        'start_ns',
+        'frame',
+        'response_length',
+        'response',
+        'open_ns',
+        'write_ns',
+        'read_ns',
+    ],
+)
+
+
+class TransactionStats:
+    """Counters, and per phase timing histograms of UART transactions.
+
+    e.g.
+
+        stats = TransactionStats()
+        stats.attach(nrf24l01)
+        ...
+        print(stats.summary())
+
+    The histograms count the durations of each phase (see `Transaction`) in
+    power of 2 buckets of microseconds.
+    """
+
+    PHASES = ['open', 'write', 'read']
+
+    def __init__(self):
+        self.transactions = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        # Transactions that expected a response, but got none at all, or
+        # only part of one, before the port timed out.
+        self.timeouts = 0
+        self.short_reads = 0
+        self.histograms = {
+            phase: collections.Counter() for phase in self.PHASES
+        }
+        self.totals_ns = {phase: 0 for phase in self.PHASES}
+
+    def attach(self, nrf24l01: 'nRF24L01') -> None:
+        nrf24l01.post_transaction_hooks.append(self.record)
+
+    def detach(self, nrf24l01: 'nRF24L01') -> None:
+        nrf24l01.post_transaction_hooks.remove(self.record)
+
+    def record(self, transaction: Transaction) -> None:
+        """Count a transaction. This is the post-transaction hook."""
+        self.transactions += 1
+        self.bytes_out += len(transaction.frame)
+        self.bytes_in += len(transaction.response)
+        if len(transaction.response) < transaction.response_length:
+            if transaction.response:
+                self.short_reads += 1
+            else:
+                self.timeouts += 1
+        for phase, duration in zip(
+            self.PHASES,
+            (transaction.open_ns, transaction.write_ns, transaction.read_ns),
+        ):
+            self.totals_ns[phase] += duration
+            # The bucket is the smallest power of 2 (us) above the duration.
+            self.histograms[phase][(duration // 1000).bit_length()] += 1
+
+    def summary(self) -> str:
+        lines = [
+            "Transactions: {0} ({1} bytes out, {2} bytes in, {3} timeouts, "
+            "{4} short reads)".format(
+                self.transactions,
+                self.bytes_out,
+                self.bytes_in,
+                self.timeouts,
+                self.short_reads,
+            )
+        ]
+        for phase in self.PHASES:
+            buckets = ', '.join(
+                '<{0}us: {1}'.format(1 << bucket, count)
+                for bucket, count in sorted(self.histograms[phase].items())
+            )
+            lines.append(
+                "{0:<5} {1:>10.3f} ms total  {2}".format(
+                    phase, self.totals_ns[phase] / 1e6, buckets
+                )
+            )
+        return '\n'.join(lines)
+
+
+# A summary of a stream of transmitted packets. See
+# `nRF24L01.transmit_stream()`. `ack_packets`, and `ack_payload_bytes` count
+# the ACK payloads that came back with the acknowledgements.
+StreamReport = collections.namedtuple(
+    'StreamReport',
+    [
+        'packets',
+        'payload_bytes',
+        'seconds',
+        'max_rt',
+        'ack_packets',
+        'ack_payload_bytes',
+    ],
+    defaults=[0, 0],
+)
+
+
+class nRF24L01(_CommandSet):
+    def __init__(self, port: str, cache: bool = False):
+        """Create a driver for the nRF24L01 behind the interface at a port.
+
+        Keyword arguments:
+            port -- The serial port of the interface board.
+            cache -- Keep a shadow copy of the register file, and serve reads
+            of the registers that are not VOLATILE from it instead of from the
+            device. Writes go through to the device, and update the copy. Only
+            enable this if nothing else is writing to the device at the same
+            time.
+        """
+        self.port = port
+        self.BAUD = 9600
+        self.TIMEOUT = 1
+        # The serial port that is held open for the duration of a session (See
+        # `open()`). Outside of a session, every command opens, and closes its
+        # own port.
+        self._serial = None
+        self._session = False
+        # The number of times that the serial port has been opened, and
+        # closed. These make it possible to verify that a session is actually
+        # reusing the port.
+        self.open_count = 0
+        self.close_count = 0
+        # Every command frame is encoded into this buffer before being sent.
+        self._frame = bytearray(MAX_FRAME_LENGTH)
+        self._frame_view = memoryview(self._frame)
+        # The shadow copy of the register file (See `r_register()`), and the
+        # number of reads that were served from it (hits), or that had to go
+        # to the device (misses). Each hit is a UART transaction saved.
+        self.cache = cache
+        self._shadow = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # The most recent value of the STATUS register. The nRF24L01 shifts
+        # STATUS out during every SPI exchange, so it is updated by every
+        # command that has a response. See [1] Section 8.3.1.
+        self.status = None
+        # Instrumentation hooks that are called before, and after every UART
+        # transaction. A pre-transaction hook is called with the frame(s), and
+        # the expected response length; a post-transaction hook is called with
+        # a `Transaction`. Transactions are only timed while there are hooks
+        # attached. See `TransactionStats`.
+        self.pre_transaction_hooks = []
+        self.post_transaction_hooks = []
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self) -> None:
+        """Start a session by opening the serial port, and keeping it open.
+
+        Every command that is issued during the session reuses the same port
+        instead of opening and closing its own. If the port drops during a
+        session (e.g. the USB adapter is unplugged), the failing command raises
+        the error, and the next command reopens the port.
+        """
+        self._session = True
+        self._connect()
+
+    def close(self) -> None:
+        """End the session, and close the serial port."""
+        self._session = False
+        self._disconnect()
+
+    def _connect(self) -> None:
+        # (Re)open the session port if it isn't already open.
+        if self._serial is None or not self._serial.is_open:
+            self._serial = self._open_serial()
+
+    def _open_serial(self):
+        import serial
+
+        ser = serial.Serial(self.port, self.BAUD, timeout=self.TIMEOUT)
+        self.open_count += 1
+        return ser
+
+    def _disconnect(self) -> None:
+        if self._serial is not None:
+            if self._serial.is_open:
+                self._serial.close()
+                self.close_count += 1
+            self._serial = None
+
+    @contextlib.contextmanager
+    def _port(self):
+        """Provide an open serial port for the duration of one command."""
+        if self._session:
+            # Reconnect if the port was dropped by a previous command.
+            self._connect()
+            try:
+                yield self._serial
+            except OSError:
+                # (serial.SerialException is an OSError.)
+                # The port has most likely gone away. Drop it so that the next
+                # command reconnects.
+                self._disconnect()
+                raise
+        else:
+            ser = self._open_serial()
+            try:
+                yield ser
+            finally:
+                ser.close()
+                self.close_count += 1
+
+    def _exchange(self, frame: bytes, response_length: int) -> bytes:
+        """Write one or more encoded frames, and read back their responses."""
+        if self.pre_transaction_hooks or self.post_transaction_hooks:
+            return self._instrumented_exchange(frame, response_length)
+        with self._port() as ser:
+            ser.write(frame)
+            return self._read(ser, len(frame), response_length)
+
+    def _instrumented_exchange(
+        self, frame: bytes, response_length: int
+    ) -> bytes:
+        """`_exchange()`, timing each phase of it for the hooks."""
+        for hook in self.pre_transaction_hooks:
+            hook(frame, response_length)
+        start = time.monotonic_ns()
+        with self._port() as ser:
+            opened = time.monotonic_ns()
+            ser.write(frame)
+            written = time.monotonic_ns()
+            response = self._read(ser, len(frame), response_length)
+            read = time.monotonic_ns()
+        transaction = Transaction(
+            start,
+            bytes(frame),
+            response_length,
+            response,
+            opened - start,
+            written - opened,
+            read - written,
+        )
+        for hook in self.post_transaction_hooks:
+            hook(transaction)
+        return response
+
+    def _read(self, ser, frame_length: int, response_length: int) -> bytes:
+        # Read the response to the frame(s) that were just written.
+        if response_length == 0:
+            return b''
+        # The port timeout covers a single command. A batch of several
+        # commands needs long enough to get all of them across the wire.
+        wire_time = (
+            2
+            * (frame_length + response_length)
+            * BITS_PER_UART_BYTE
+            / self.BAUD
+        )
+        if wire_time <= self.TIMEOUT:
+            return ser.read(response_length)
+        ser.timeout = wire_time
+        try:
+            return ser.read(response_length)
+        finally:
+            ser.timeout = self.TIMEOUT
+
+    def _submit(
+        self,
+        decode,
+        command_word: int,
+        payload: bytes = b'',
+        transfer_length: int = None,
+        response_length: int = 0,
+    ):
+        """Execute a command immediately, and return its decoded response."""
+        response = self._transceive(
+            command_word, payload, transfer_length, response_length
+        )
+        check_response(response, response_length)
+        if response:
+            self.status = response[0]
+        return decode(response)
+
+    def _transceive(
+        self,
+        command_word: int,
+        payload: bytes = b'',
+        transfer_length: int = None,
+        response_length: int = 0,
+    ) -> bytes:
+        """Send a single command frame, and return the response to it.
+
+        The frame is encoded into the preallocated frame buffer, and sent with
+        a single write so that it does not get split up into a separate
+        syscall (and USB packet) for each header.
+
+        Keyword arguments:
+            command_word -- The command word. See [1] Table 19.
+            payload -- The data bytes that follow the command word.
+            transfer_length -- The number of bytes to exchange over SPI.
+            Defaults to the length of the command word and the payload.
+            response_length -- The number of bytes of the SPI exchange to
+            return over UART, starting with the STATUS byte.
+        """
+        if transfer_length is None:
+            transfer_length = 1 + len(payload)
+        frame_length = encode_frame(
+            self._frame,
+            0,
+            command_word,
+            payload,
+            transfer_length,
+            response_length,
+        )
+        return self._exchange(self._frame_view[:frame_length], response_length)
+
+    def batch(self) -> 'Batch':
+        """Return a new batch of commands to be sent to this device at once.
+
+        See `Batch`.
+        """
+        return Batch(self)
+
+    def receiver(self, **kwargs) -> 'Receiver':
+        """Return a receive engine that polls this device for packets.
+
+        See `Receiver`.
+        """
+        return Receiver(self, **kwargs)
+
+    def r_register(self, register_name: str) -> bytes:
+        """Read the command and status registers, and return their contents.
+
+        If the cache is enabled, registers that are not VOLATILE are read from
+        the device once, and then served from the shadow copy.
+
+        Keyword arguments:
+            register_name -- The register that the requested data is to be read
+            from.
+        Documentation:
+            See [1] Table 19 for R_REGISTER.
+            See [1] Section 9.1 (Table 27) for the register names, and their
+            contents.
+        """
+        if self.cache and register_name in self._shadow:
+            self.cache_hits += 1
+            return self._shadow[register_name]
+        register_contents = super().r_register(register_name)
+        if self.cache and not REGISTERS[register_name].volatile:
+            self.cache_misses += 1
+            self._remember(register_name, register_contents)
+        return register_contents
+
+    def w_register(self, register_name: str, payload: bytes) -> None:
+        """Write data to a specified register
+
+        The write always goes through to the device. If the cache is enabled,
+        the shadow copy of the register is updated as well.
+
+        Keyword arguments:
+            register_name -- The register that data is to be written to. The
+            register name is of type string.
+            payload -- The data to be written to the register specified in
+            register_name. The payload data is of type bytes, and can be either
+            1 byte, or 5 bytes in length.
+        Documentation:
+            See [1] Table 19 for W_REGISTER command.
+            See [1] Section 9.1 (Table 27) for the register names, and their
+            contents.
+        """
+        super().w_register(register_name, payload)
+        self._remember(register_name, payload)
+
+    def invalidate_cache(self) -> None:
+        """Discard the shadow copy of the register file.
+
+        Use this after something other than this driver (e.g. a power cycle)
+        may have changed the registers.
+        """
+        self._shadow.clear()
+
+    def set_fields(self, register_name: str, **field_values) -> None:
+        """Change any number of bit mnemonics of a register with a single write.
+
+        The register is read (from the cache if it is enabled), each of the
+        specified fields is changed, and the result is written back once. If
+        nothing changed, the write is skipped.
+
+        Registers that are VOLATILE are not read first: the fields that are not
+        specified are written as 0. For STATUS, this means that only the
+        specified interrupt flags are cleared.
+
+        e.g. nrf24l01.set_fields('CONFIG', PWR_UP=1, PRIM_RX=0, EN_CRC=1)
+
+        Keyword arguments:
+            register_name -- The register that is to be changed.
+            field_values -- The new value of each bit mnemonic to be changed.
+        Documentation:
+            See [1] Section 9.1 (Table 27) for the register names, and their
+            contents.
+        """
+        if register_name not in REGISTERS:
+            raise KeyError("The specified register does not exist.")
+        register = REGISTERS[register_name]
+        for field_name in field_values:
+            if field_name not in register.fields:
+                raise KeyError(
+                    "{0} has no bit mnemonic {1}.".format(
+                        register_name, field_name
+                    )
+                )
+        if register.volatile:
+            current_value = None
+            register_value = 0
+        else:
+            current_value = int.from_bytes(
+                self.r_register(register_name), 'big'
+            )
+            register_value = current_value
+        for field_name, field_value in field_values.items():
+            register_value = register.fields[field_name].insert(
+                register_value, field_value
+            )
+        if register_value != current_value:
+            self.w_register(
+                register_name,
+                register_value.to_bytes(register.number_of_data_bytes, 'big'),
+            )
+
+    def transmit_stream(
+        self,
+        packets,
+        max_rt_limit: int = 16,
+        on_ack_payload=None,
+        noack: bool = False,
+        on_poll=None,
+    ) -> StreamReport:
+        """Stream packets through the TX FIFO, keeping it topped up.
+
+        Each packet is written as soon as it is available. The STATUS byte
+        returned by the write shows whether the TX FIFO had room for it: if
+        TX_FULL was set, the payload was dropped, so STATUS is polled with NOP
+        until there is room, and the packet is written again. Whenever the
+        maximum number of retransmits is reached (MAX_RT), the flag is cleared
+        so that the radio retries the packet at the head of the FIFO. Once all
+        of the packets are written, this waits for the TX FIFO to empty.
+
+        The radio must already be powered up in TX mode.
+
+        Keyword arguments:
+            packets -- An iterable of bytes-like packets, each up to 32 bytes
+            in length. Slices of a memoryview avoid copying the data.
+            max_rt_limit -- The number of MAX_RT events in a row, without a
+            packet getting through, after which the receiver is considered
+            gone, and a RuntimeError is raised.
+            on_ack_payload -- Called with each ACK payload that comes back
+            with the acknowledgements (see `w_ack_payload()`). Whenever a
+            STATUS byte shows RX_DR, the RX FIFO is drained, so that it never
+            fills up. EN_ACK_PAY, and EN_DPL in FEATURE, and DPL_P0 in DYNPD
+            must already be set.
+            noack -- Write the packets with W_TX_PAYLOAD_NOACK, so that they
+            are sent once each, without waiting for acknowledgements, or
+            retransmitting them. EN_DYN_ACK in FEATURE must already be set.
+            on_poll -- Called before each packet is written, and on each poll
+            while waiting for room in the TX FIFO, or for it to empty (e.g. to
+            change channels, see `nrf24l01_hopping`).
+        """
+        status_fields = REGISTERS['STATUS'].fields
+        tx_full = status_fields['TX_FULL'].mask
+        max_rt = status_fields['MAX_RT'].mask
+        rx_dr = status_fields['RX_DR'].mask
+        # The ACK payloads arrive in the RX FIFO, on pipe 0, with dynamic
+        # payload lengths.
+        ack_receiver = Receiver(self) if on_ack_payload is not None else None
+        tx_empty = REGISTERS['FIFO_STATUS'].fields['TX_EMPTY'].mask
+        number_of_packets = 0
+        payload_bytes = 0
+        max_rt_count = 0
+        # MAX_RT events since the last packet was accepted into the TX FIFO.
+        stalled_max_rt_count = 0
+
+        def clear_max_rt():
+            nonlocal max_rt_count, stalled_max_rt_count
+            max_rt_count += 1
+            stalled_max_rt_count += 1
+            if stalled_max_rt_count > max_rt_limit:
+                raise RuntimeError(
+                    "The maximum number of retransmits was reached {0} times "
+                    "in a row.".format(stalled_max_rt_count)
+                )
+            self.set_fields('STATUS', MAX_RT=1)
+
+        def collect_ack_payloads(status):
+            if ack_receiver is not None and status & rx_dr:
+                for _, ack_payload in ack_receiver.poll():
+                    on_ack_payload(ack_payload)
+
+        if on_poll is None:
+            on_poll = lambda: None
+        w_tx_payload = self.w_tx_payload_noack if noack else self.w_tx_payload
+        start = time.perf_counter()
+        for packet in packets:
+            on_poll()
+            status = w_tx_payload(packet)
+            collect_ack_payloads(status)
+            # The TX FIFO was full, so the payload was dropped. Wait until
+            # there is room, and try again.
+            while status & tx_full:
+                on_poll()
+                status = self.nop()
+                collect_ack_payloads(status)
+                if status & max_rt:
+                    clear_max_rt()
+                if not status & tx_full:
+                    status = w_tx_payload(packet)
+            stalled_max_rt_count = 0
+            number_of_packets += 1
+            payload_bytes += len(packet)
+        # Wait for the last of the packets to be transmitted.
+        while True:
+            on_poll()
+            fifo_status = int.from_bytes(self.r_register('FIFO_STATUS'), 'big')
+            collect_ack_payloads(self.status)
+            if fifo_status & tx_empty:
+                break
+            if self.status & max_rt:
+                clear_max_rt()
+        return StreamReport(
+            number_of_packets,
+            payload_bytes,
+            time.perf_counter() - start,
+            max_rt_count,
+            ack_receiver.packets if ack_receiver is not None else 0,
+            ack_receiver.payload_bytes if ack_receiver is not None else 0,
+        )
+
+    def scan_channels(self, channels, dwell: float = 0.0) -> list:
+        """Sample the received power detector (RPD) on each RF channel.
+
+        Returns the RPD bit (1 if a signal stronger than -64 dBm was present)
+        for each of the channels, in order. The read of RPD for one channel is
+        batched with the write of RF_CH for the next, so that a scan of N
+        channels costs N + 1 round trips rather than 2N. RF_CH is restored
+        afterwards.
+
+        The radio must already be powered up in RX mode.
+
+        Keyword arguments:
+            channels -- The RF channels to scan. [0,125]
+            dwell -- The time (s) to listen on each channel, on top of the
+            time that it takes to read RPD.
+        Documentation:
+            See [1] Section 6.4 for RPD.
+        """
+        rf_ch = REGISTERS['RF_CH'].fields['RF_CH']
+        rpd = REGISTERS['RPD'].fields['RPD']
+        original_rf_ch = self.r_register('RF_CH')
+        channels = list(channels)
+        readings = []
+        for index, channel in enumerate(channels):
+            with self.batch() as batch:
+                if index:
+                    readings.append(batch.r_register('RPD'))
+                batch.w_register(
+                    'RF_CH', rf_ch.insert(0, channel).to_bytes(1, 'big')
+                )
+            if dwell:
+                time.sleep(dwell)
+        if channels:
+            with self.batch() as batch:
+                readings.append(batch.r_register('RPD'))
+                batch.w_register('RF_CH', original_rf_ch)
+        return [rpd.extract(reading.result()[0]) for reading in readings]
+
+    def _remember(self, register_name: str, register_contents: bytes) -> None:
+        # Update the shadow copy of a register with its known contents.
+        if not self.cache or REGISTERS[register_name].volatile:
+            return
+        # A partial write, or a short read leaves the full contents of the
+        # register unknown.
+        if (
+            len(register_contents)
+            == REGISTERS[register_name].number_of_data_bytes
+        ):
+            self._shadow[register_name] = bytes(register_contents)
+        else:
+            self._shadow.pop(register_name, None)
+
+
+class Batch(_CommandSet):
+    """A batch of commands that are sent back-to-back, and answered in bulk.
+
+    Every command that is issued on a batch is queued, and returns a
+    `concurrent.futures.Future` for its result instead of blocking. When the
+    batch is executed, the frames of the queued commands are written to the
+    port together, and their responses are read back together, so that the
+    batch costs a round trip per run of frames (see below) rather than one
+    round trip per command.
+
+    A batch executes when its `with` block exits, e.g.
+
+        with nrf24l01.batch() as batch:
+            batch.w_register('RF_CH', b'\x10')
+            rf_ch = batch.r_register('RF_CH')
+        print(rf_ch.result())
+
+    Register reads in a batch always go to the device, and, like writes,
+    update the shadow copy of the register file if it is enabled.
+
+    NOTE: The interface firmware transmits its responses from within its UART
+    receive interrupt, so a frame that is written while a long response is
+    being sent overruns its receive buffer (see
+    MAX_PIPELINED_RESPONSE_LENGTH). The frames are therefore written in runs
+    that end at each command with a longer response (e.g. a payload, or a
+    multi-byte register), and each run is a round trip of its own. A batch
+    of single byte register reads, and writes is still a single round trip.
+    """
+
+    def __init__(self, device: nRF24L01):
+        # concurrent.futures is slow to import, so it is only imported once a
+        # batch is needed.
+        import concurrent.futures
+
+        self._future = concurrent.futures.Future
+        self._device = device
+        # Each queued command: (command_word, payload, transfer_length,
+        # response_length, decode, future)
+        self._queue = []
+
+    def __len__(self):
+        return len(self._queue)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.execute()
+
+    def r_register(self, register_name: str) -> 'concurrent.futures.Future':
+        future = super().r_register(register_name)
+        future.add_done_callback(
+            functools.partial(self._remember, register_name, None)
+        )
+        return future
+
+    def w_register(
+        self, register_name: str, payload: bytes
+    ) -> 'concurrent.futures.Future':
+        future = super().w_register(register_name, payload)
+        future.add_done_callback(
+            functools.partial(self._remember, register_name, payload)
+        )
+        return future
+
+    def _remember(
+        self,
+        register_name: str,
+        register_contents: bytes,
+        future: 'concurrent.futures.Future',
+    ) -> None:
+        # Update the device's shadow copy of a register once the command that
+        # read (register_contents is None), or wrote it has completed.
+        if future.exception() is not None:
+            return
+        if register_contents is None:
+            register_contents = future.result()
+        self._device._remember(register_name, register_contents)
+
+    def _submit(
+        self,
+        decode,
+        command_word: int,
+        payload: bytes = b'',
+        transfer_length: int = None,
+        response_length: int = 0,
+    ) -> 'concurrent.futures.Future':
+        """Queue up a command, and return the future of its response."""
+        if transfer_length is None:
+            transfer_length = 1 + len(payload)
+        future = self._future()
+        self._queue.append(
+            (
+                command_word,
+                bytes(payload),
+                transfer_length,
+                response_length,
+                decode,
+                future,
+            )
+        )
+        return future
+
+    def execute(self) -> list:
+        """Send every queued command, and return their results in order.
+
+        If the responses to a run of frames time out, every command that is
+        left fails with TimeoutError, which is then raised.
+        """
+        queue = self._queue
+        self._queue = []
+        results = []
+        for start, end in split_runs([command[3] for command in queue]):
+            try:
+                results.extend(self._execute_run(queue[start:end]))
+            except TimeoutError as error:
+                for *_, future in queue[start:]:
+                    future.set_exception(error)
+                raise
+        return results
+
+    def _execute_run(self, run: list) -> list:
+        # Send a run of frames with a single write, and read back their
+        # responses with a single read.
+        frame = bytearray(
+            sum(
+                FRAME_HEADER_LENGTH + 1 + len(payload) for _, payload, *_ in run
+            )
+        )
+        offset = 0
+        response_length = 0
+        for command_word, payload, transfer_length, length, _, _ in run:
+            offset = encode_frame(
+                frame, offset, command_word, payload, transfer_length, length
+            )
+            response_length += length
+        response = self._device._exchange(frame, response_length)
+        check_response(response, response_length)
+        # Split the bulk response back up into the response of each command.
+        results = []
+        offset = 0
+        for *_, length, decode, future in run:
+            try:
+                result = decode(response[offset : offset + length])
+            except Exception as error:
+                future.set_exception(error)
+                results.append(error)
+            else:
+                future.set_result(result)
+                results.append(result)
+            if length:
+                self._device.status = response[offset]
+            offset += length
+        return results
+
+
+class Receiver:
+    """Receive packets by polling the RX FIFO adaptively.
+
+    Iterating over a receiver yields each received packet as a tuple of
+    (pipe, payload). The RX FIFO is polled by reading FIFO_STATUS. While
+    packets are arriving, it is polled again straight away; while it is idle,
+    the time between polls backs off from `min_interval` up to
+    `max_interval`. Every wakeup drains the packets in the RX FIFO until
+    RX_EMPTY is set, but no more than FIFO_DEPTH of them, so that the ACK
+    payloads are topped up between them even if packets never stop arriving.
+    Each payload is read, and then FIFO_STATUS is read again to check for the
+    next one, so a static payload width costs two round trips per packet. The read of FIFO_STATUS can't be queued behind
+    the payload, since it would overrun the interface while the payload is
+    sent back (see `Batch`). A response that times out raises TimeoutError,
+    rather than being taken for a packet.
+
+    The radio must already be powered up in RX mode.
+
+    Keyword arguments:
+        device -- The nRF24L01 to receive from.
+        width -- The static payload width [1,32], or None to read the width of
+        each payload with R_RX_PL_WID (dynamic payload length).
+        min_interval -- The shortest time between polls, in seconds.
+        max_interval -- The longest time between polls, in seconds.
+        backoff -- The factor that the time between polls grows by for each
+        poll that finds the RX FIFO empty.
+        ack_payloads -- A mapping of pipes to iterables of bytes-like ACK
+        payloads (each up to 32 bytes), to send back with the
+        acknowledgements of the packets received on each pipe. Every poll
+        tops the TX FIFO up with them, taking turns between the pipes, so
+        that data flows back to the transmitter without it having to change
+        roles. A payload is only taken from its iterable once there is room
+        for it in the TX FIFO. EN_ACK_PAY, and EN_DPL in FEATURE, and the DPL_Px bits of the
+        pipes in DYNPD must already be set.
+        on_poll -- Called at the start of each poll (e.g. to change channels,
+        see `nrf24l01_hopping`).
+    Documentation:
+        See [1] Section 7.5.2 for the RX FIFO, Section 7.4.1 for ACK
+        payloads, and Appendix A for the recommended handling of RX_DR.
+    """
+
+    def __init__(
+        self,
+        device: nRF24L01,
+        width: int = None,
+        min_interval: float = 0.001,
+        max_interval: float = 0.05,
+        backoff: float = 2.0,
+        ack_payloads: dict = None,
+        on_poll=None,
+    ):
+        if width is not None and not 1 <= width <= 32:
+            raise ValueError("The payload width must be in the range [1,32].")
+        if not 0 < min_interval <= max_interval:
+            raise ValueError(
+                "The poll intervals must satisfy 0 < min_interval <= "
+                "max_interval."
+            )
+        self._device = device
+        self.width = width
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        # The iterator of ACK payloads of each pipe.
+        self._ack_payloads = {
+            pipe: iter(payloads)
+            for pipe, payloads in (ack_payloads or {}).items()
+        }
+        self._on_poll = on_poll
+        # Statistics.
+        self.polls = 0
+        self.packets = 0
+        self.payload_bytes = 0
+        self.ack_packets = 0
+        self.ack_payload_bytes = 0
+        self.started = None
+
+    def __iter__(self):
+        interval = self.min_interval
+        while True:
+            packets = self.poll()
+            if packets:
+                interval = self.min_interval
+                yield from packets
+            else:
+                time.sleep(interval)
+                interval = min(interval * self.backoff, self.max_interval)
+
+    def poll(self) -> list:
+        """Poll the RX FIFO once, and return every packet that was in it."""
+        device = self._device
+        if self.started is None:
+            self.started = time.perf_counter()
+        self.polls += 1
+        if self._on_poll is not None:
+            self._on_poll()
+        rx_empty = REGISTERS['FIFO_STATUS'].fields['RX_EMPTY'].mask
+        rx_p_no = REGISTERS['STATUS'].fields['RX_P_NO']
+        clear_rx_dr = (
+            REGISTERS['STATUS'].fields['RX_DR'].mask.to_bytes(1, 'big')
+        )
+        fifo_status = int.from_bytes(device.r_register('FIFO_STATUS'), 'big')
+        packets = []
+        while not fifo_status & rx_empty:
+            # The STATUS byte from the last read of FIFO_STATUS gives the pipe
+            # of the payload at the head of the RX FIFO.
+            pipe = rx_p_no.extract(device.status)
+            if self.width is None:
+                width = device.r_rx_pl_wid()
+                # A width of more than 32 bytes means that the payload was
+                # corrupted, and it must be flushed. See [1] Table 19.
+                if width > 32:
+                    device.flush_rx()
+                    break
+            else:
+                width = self.width
+            with device.batch() as batch:
+                if not packets:
+                    # Clear RX_DR before draining, so that it is set again if
+                    # another packet arrives in the meantime.
+                    batch.w_register('STATUS', clear_rx_dr)
+                payload = batch.r_rx_payload(width)
+            packets.append((pipe, payload.result()))
+            if len(packets) == FIFO_DEPTH:
+                break
+            fifo_status = int.from_bytes(
+                device.r_register('FIFO_STATUS'), 'big'
+            )
+        if self._ack_payloads:
+            self._preload_ack_payloads()
+        self.packets += len(packets)
+        self.payload_bytes += sum(len(payload) for _, payload in packets)
+        return packets
+
+    def _preload_ack_payloads(self) -> None:
+        # Write ACK payloads until the TX FIFO is full, or they run out. The
+        # STATUS byte from the last command shows whether there is any room.
+        # The TX FIFO only empties while this runs, so a payload that is
+        # written while TX_FULL is clear is never dropped.
+        device = self._device
+        tx_full = REGISTERS['STATUS'].fields['TX_FULL'].mask
+        status = device.status
+        while self._ack_payloads and not status & tx_full:
+            for pipe in list(self._ack_payloads):
+                payload = next(self._ack_payloads[pipe], None)
+                if payload is None:
+                    del self._ack_payloads[pipe]
+                    continue
+                # W_ACK_PAYLOAD returns the STATUS from before the write, so
+                # a NOP in the same round trip reads it again after.
+                with device.batch() as batch:
+                    batch.w_ack_payload(payload, pipe)
+                    status = batch.nop()
+                status = status.result()
+                self.ack_packets += 1
+                self.ack_payload_bytes += len(payload)
+                if status & tx_full:
+                    break
+
+    @property
+    def packets_per_second(self) -> float:
+        """The average rate at which packets have been received."""
+        if self.started is None:
+            return 0.0
+        elapsed = time.perf_counter() - self.started
+        return self.packets / elapsed if elapsed else 0.0
+
+    @property
+    def polls_per_packet(self) -> float:
+        """The number of polls made for each packet received."""
+        return self.polls / self.packets if self.packets else float(self.polls)
+
+
+class AsyncNRF24L01(_CommandSet):
+    """An asyncio interface to the nRF24L01 through the interface board.
+
+    Every command of the command set is a coroutine, e.g.
+
+        async with AsyncNRF24L01('/dev/ttyUSB0') as nrf24l01:
+            config = await nrf24l01.r_register('CONFIG')
+            async for pipe, payload in nrf24l01.receive(width=32):
+                ...
+
+    The port is opened as a non-blocking tty, and responses are read from the
+    event loop with `loop.add_reader()`, so no threads are involved, and
+    waiting on the device never blocks the event loop. Commands that are
+    awaited concurrently are sent one at a time, in the order they were
+    issued. Unlike `nRF24L01`, there is no register cache.
+
+    Keyword arguments:
+        port -- The path of the tty of the interface board (or of a pty).
+    """
+
+    BAUD = 9600
+    # The longest time (s) to wait for the response to a single command.
+    TIMEOUT = 1
+
+    def __init__(self, port: str):
+        self.port = port
+        self.status = None
+        self._fd = None
+        self._lock = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    async def open(self) -> None:
+        """Open the port, and configure it for the interface board."""
+        if self._fd is not None:
+            return
+        # termios, and tty are only available on POSIX.
+        import termios
+        import tty
+
+        fd = os.open(self.port, os.O_RDWR | os.O_NOCTTY | os.O_NONBLOCK)
+        try:
+            # 8N1 raw mode at the interface board's baud rate.
+            tty.setraw(fd)
+            attributes = termios.tcgetattr(fd)
+            speed = getattr(termios, 'B' + str(self.BAUD))
+            attributes[4] = attributes[5] = speed
+            termios.tcsetattr(fd, termios.TCSANOW, attributes)
+            termios.tcflush(fd, termios.TCIOFLUSH)
+        except BaseException:
+            os.close(fd)
+            raise
+        import asyncio
+
+        self._fd = fd
+        self._lock = asyncio.Lock()
+
+    def close(self) -> None:
+        """Close the port."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _submit(
+        self,
+        decode,
+        command_word: int,
+        payload: bytes = b'',
+        transfer_length: int = None,
+        response_length: int = 0,
+    ):
+        """Return a coroutine that executes a command."""
+        if transfer_length is None:
+            transfer_length = 1 + len(payload)
+        frame = bytearray(FRAME_HEADER_LENGTH + 1 + len(payload))
+        encode_frame(
+            frame, 0, command_word, payload, transfer_length, response_length
+        )
+        return self._execute(frame, response_length, decode)
+
+    async def _execute(self, frame: bytes, response_length: int, decode):
+        if self._fd is None:
+            await self.open()
+        async with self._lock:
+            response = await self._exchange(frame, response_length)
+        check_response(response, response_length)
+        if response:
+            self.status = response[0]
+        return decode(response)
+
+    async def _exchange(self, frame: bytes, response_length: int) -> bytes:
+        """Write a frame, and read back its response.
+
+        Like a serial port read with a timeout, this returns fewer bytes than
+        requested if the response does not arrive in time. The commands raise
+        TimeoutError when it does.
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        fd = self._fd
+        view = memoryview(frame)
+        while view:
+            try:
+                written = os.write(fd, view)
+            except BlockingIOError:
+                written = 0
+            view = view[written:]
+            if view:
+                # Wait for room in the output buffer.
+                writable = loop.create_future()
+                loop.add_writer(fd, writable.set_result, None)
+                try:
+                    await writable
+                finally:
+                    loop.remove_writer(fd)
+        if response_length == 0:
+            return b''
+        response = bytearray()
+        complete = loop.create_future()
+
+        def read():
+            try:
+                response.extend(os.read(fd, response_length - len(response)))
+            except BlockingIOError:
+                return
+            except OSError as error:
+                if not complete.done():
+                    complete.set_exception(error)
+                return
+            if len(response) >= response_length and not complete.done():
+                complete.set_result(None)
+
+        wire_time = (
+            2 * (len(frame) + response_length) * BITS_PER_UART_BYTE / self.BAUD
+        )
+        loop.add_reader(fd, read)
+        try:
+            await asyncio.wait_for(complete, max(self.TIMEOUT, wire_time))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(fd)
+        return bytes(response)
+
+    async def receive(
+        self,
+        width: int = None,
+        min_interval: float = 0.001,
+        max_interval: float = 0.05,
+        backoff: float = 2.0,
+    ):
+        """Asynchronously iterate over received packets as (pipe, payload).
+
+        The RX FIFO is polled, and drained, in the same way as `Receiver`,
+        except that the time between polls is spent awaiting, so that other
+        coroutines can run. The radio must already be powered up in RX mode.
+
+        If the interface stops responding, TimeoutError is raised.
+
+        Keyword arguments:
+            width -- The static payload width [1,32], or None to read the
+            width of each payload with R_RX_PL_WID (dynamic payload length).
+            min_interval -- The shortest time between polls, in seconds.
+            max_interval -- The longest time between polls, in seconds.
+            backoff -- The factor that the time between polls grows by for
+            each poll that finds the RX FIFO empty.
+        """
+        import asyncio
+
+        rx_empty = REGISTERS['FIFO_STATUS'].fields['RX_EMPTY'].mask
+        rx_p_no = REGISTERS['STATUS'].fields['RX_P_NO']
+        clear_rx_dr = (
+            REGISTERS['STATUS'].fields['RX_DR'].mask.to_bytes(1, 'big')
+        )
+        interval = min_interval
+        while True:
+            fifo_status = (await self.r_register('FIFO_STATUS'))[0]
+            if fifo_status & rx_empty:
+                await asyncio.sleep(interval)
+                interval = min(interval * backoff, max_interval)
+                continue
+            interval = min_interval
+            await self.w_register('STATUS', clear_rx_dr)
+            while not fifo_status & rx_empty:
+                pipe = rx_p_no.extract(self.status)
+                payload_width = width
+                if payload_width is None:
+                    payload_width = await self.r_rx_pl_wid()
+                    # A width of more than 32 bytes means that the payload was
+                    # corrupted, and it must be flushed. See [1] Table 19.
+                    if payload_width > 32:
+                        await self.flush_rx()
+                        break
+                payload = await self.r_rx_payload(payload_width)
+                fifo_status = (await self.r_register('FIFO_STATUS'))[0]
+                yield pipe, payload
 
 
 # TODO: Add an option to the command functions `return_status=False`, if true,
@@ -0,0 +1,276 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# A resident daemon that owns the serial port of an interface board, and runs
+# commands on behalf of clients that connect to it over a Unix domain socket.
+#
+# The daemon handles one request at a time, so access to the interface board
+# is serialised, and two commands can never interleave their frames. Since the
+# port, and the register cache stay open across requests, a client only pays
+# for the command itself.
+#
+# Every message is a single line of JSON. A client sends one request:
+#   {"argv": [...], "cwd": "..."}
+# and the daemon replies with any number of
+#   {"stdout": "..."} or {"stderr": "..."}
+# messages as the command produces text, or
+#   {"stdout_bytes": "<base64>"} or {"stderr_bytes": "<base64>"}
+# messages as it writes binary data to `sys.stdout.buffer`, or
+# `sys.stderr.buffer`, followed by
+#   {"exit": <exit status>}
+#
+# The client sends nothing after its request, so the connection only becomes
+# readable once the client has closed it (e.g. it was interrupted). While a
+# command is running, the connection is watched for that, and the command is
+# interrupted with a KeyboardInterrupt, just as it would be if it was running
+# in the client, so that the daemon moves on to the next request.
+################################################################################
+import base64
+import contextlib
+import io
+import json
+import os
+import select
+import socket
+import sys
+import threading
+import _thread
+
+
+# How often (s) the connection is checked for the client going away.
+WATCH_INTERVAL = 0.1
+
+
+def socket_path(port: str) -> str:
+    """Return the default path of the socket of the daemon for a port."""
+    # NOTE: tempfile.gettempdir() is not used, since importing tempfile adds
+    # noticeably to the start up time of every client.
+    return os.path.join(
+        os.environ.get('TMPDIR', '/tmp'),
+        'nrf24l01-{0}.sock'.format(os.path.basename(port)),
+    )
+
+
+class _MessageStream(io.TextIOBase):
+    """A line buffered text stream that forwards its text to a client."""
+
+    def __init__(self, connection_file, key: str):
+        self._file = connection_file
+        self._key = key
+        self._buffer = []
+        self.buffer = _BinaryMessageStream(self)
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        self._buffer.append(text)
+        if '\n' in text:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        text = ''.join(self._buffer)
+        self._buffer = []
+        if text:
+            _send(self._file, {self._key: text})
+
+
+class _BinaryMessageStream(io.RawIOBase):
+    """The binary `buffer` of a _MessageStream, which forwards bytes."""
+
+    def __init__(self, text_stream: _MessageStream):
+        self._text_stream = text_stream
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        # Keep the order of the text that was written before.
+        self._text_stream.flush()
+        if data:
+            _send(
+                self._text_stream._file,
+                {
+                    self._text_stream._key
+                    + '_bytes': base64.b64encode(data).decode()
+                },
+            )
+        return len(data)
+
+
+def _send(connection_file, message: dict) -> None:
+    connection_file.write(json.dumps(message).encode() + b'\n')
+    connection_file.flush()
+
+
+def serve(path: str, run) -> None:
+    """Serve requests on a Unix domain socket until interrupted.
+
+    Keyword arguments:
+        path -- The path of the socket. A stale socket left behind by a daemon
+        that is no longer running is replaced.
+        run -- Called with the argv of each request, with stdout, and stderr
+        redirected to the client, and the working directory changed to that
+        of the client. Its return value, or the code of the SystemExit that it
+        raises, is the exit status that is sent back.
+    """
+    if os.path.exists(path):
+        client = _connect(path)
+        if client is not None:
+            client.close()
+            raise RuntimeError(
+                "A daemon is already listening on {0}.".format(path)
+            )
+        os.unlink(path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(path)
+        os.chmod(path, 0o600)
+        server.listen()
+        while True:
+            connection, _ = server.accept()
+            try:
+                with connection, connection.makefile('rwb') as connection_file:
+                    _handle(connection, connection_file, run)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client went away (e.g. it was interrupted) before the
+                # command finished. Closing the connection also flushes any
+                # output that was left over.
+                pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def _watch(connection, finished, disconnected, lock) -> None:
+    # Interrupt the command that is running once the client has gone.
+    while not finished.is_set():
+        readable, _, _ = select.select([connection], [], [], WATCH_INTERVAL)
+        if readable:
+            with lock:
+                if not finished.is_set():
+                    disconnected.set()
+                    _thread.interrupt_main()
+            return
+
+
+def _handle(connection, connection_file, run) -> None:
+    request = json.loads(connection_file.readline())
+    cwd = os.getcwd()
+    stdout = _MessageStream(connection_file, 'stdout')
+    stderr = _MessageStream(connection_file, 'stderr')
+    status = 0
+    finished = threading.Event()
+    disconnected = threading.Event()
+    # Held while the watcher interrupts the command, so that it can't do so
+    # once the command has finished.
+    lock = threading.Lock()
+    threading.Thread(
+        target=_watch,
+        args=(connection, finished, disconnected, lock),
+        daemon=True,
+    ).start()
+    try:
+        os.chdir(request.get('cwd', cwd))
+        with contextlib.redirect_stdout(stdout):
+            with contextlib.redirect_stderr(stderr):
+                try:
+                    try:
+                        status = run(request['argv']) or 0
+                    finally:
+                        with lock:
+                            finished.set()
+                except SystemExit as exit:
+                    status = exit.code if isinstance(exit.code, int) else 1
+                    if isinstance(exit.code, str):
+                        print(exit.code, file=sys.stderr)
+                except (BrokenPipeError, ConnectionResetError):
+                    raise
+                except KeyboardInterrupt:
+                    # Only the client going away stops the command, rather
+                    # than the daemon.
+                    if not disconnected.is_set():
+                        raise
+                    raise ConnectionResetError(
+                        "The client closed the connection."
+                    ) from None
+                except Exception as error:
+                    print(
+                        "{0}: {1}".format(type(error).__name__, error),
+                        file=sys.stderr,
+                    )
+                    status = 1
+    finally:
+        os.chdir(cwd)
+    if disconnected.is_set():
+        raise ConnectionResetError("The client closed the connection.")
+    stdout.flush()
+    stderr.flush()
+    _send(connection_file, {'exit': status})
+
+
+def _connect(path: str):
+    # Connect to the daemon on a socket, or return None if there isn't one.
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        client.connect(path)
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def forward(path: str, argv: list):
+    """Run a command on the daemon at `path`, if there is one.
+
+    The output of the command is written to stdout, and stderr as it arrives.
+    Returns the exit status of the command, or None if no daemon is listening
+    on the socket.
+    """
+    if not os.path.exists(path):
+        return None
+    client = _connect(path)
+    if client is None:
+        return None
+    with client, client.makefile('rwb') as connection_file:
+        _send(connection_file, {'argv': argv, 'cwd': os.getcwd()})
+        for line in connection_file:
+            message = json.loads(line)
+            if 'stdout' in message:
+                sys.stdout.write(message['stdout'])
+                sys.stdout.flush()
+            elif 'stdout_bytes' in message:
+                sys.stdout.buffer.write(
+                    base64.b64decode(message['stdout_bytes'])
+                )
+                sys.stdout.buffer.flush()
+            elif 'stderr' in message:
+                sys.stderr.write(message['stderr'])
+            elif 'stderr_bytes' in message:
+                sys.stderr.flush()
+                sys.stderr.buffer.write(
+                    base64.b64decode(message['stderr_bytes'])
+                )
+            elif 'exit' in message:
+                sys.stdout.flush()
+                return message['exit']
+    raise ConnectionError("The daemon closed the connection unexpectedly.")
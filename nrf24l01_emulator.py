@@ -0,0 +1,460 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Documentation:
+# 1. [nRF24L01 Datasheet](<project_directory>/nRF24L01-datasheet.pdf)
+# 2. [Interface firmware](<project_directory>/interface-firmware/src/atmega328p/atmega328p.c)
+################################################################################
+# A software stand-in for the interface board and the nRF24L01 behind it. The
+# emulator opens a pseudo-terminal, and speaks the same framing as the
+# interface firmware [2]: a command length header, an SPI transfer length
+# header, a response length header, and then the command bytes. The radio
+# itself is modelled from REGISTERS: the register file, the 3 level TX, and
+# RX FIFOs, and the STATUS flags.
+#
+# Like the firmware, the emulator sends each response before it receives
+# anything else, so frames that are written behind a long response lose the
+# bytes that the UART can't hold in the meantime (see UART_RX_BUFFER_LENGTH).
+################################################################################
+import argparse
+import os
+import random
+import select
+import threading
+import time
+import tty
+from nrf24l01_control import (
+    BITS_PER_UART_BYTE,
+    COMMANDS,
+    REGISTER_NAMES,
+    REGISTERS,
+)
+
+# The depth of the TX, and RX FIFOs. See [1] Section 7.5.
+FIFO_DEPTH = 3
+# The size of the firmware's command, and SPI buffers. See [2].
+BUFFER_LENGTH = 33
+# The number of incoming bytes that the ATmega328P's UART can hold (the
+# receive shift register, and its 2 byte buffer) while the firmware is busy
+# sending a response from within its receive interrupt. See [2].
+UART_RX_BUFFER_LENGTH = 3
+
+# STATUS bits. See [1] Section 9.1 Table 27.
+RX_DR = REGISTERS['STATUS'].fields['RX_DR'].mask
+TX_DS = REGISTERS['STATUS'].fields['TX_DS'].mask
+MAX_RT = REGISTERS['STATUS'].fields['MAX_RT'].mask
+# The registers that can't be written to.
+READ_ONLY_REGISTERS = ['OBSERVE_TX', 'RPD', 'FIFO_STATUS']
+
+
+class Emulator:
+    """An emulated interface board, and nRF24L01, behind a pseudo-terminal.
+
+    Open `emulator.port` with the driver as if it were the interface board's
+    serial port, e.g.
+
+        with Emulator() as emulator:
+            with nRF24L01(emulator.port) as nrf24l01:
+                nrf24l01.r_register('CONFIG')
+
+    Packets that are transmitted over the air are delivered to a linked peer
+    emulator (see `link()`), or are otherwise acknowledged by an ideal
+    receiver. Over the air time is not modelled.
+    """
+
+    def __init__(
+        self,
+        baud: int = None,
+        loss: float = 0.0,
+        noise: dict = None,
+        seed: int = None,
+    ):
+        """Create an emulated interface board on a new pseudo-terminal.
+
+        Keyword arguments:
+            baud -- If specified, delay every byte as if it were sent over a
+            UART at this baud rate, so that latency figures are realistic.
+            loss -- The probability, in the range [0,1], that any single
+            over-the-air transmission attempt is lost.
+            noise -- A dictionary of RF channels to the probability that the
+            received power detector fires on them.
+            seed -- Seed for the random number generator that drives the loss,
+            and noise models.
+        """
+        self.baud = baud
+        self.loss = loss
+        self.noise = noise if noise is not None else {}
+        self.random = random.Random(seed)
+        # The emulator that receives what this one transmits. When there is no
+        # peer, transmitted packets are acknowledged by an ideal receiver.
+        self.peer = None
+        self.registers = {}
+        self.reset()
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+        # The framing state of the emulated firmware. See [2] ISR(USART_RX_vect).
+        self._header = []
+        self._command = bytearray()
+        self._spi_data = bytearray(BUFFER_LENGTH)
+        # The number of frames that have been handled, and the number of
+        # incoming bytes that were lost to UART overruns.
+        self.frame_count = 0
+        self.overrun_bytes = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def reset(self) -> None:
+        """Restore the register file, and FIFOs to their power on state."""
+        for register_name, register in REGISTERS.items():
+            self.registers[register_name] = bytearray(
+                register.reset_value.to_bytes(
+                    register.number_of_data_bytes, 'big'
+                )
+            )
+        # Interrupt flags of the STATUS register.
+        self.flags = 0
+        # Each RX FIFO entry is a (pipe, payload) pair.
+        self.rx_fifo = []
+        # Each TX FIFO entry is a (payload, acknowledge) pair.
+        self.tx_fifo = []
+        self.tx_reuse = False
+        # Pending ACK payloads for each pipe.
+        self.ack_payloads = {pipe: [] for pipe in range(6)}
+        self.plos_cnt = 0
+        self.arc_cnt = 0
+
+    def link(self, peer: 'Emulator') -> None:
+        """Link two emulators so that each one receives what the other sends."""
+        self.peer = peer
+        peer.peer = self
+        # Share a single lock so that a transmission can safely reach into the
+        # peer's FIFOs.
+        peer._lock = self._lock
+
+    def start(self) -> None:
+        """Start serving the pseudo-terminal in a background thread."""
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving, and close the pseudo-terminal."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for fd in (self._master, self._slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def inject(self, payload: bytes, pipe: int = 0) -> bool:
+        """Place a packet in the RX FIFO as if it was received over the air.
+
+        Returns False if the RX FIFO was full, and the packet was dropped.
+        """
+        with self._lock:
+            return self._receive(payload, pipe)
+
+    ############################################################################
+    # UART framing.
+    def _serve(self) -> None:
+        while self._running:
+            readable, _, _ = select.select([self._master], [], [], 0.05)
+            if not readable:
+                continue
+            try:
+                data = bytearray(os.read(self._master, 4096))
+            except OSError:
+                break
+            index = 0
+            while index < len(data):
+                response_length = self._uart_receive(data[index])
+                index += 1
+                # The rest of the data was written back-to-back, so it keeps
+                # arriving while the response is sent, and whatever the UART
+                # can't hold in the meantime is lost. Data that is written
+                # later is assumed to arrive once the response is done.
+                start = index + UART_RX_BUFFER_LENGTH
+                end = index + response_length + 1
+                if start < min(end, len(data)):
+                    self.overrun_bytes += min(end, len(data)) - start
+                    del data[start:end]
+
+    def _uart_receive(self, byte: int) -> int:
+        # The firmware's receive interrupt, for a single byte. See [2].
+        # Returns the length of the response that was sent, if the byte
+        # completed a frame. Like the firmware, nothing else is received
+        # while the response is sent (see `_serve()`).
+        if self.baud:
+            time.sleep(BITS_PER_UART_BYTE / self.baud)
+        if len(self._header) < 3:
+            self._header.append(byte)
+            return 0
+        else:
+            self._command.append(byte)
+            if len(self._command) < self._header[0]:
+                return 0
+        command_length, transfer_length, response_length = self._header
+        self._header = []
+        command = bytes(self._command)
+        self._command = bytearray()
+        with self._lock:
+            spi_data = self._spi_transfer(command, transfer_length)
+            self.frame_count += 1
+        self._spi_data[: len(spi_data)] = spi_data
+        response = bytes(self._spi_data[:response_length])
+        if self.baud:
+            time.sleep(len(response) * BITS_PER_UART_BYTE / self.baud)
+        if response:
+            os.write(self._master, response)
+        return len(response)
+
+    ############################################################################
+    # The radio.
+    def _register_value(self, register_name: str) -> int:
+        return int.from_bytes(self.registers[register_name], 'big')
+
+    def _field(self, register_name: str, field_name: str) -> int:
+        return (
+            REGISTERS[register_name]
+            .fields[field_name]
+            .extract(self._register_value(register_name))
+        )
+
+    def _status(self) -> int:
+        if self.rx_fifo:
+            rx_p_no = self.rx_fifo[0][0]
+        else:
+            rx_p_no = 0b111
+        tx_full = 1 if self._tx_fifo_level() == FIFO_DEPTH else 0
+        return self.flags | rx_p_no << 1 | tx_full
+
+    def _tx_fifo_level(self) -> int:
+        # ACK payloads are held in the TX FIFO too.
+        return len(self.tx_fifo) + sum(
+            len(payloads) for payloads in self.ack_payloads.values()
+        )
+
+    def _update_read_only_registers(self) -> None:
+        self.registers['STATUS'][0] = self._status()
+        self.registers['OBSERVE_TX'][0] = self.plos_cnt << 4 | self.arc_cnt
+        self.registers['FIFO_STATUS'][0] = (
+            (1 if self.tx_reuse else 0) << 6
+            | (1 if self._tx_fifo_level() == FIFO_DEPTH else 0) << 5
+            | (1 if not self._tx_fifo_level() else 0) << 4
+            | (1 if len(self.rx_fifo) == FIFO_DEPTH else 0) << 1
+            | (1 if not self.rx_fifo else 0)
+        )
+        rpd = 0
+        if self._field('CONFIG', 'PWR_UP') and self._field('CONFIG', 'PRIM_RX'):
+            channel = self._register_value('RF_CH')
+            if self.random.random() < self.noise.get(channel, 0.0):
+                rpd = 1
+        self.registers['RPD'][0] = rpd
+
+    def _spi_transfer(self, command: bytes, transfer_length: int) -> bytes:
+        """Clock a command into the radio, and return what it clocks out."""
+        # Short commands are padded with whatever is left over in the
+        # firmware's command buffer; zeros are close enough.
+        mosi = command[:transfer_length].ljust(transfer_length, b'\x00')
+        self._update_read_only_registers()
+        miso = bytearray(transfer_length)
+        if transfer_length == 0:
+            return miso
+        miso[0] = self._status()
+        command_word = mosi[0]
+        data = mosi[1:]
+        if command_word & 0xE0 == COMMANDS['R_REGISTER']:
+            register_name = REGISTER_NAMES.get(command_word & 0x1F)
+            if register_name is not None:
+                value = self.registers[register_name]
+                miso[1:] = value[: len(data)].ljust(len(data), b'\x00')
+        elif command_word & 0xE0 == COMMANDS['W_REGISTER']:
+            register_name = REGISTER_NAMES.get(command_word & 0x1F)
+            if register_name is not None:
+                self._write_register(register_name, data)
+        elif command_word == COMMANDS['R_RX_PAYLOAD']:
+            if self.rx_fifo:
+                _, payload = self.rx_fifo.pop(0)
+                miso[1:] = payload[: len(data)].ljust(len(data), b'\x00')
+        elif command_word == COMMANDS['R_RX_PL_WID']:
+            if self.rx_fifo and len(miso) > 1:
+                miso[1] = len(self.rx_fifo[0][1])
+        elif command_word in (
+            COMMANDS['W_TX_PAYLOAD'],
+            COMMANDS['W_TX_PAYLOAD_NOACK'],
+        ):
+            if self._tx_fifo_level() < FIFO_DEPTH:
+                acknowledge = command_word == COMMANDS['W_TX_PAYLOAD'] or not (
+                    self._field('FEATURE', 'EN_DYN_ACK')
+                )
+                self.tx_fifo.append((bytes(data), acknowledge))
+                self.tx_reuse = False
+        elif command_word & 0xF8 == COMMANDS['W_ACK_PAYLOAD']:
+            pipe = command_word & 0x07
+            if pipe <= 5 and self._tx_fifo_level() < FIFO_DEPTH:
+                self.ack_payloads[pipe].append(bytes(data))
+        elif command_word == COMMANDS['FLUSH_TX']:
+            self.tx_fifo = []
+            self.ack_payloads = {pipe: [] for pipe in range(6)}
+            self.tx_reuse = False
+        elif command_word == COMMANDS['FLUSH_RX']:
+            self.rx_fifo = []
+        elif command_word == COMMANDS['REUSE_TX_PL']:
+            self.tx_reuse = True
+        self._air()
+        return miso
+
+    def _write_register(self, register_name: str, data: bytes) -> None:
+        if register_name in READ_ONLY_REGISTERS:
+            return
+        if register_name == 'STATUS':
+            # The interrupt flags are cleared by writing 1 to them.
+            if data:
+                self.flags &= ~(data[0] & (RX_DR | TX_DS | MAX_RT))
+            return
+        register = self.registers[register_name]
+        register[: len(data)] = data[: len(register)]
+        if register_name == 'RF_CH':
+            # Writing RF_CH resets the lost packet counter. See [1] Table 27.
+            self.plos_cnt = 0
+
+    def _pipe_for_address(self, address: bytes):
+        # Find the enabled pipe that listens on the given address, if any.
+        # Pipes 2-5 share the upper bytes of pipe 1. See [1] Section 7.6.
+        en_rxaddr = self._register_value('EN_RXADDR')
+        for pipe in range(6):
+            if not en_rxaddr & (1 << pipe):
+                continue
+            if pipe < 2:
+                pipe_address = bytes(self.registers['RX_ADDR_P' + str(pipe)])
+            else:
+                pipe_address = bytes(self.registers['RX_ADDR_P1'][:-1]) + bytes(
+                    self.registers['RX_ADDR_P' + str(pipe)]
+                )
+            if pipe_address == address:
+                return pipe
+        return None
+
+    def _listening(self, channel: int) -> bool:
+        return (
+            self._field('CONFIG', 'PWR_UP') == 1
+            and self._field('CONFIG', 'PRIM_RX') == 1
+            and self._register_value('RF_CH') == channel
+        )
+
+    def _receive(self, payload: bytes, pipe: int) -> bool:
+        if len(self.rx_fifo) == FIFO_DEPTH:
+            return False
+        self.rx_fifo.append((pipe, bytes(payload)))
+        self.flags |= RX_DR
+        return True
+
+    def _air(self) -> None:
+        """Transmit everything in the TX FIFO if the radio is in TX mode."""
+        if not (
+            self._field('CONFIG', 'PWR_UP') == 1
+            and self._field('CONFIG', 'PRIM_RX') == 0
+        ):
+            return
+        while self.tx_fifo and not self.flags & MAX_RT:
+            payload, acknowledge = self.tx_fifo[0]
+            if not self._transmit(payload, acknowledge):
+                self.flags |= MAX_RT
+                self.plos_cnt = min(self.plos_cnt + 1, 0x0F)
+                break
+            self.flags |= TX_DS
+            if not self.tx_reuse:
+                self.tx_fifo.pop(0)
+            else:
+                break
+
+    def _transmit(self, payload: bytes, acknowledge: bool) -> bool:
+        # Transmit a single packet, and return whether it was acknowledged.
+        attempts = 1 + self._field('SETUP_RETR', 'ARC') if acknowledge else 1
+        channel = self._register_value('RF_CH')
+        address = bytes(self.registers['TX_ADDR'])
+        for attempt in range(attempts):
+            self.arc_cnt = attempt
+            if self.random.random() < self.loss:
+                continue
+            if self.peer is None:
+                # An ideal receiver on the other end.
+                return True
+            if not self.peer._listening(channel):
+                continue
+            pipe = self.peer._pipe_for_address(address)
+            if pipe is None or not self.peer._receive(payload, pipe):
+                continue
+            if not acknowledge:
+                return True
+            ack_payloads = self.peer.ack_payloads[pipe]
+            if ack_payloads and self.peer._field('FEATURE', 'EN_ACK_PAY'):
+                # The ACK payload is only released once it is received.
+                if self._receive(ack_payloads[0], 0):
+                    ack_payloads.pop(0)
+                    self.peer.flags |= TX_DS
+            return True
+        return not acknowledge
+
+
+def get_args():
+    parser = argparse.ArgumentParser(
+        description="Emulate the nRF24L01 interface board on a pseudo-terminal."
+    )
+    parser.add_argument('--baud', action='store', type=int, default=None)
+    parser.add_argument('--loss', action='store', type=float, default=0.0)
+    parser.add_argument('--seed', action='store', type=int, default=None)
+    # Make the received power detector fire on a channel with the given
+    # probability, e.g. --noise 40=0.5
+    parser.add_argument(
+        '--noise', action='append', default=[], metavar='CHANNEL=PROBABILITY'
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = get_args()
+    noise = {}
+    for setting in args.noise:
+        channel, probability = setting.split('=')
+        noise[int(channel)] = float(probability)
+    with Emulator(
+        baud=args.baud, loss=args.loss, noise=noise, seed=args.seed
+    ) as emulator:
+        print(emulator.port, flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,203 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Forward error correction for streams of packets that are sent without
+# acknowledgements.
+#
+# The packets are sent in groups of up to `group_size` DATA packets, each
+# followed by a PARITY packet that is the XOR of the data in the group. The
+# receiver can rebuild any one packet of a group that is lost from the others,
+# at the cost of 1 extra packet per group. Every packet starts with a 2 byte
+# header:
+#
+#   group number (1 byte, wraps around) | index (1 byte) | data
+#
+# The index of a DATA packet is its position in the group. The index of a
+# PARITY packet has PARITY_FLAG set, and holds the number of DATA packets in
+# the group (which is only less than `group_size` for the last group). All of
+# the packets in a stream carry the same amount of data.
+################################################################################
+import collections
+import struct
+
+FEC_HEADER = struct.Struct('<BB')
+PARITY_FLAG = 0x80
+# The group number wraps around at this.
+GROUPS = 1 << 8
+MAX_GROUP_SIZE = PARITY_FLAG - 1
+
+# The counts of a FecDecoder. `recovered` is the number of DATA packets that
+# were rebuilt from the parity, and `lost` the number that couldn't be.
+# `lost_unknown` is set if the stream ended in a group whose PARITY packet was
+# lost, so any DATA packets lost from the end of it weren't counted.
+FecReport = collections.namedtuple(
+    'FecReport', ['packets', 'recovered', 'lost', 'lost_unknown']
+)
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    return (int.from_bytes(a, 'big') ^ int.from_bytes(b, 'big')).to_bytes(
+        len(a), 'big'
+    )
+
+
+def _check_group_size(group_size: int) -> None:
+    if not 1 <= group_size <= MAX_GROUP_SIZE:
+        raise ValueError(
+            "The FEC group size must be in the range [1,{0}].".format(
+                MAX_GROUP_SIZE
+            )
+        )
+
+
+def fec_encode(packets, group_size: int):
+    """Add a header to each packet, and a PARITY packet after each group.
+
+    Keyword arguments:
+        packets -- An iterable of bytes-like packets that are all the same
+        length, and at most FEC_HEADER.size bytes less than the payload
+        width.
+        group_size -- The number of DATA packets in each group.
+    """
+    _check_group_size(group_size)
+    group = 0
+    index = 0
+    parity = None
+    for packet in packets:
+        yield FEC_HEADER.pack(group, index) + packet
+        parity = bytes(packet) if parity is None else _xor(parity, packet)
+        index += 1
+        if index == group_size:
+            yield FEC_HEADER.pack(group, PARITY_FLAG | index) + parity
+            group = (group + 1) % GROUPS
+            index = 0
+            parity = None
+    if index:
+        yield FEC_HEADER.pack(group, PARITY_FLAG | index) + parity
+
+
+class FecDecoder:
+    """Rebuild the lost packets of a stream that was sent with `fec_encode()`.
+
+    e.g.
+
+        decoder = FecDecoder(group_size=8)
+        for packet in received_packets:
+            for data in decoder.feed(packet):
+                ...
+        for data in decoder.flush():
+            ...
+
+    The data of each group is returned in order once the group is complete
+    (its PARITY packet arrives, or a packet of a later group does). A group
+    that is missing more than one DATA packet is returned with gaps.
+
+    Only the last group can be shorter than `group_size`, so a group whose
+    PARITY packet is lost is known to be full if a later group arrives. If
+    the stream ends in such a group, its length isn't known, so the packets
+    after the last one that arrived aren't counted as lost, and
+    `lost_unknown` is set instead.
+
+    Keyword arguments:
+        group_size -- The number of DATA packets in each group. It must match
+        the sender.
+    """
+
+    def __init__(self, group_size: int):
+        _check_group_size(group_size)
+        self.group_size = group_size
+        # The group in progress, and the group that is expected next.
+        self._group = None
+        self._next_group = None
+        self._data = {}
+        self._parity = None
+        self._count = None
+        # Statistics.
+        self.packets = 0
+        self.recovered = 0
+        self.lost = 0
+        self.lost_unknown = False
+
+    def report(self) -> FecReport:
+        return FecReport(
+            self.packets, self.recovered, self.lost, self.lost_unknown
+        )
+
+    def feed(self, packet: bytes) -> list:
+        """Take a received packet, and return the data that is now complete."""
+        if len(packet) < FEC_HEADER.size:
+            return []
+        self.packets += 1
+        group, index = FEC_HEADER.unpack_from(packet)
+        completed = []
+        if self._group is not None and group != self._group:
+            completed = self._complete(full=True)
+        if self._group is None:
+            # Any whole groups in between were lost.
+            if self._next_group is not None:
+                skipped = (group - self._next_group) % GROUPS
+                self.lost += skipped * self.group_size
+            self._group = group
+        data = bytes(packet[FEC_HEADER.size :])
+        if index & PARITY_FLAG:
+            self._parity = data
+            self._count = index & ~PARITY_FLAG
+            completed += self._complete()
+        else:
+            self._data[index] = data
+        return completed
+
+    def flush(self) -> list:
+        """Return the data of the group in progress, rebuilding what it can.
+
+        This is for the end of the stream.
+        """
+        return self._complete()
+
+    def _complete(self, full: bool = False) -> list:
+        # Finish the group in progress. `full` is set when a later group has
+        # arrived, which shows that this one wasn't the short last group.
+        if self._group is None:
+            return []
+        if self._count is not None:
+            count = self._count
+        elif full:
+            count = self.group_size
+        else:
+            # Without the PARITY packet, the length of the group is only
+            # known up to the last packet that arrived.
+            count = max(self._data) + 1 if self._data else 0
+            self.lost_unknown = True
+        missing = [index for index in range(count) if index not in self._data]
+        if len(missing) == 1 and self._parity is not None:
+            rebuilt = self._parity
+            for data in self._data.values():
+                rebuilt = _xor(rebuilt, data)
+            self._data[missing[0]] = rebuilt
+            self.recovered += 1
+        else:
+            self.lost += len(missing)
+        completed = [
+            self._data[index] for index in range(count) if index in self._data
+        ]
+        self._next_group = (self._group + 1) % GROUPS
+        self._group = None
+        self._data = {}
+        self._parity = None
+        self._count = None
+        return completed
@@ -0,0 +1,267 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Documentation:
+# 1. [nRF24L01 Datasheet](<project_directory>/nRF24L01-datasheet.pdf)
+################################################################################
+# Frequency hopping for `transmit`, and `receive`.
+#
+# Time is divided into slots of `interval` seconds of the wall clock, and
+# each slot is assigned a channel from a pseudo-random permutation of the
+# channels that is derived from a seed. Both ends compute the same sequence
+# from the same seed, so they meet on the same channel as long as their
+# clocks agree (e.g. with NTP) to well within a slot.
+#
+# The transmitter measures the loss on each channel from PLOS_CNT, which
+# counts the packets that reached MAX_RT, and is reset by every write of RF_CH
+# (see [1] Section 9.1 Table 27), so reading it as the channel is left gives
+# the loss of that dwell. A channel whose smoothed loss goes over a threshold
+# is blacklisted for a number of passes through the sequence, after which it
+# is given another chance. The transmitter sits out the slots of blacklisted
+# channels powered down, rather than moving to another channel, so the
+# receiver doesn't need to know about the blacklist, and keeps hopping through
+# every slot.
+#
+# NOTE: With --noack there is no MAX_RT, so nothing is ever blacklisted.
+################################################################################
+import collections
+import random
+import time
+from nrf24l01_control import REGISTERS
+
+
+# The channels in the 2.400 - 2.4835 GHz ISM band.
+DEFAULT_CHANNELS = range(0, 84)
+# The smoothing factor of the loss of each channel, per dwell.
+LOSS_SMOOTHING = 0.5
+# At most this fraction of the channels can be blacklisted at once.
+MAX_BLACKLISTED = 0.5
+
+# The statistics of one channel. `seconds` is the total time that was spent
+# on the channel, `lost` the number of MAX_RT events, and `blacklisted` the
+# number of times that it was blacklisted.
+ChannelStats = collections.namedtuple(
+    'ChannelStats',
+    [
+        'channel',
+        'dwells',
+        'seconds',
+        'packets',
+        'payload_bytes',
+        'lost',
+        'blacklisted',
+    ],
+)
+
+
+def channel_sequence(seed: int, channels=DEFAULT_CHANNELS) -> list:
+    """Return the pseudo-random order of the channels for a seed."""
+    sequence = list(channels)
+    if not sequence or not all(0 <= channel <= 125 for channel in sequence):
+        raise ValueError("The hopping channels must be in the range [0,125].")
+    random.Random(seed).shuffle(sequence)
+    return sequence
+
+
+class Hopper:
+    """Follow the channel sequence of a seed, one slot at a time.
+
+    `poll()` changes RF_CH whenever a new slot has started, so it is passed
+    as the `on_poll` callback of `nRF24L01.transmit_stream()`, or `Receiver`,
+    and `track()`, and `record()` count the packets on the current channel.
+
+    Keyword arguments:
+        device -- The nRF24L01 to change the channel of.
+        seed -- The seed of the channel sequence. It must match the other
+        end.
+        interval -- The time (s) spent on each channel.
+        channels -- The channels to hop between.
+        transmitter -- Measure the loss on each channel, and blacklist the
+        bad ones. Only the transmitter sees MAX_RT.
+        loss_threshold -- The smoothed fraction of attempts that reach MAX_RT
+        at which a channel is blacklisted, or None to never blacklist.
+        cooldown -- The number of passes through the sequence that a
+        blacklisted channel sits out.
+    """
+
+    def __init__(
+        self,
+        device,
+        seed: int,
+        interval: float = 0.1,
+        channels=DEFAULT_CHANNELS,
+        transmitter: bool = False,
+        loss_threshold: float = 0.5,
+        cooldown: int = 4,
+    ):
+        if interval <= 0:
+            raise ValueError("The hop interval must be more than 0.")
+        self._device = device
+        self.sequence = channel_sequence(seed, channels)
+        self.interval = interval
+        self.transmitter = transmitter
+        self.loss_threshold = loss_threshold if transmitter else None
+        self.cooldown = cooldown
+        self.channel = None
+        self._slot = None
+        self._arrived = None
+        self._dwell_packets = 0
+        # For each channel: [dwells, seconds, packets, payload_bytes, lost,
+        # blacklisted]
+        self._stats = collections.defaultdict(lambda: [0, 0.0, 0, 0, 0, 0])
+        # The smoothed loss of each channel, and the slot at which each
+        # blacklisted channel is let back in.
+        self._loss = {}
+        self._blacklist = {}
+
+    def channel_at(self, slot: int) -> int:
+        return self.sequence[slot % len(self.sequence)]
+
+    def poll(self) -> None:
+        """Move to the channel of the current slot, if it has changed.
+
+        The transmitter waits out the slots of blacklisted channels, powered
+        down.
+        """
+        slot = int(time.time() // self.interval)
+        if slot == self._slot:
+            return
+        # Power down while sitting out a slot, or else the radio keeps
+        # retrying the TX FIFO on the channel that the receiver has left, and
+        # that loss is never counted, since PLOS_CNT is read as the channel is
+        # left, and reset by the next write of RF_CH. The TX FIFO is kept.
+        sitting_out = self._blacklisted(self.channel_at(slot), slot)
+        if sitting_out:
+            self._device.set_fields('CONFIG', PWR_UP=0)
+        self._leave()
+        while self._blacklisted(self.channel_at(slot), slot):
+            time.sleep(max((slot + 1) * self.interval - time.time(), 0))
+            slot += 1
+        self._slot = slot
+        self.channel = self.channel_at(slot)
+        self._device.w_register('RF_CH', self.channel.to_bytes(1, 'big'))
+        # The start up of the oscillator (1.5 ms, see [1] Section 6.1.7) is
+        # shorter than a round trip to the interface board.
+        if sitting_out:
+            self._device.set_fields('CONFIG', PWR_UP=1)
+        self._arrived = time.perf_counter()
+        self._dwell_packets = 0
+        self._stats[self.channel][0] += 1
+
+    def track(self, packets):
+        """Yield each packet, counting it on the channel that it is sent on."""
+        for packet in packets:
+            self.poll()
+            self.record(len(packet))
+            yield packet
+
+    def record(self, payload_bytes: int) -> None:
+        """Count a packet on the current channel."""
+        if self.channel is None:
+            return
+        stats = self._stats[self.channel]
+        stats[2] += 1
+        stats[3] += payload_bytes
+        self._dwell_packets += 1
+
+    def finish(self) -> None:
+        """Account for the time, and the loss of the current dwell."""
+        self._leave()
+        self._slot = None
+        self.channel = None
+
+    def _leave(self) -> None:
+        # Close the dwell on the current channel.
+        if self.channel is None:
+            return
+        stats = self._stats[self.channel]
+        stats[1] += time.perf_counter() - self._arrived
+        if not self.transmitter:
+            return
+        # PLOS_CNT is reset by the write of RF_CH that started the dwell. It
+        # saturates at 15.
+        lost = (
+            REGISTERS['OBSERVE_TX']
+            .fields['PLOS_CNT']
+            .extract(self._device.r_register('OBSERVE_TX')[0])
+        )
+        stats[4] += lost
+        if self.loss_threshold is None:
+            return
+        attempts = self._dwell_packets + lost
+        if not attempts:
+            return
+        loss = self._loss.get(self.channel, 0.0)
+        loss += LOSS_SMOOTHING * (lost / attempts - loss)
+        self._loss[self.channel] = loss
+        if loss > self.loss_threshold and len(
+            self._blacklist
+        ) < MAX_BLACKLISTED * len(self.sequence):
+            self._blacklist[self.channel] = (
+                self._slot + self.cooldown * len(self.sequence) + 1
+            )
+            stats[5] += 1
+            # Give the channel a fresh start when it comes back.
+            self._loss[self.channel] = 0.0
+
+    def _blacklisted(self, channel: int, slot: int) -> bool:
+        until = self._blacklist.get(channel)
+        if until is None:
+            return False
+        if slot >= until:
+            del self._blacklist[channel]
+            return False
+        return True
+
+    def report(self) -> list:
+        """Return the ChannelStats of every channel that was visited."""
+        return [
+            ChannelStats(channel, *self._stats[channel])
+            for channel in sorted(self._stats)
+        ]
+
+
+def format_table(report: list) -> str:
+    heading = '{0:>7} {1:>6} {2:>9} {3:>8} {4:>9} {5:>6} {6:>12} {7:>11}'
+    row = '{0:>7} {1:>6} {2:>9.3f} {3:>8} {4:>9} {5:>6} {6:>12.1f} {7:>11}'
+    lines = [
+        heading.format(
+            'channel',
+            'dwells',
+            'seconds',
+            'packets',
+            'bytes',
+            'lost',
+            'goodput B/s',
+            'blacklisted',
+        )
+    ]
+    for stats in report:
+        lines.append(
+            row.format(
+                stats.channel,
+                stats.dwells,
+                stats.seconds,
+                stats.packets,
+                stats.payload_bytes,
+                stats.lost,
+                stats.payload_bytes / stats.seconds if stats.seconds else 0.0,
+                stats.blacklisted,
+            )
+        )
+    return '\n'.join(lines)
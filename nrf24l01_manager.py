@@ -0,0 +1,185 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Drive several interface boards at once.
+#
+# Each device gets its own worker thread, which does all of that device's I/O,
+# so the same command can be fanned out across every device in parallel. Since
+# each device spends almost all of its time waiting on its own UART, the wall
+# time of a command across N devices stays close to that of a single device.
+################################################################################
+import collections
+import concurrent.futures
+import glob
+import io
+import sys
+import threading
+import time
+from nrf24l01_control import nRF24L01
+
+
+# The ports that the interface boards (USB to UART bridges) show up as.
+DEFAULT_PORT_PATTERNS = ['/dev/ttyUSB*', '/dev/ttyACM*']
+
+# The outcome of running a function on one device. `output` is everything the
+# function printed, and `error` is the exception that it raised, if any.
+DeviceResult = collections.namedtuple(
+    'DeviceResult', ['port', 'result', 'error', 'output', 'seconds']
+)
+
+
+def expand_ports(patterns) -> list:
+    """Expand a list of ports and glob patterns into a list of ports.
+
+    The matches of each pattern are sorted, and duplicates are dropped. A
+    glob pattern that matches nothing contributes no ports (e.g. there are
+    no /dev/ttyACM* boards), but a literal port is always kept, so that a
+    missing port is reported when it fails to open, rather than silently
+    skipped.
+    """
+    ports = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+        else:
+            matches = [pattern]
+        for port in matches:
+            if port not in ports:
+                ports.append(port)
+    return ports
+
+
+class _ThreadOutput(io.TextIOBase):
+    """A stand-in for sys.stdout that captures the output of each worker.
+
+    Text written from a thread that is capturing goes to that thread's
+    buffer; text written from any other thread goes to the real stream.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer) -> None:
+        self._local.buffer = buffer
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            return self._stream.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+
+class DeviceManager:
+    """A set of interface boards, each driven from its own worker thread.
+
+    e.g.
+
+        with DeviceManager(['/dev/ttyUSB*']) as manager:
+            for result in manager.run(lambda nrf24l01: nrf24l01.nop()):
+                print(result.port, result.result)
+
+    Keyword arguments:
+        ports -- The ports of the devices, which may include glob patterns.
+        cache -- Enable the register cache of each device. See `nRF24L01`.
+    """
+
+    def __init__(self, ports, cache: bool = False):
+        self.ports = expand_ports(ports)
+        self.devices = {
+            port: nRF24L01(port, cache=cache) for port in self.ports
+        }
+        self._workers = {}
+
+    def __len__(self):
+        return len(self.devices)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self) -> None:
+        """Start a worker for each device, and open its port on it."""
+        for port in self.ports:
+            if port not in self._workers:
+                self._workers[port] = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=port
+                )
+        # A port that fails to open is reported by the first command that is
+        # run on it, like any other error.
+        for future in [
+            self._workers[port].submit(self.devices[port].open)
+            for port in self.ports
+        ]:
+            future.exception()
+
+    def close(self) -> None:
+        """Close the port of every device, and stop the workers."""
+        for port, worker in self._workers.items():
+            worker.submit(self.devices[port].close)
+            worker.shutdown(wait=True)
+        self._workers = {}
+
+    def run(self, function, *args, **kwargs) -> list:
+        """Call `function(device, *args, **kwargs)` on every device at once.
+
+        Each call runs on the worker of its device. Returns a DeviceResult for
+        each device, in the order of the ports. Whatever a call prints is
+        captured into its result, rather than being interleaved with the
+        output of the others.
+        """
+        output = sys.stdout
+        capturing = not isinstance(output, _ThreadOutput)
+        if capturing:
+            output = sys.stdout = _ThreadOutput(sys.stdout)
+        try:
+            futures = [
+                self._workers[port].submit(
+                    self._call, output, port, function, args, kwargs
+                )
+                for port in self.ports
+            ]
+            return [future.result() for future in futures]
+        finally:
+            if capturing:
+                sys.stdout = output._stream
+
+    def _call(self, output, port, function, args, kwargs) -> DeviceResult:
+        buffer = io.StringIO()
+        output.capture(buffer)
+        result = None
+        error = None
+        start = time.perf_counter()
+        try:
+            result = function(self.devices[port], *args, **kwargs)
+        except Exception as exception:
+            error = exception
+        finally:
+            output.capture(None)
+        return DeviceResult(
+            port, result, error, buffer.getvalue(), time.perf_counter() - start
+        )
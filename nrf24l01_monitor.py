@@ -0,0 +1,220 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Documentation:
+# 1. [nRF24L01 Datasheet](<project_directory>/nRF24L01-datasheet.pdf)
+################################################################################
+# Continuous monitoring of the quality of the link of a transmitter.
+#
+# The statistics only change while packets are being sent, so a LinkMonitor
+# samples the radio from within the transmit loop, as the `on_poll` callback
+# of `nRF24L01.transmit_stream()` (see `transmit --monitor`, and `monitor`,
+# which sends its own traffic).
+#
+# Each sample reads STATUS (with a NOP), OBSERVE_TX, and FIFO_STATUS in a
+# single batch, and turns them into the events since the previous sample:
+#   acked -- TX_DS was set, i.e. a packet was acknowledged.
+#   lost -- The increase of PLOS_CNT, i.e. packets that reached MAX_RT.
+#   retransmits -- ARC_CNT of the packet that was acknowledged.
+# TX_DS is cleared in the same batch that reads it, the way an IRQ handler
+# would. MAX_RT is left for the transmit loop to clear, since that is how it
+# notices a dead link. Once PLOS_CNT gets close to saturating, RF_CH is
+# rewritten to reset it, straight after it is read in a later sample.
+#
+# The samples are kept in a ring buffer of fixed size, along with running
+# totals, so that the summary of the window costs the same however long it
+# is.
+#
+# NOTE: The flags, and ARC_CNT only describe the last packet, and up to 3
+# packets can complete between two polls of the transmit loop, so the counts
+# of acked packets, and retransmits are lower bounds. PLOS_CNT counts every
+# lost packet.
+################################################################################
+import collections
+import time
+from nrf24l01_control import REGISTERS
+
+
+# The events seen by one sample. `tx_full`, and `rx_full` are the FIFO_STATUS
+# bits at the time of the sample.
+Sample = collections.namedtuple(
+    'Sample',
+    ['time', 'acked', 'lost', 'retransmits', 'tx_full', 'rx_full'],
+)
+
+# The totals over the samples in the window of a LinkMonitor.
+# `retransmits_per_packet` is per acknowledged packet, and `loss` is the
+# fraction of the completed packets that were lost.
+LinkSummary = collections.namedtuple(
+    'LinkSummary',
+    [
+        'samples',
+        'seconds',
+        'acked',
+        'lost',
+        'retransmits',
+        'retransmits_per_packet',
+        'loss',
+        'ack_rate',
+        'tx_full',
+        'rx_full',
+    ],
+)
+
+# PLOS_CNT saturates at 15. It is reset when it reaches this.
+PLOS_CNT_RESET = 8
+
+
+class LinkMonitor:
+    """Sample the link quality statistics of a radio in TX mode.
+
+    e.g.
+
+        monitor = LinkMonitor(nrf24l01, window=100, report_every=1.0)
+        nrf24l01.transmit_stream(packets, on_poll=monitor.poll)
+
+    Keyword arguments:
+        device -- The nRF24L01 to monitor.
+        window -- The number of samples that the summary covers.
+        report_every -- The time (s) between the summaries that `poll()`
+        prints, or None to only sample.
+        file -- Where `poll()` prints the summaries. Defaults to stdout.
+    Documentation:
+        See [1] Section 7.4.2 for ARC_CNT, and PLOS_CNT, and Section 6.6 for
+        the interrupt flags.
+    """
+
+    def __init__(
+        self, device, window: int = 100, report_every=None, file=None
+    ):
+        if window < 1:
+            raise ValueError("The window must be at least 1 sample.")
+        if report_every is not None and report_every <= 0:
+            raise ValueError("The time between summaries must be more than 0.")
+        self._device = device
+        self.report_every = report_every
+        self._file = file
+        self._next_report = None
+        self.reports = 0
+        self.samples = collections.deque(maxlen=window)
+        # The running totals of the samples in the window.
+        self._totals = [0, 0, 0, 0, 0]
+        self._plos_cnt = None
+        self._reset_plos_cnt = False
+
+    def poll(self) -> None:
+        """Take a sample, and print the summary if it is due.
+
+        This is the `on_poll` callback of `nRF24L01.transmit_stream()`.
+        """
+        self.sample()
+        if self.report_every is None:
+            return
+        now = time.perf_counter()
+        if self._next_report is None:
+            self._next_report = now + self.report_every
+        elif now >= self._next_report:
+            print(format_summary(self.summary()), file=self._file, flush=True)
+            self.reports += 1
+            self._next_report += self.report_every
+
+    def sample(self) -> Sample:
+        """Take a sample, add it to the window, and return it."""
+        observe_tx = REGISTERS['OBSERVE_TX'].fields
+        fifo_status = REGISTERS['FIFO_STATUS'].fields
+        status = REGISTERS['STATUS'].fields
+        device = self._device
+        reset = self._reset_plos_cnt
+        rf_ch = device.r_register('RF_CH') if reset else None
+        with device.batch() as batch:
+            # Read TX_DS, and clear it straight away, so that the next packet
+            # sets it again.
+            flags = batch.nop()
+            batch.w_register('STATUS', status['TX_DS'].mask.to_bytes(1, 'big'))
+            # Read PLOS_CNT before it is reset, so that nothing it counted is
+            # dropped.
+            observe = batch.r_register('OBSERVE_TX')
+            if reset:
+                batch.w_register('RF_CH', rf_ch)
+            fifo = batch.r_register('FIFO_STATUS')
+        now = time.perf_counter()
+        flags = flags.result()
+        observe = observe.result()[0]
+        fifo = fifo.result()[0]
+        plos_cnt = observe_tx['PLOS_CNT'].extract(observe)
+        if self._plos_cnt is None:
+            lost = 0
+        elif plos_cnt < self._plos_cnt:
+            # Something else wrote RF_CH.
+            lost = plos_cnt
+        else:
+            lost = plos_cnt - self._plos_cnt
+        self._plos_cnt = 0 if reset else plos_cnt
+        self._reset_plos_cnt = self._plos_cnt >= PLOS_CNT_RESET
+        acked = status['TX_DS'].extract(flags)
+        sample = Sample(
+            now,
+            acked,
+            lost,
+            observe_tx['ARC_CNT'].extract(observe) if acked else 0,
+            fifo_status['TX_FULL'].extract(fifo),
+            fifo_status['RX_FULL'].extract(fifo),
+        )
+        if len(self.samples) == self.samples.maxlen:
+            self._add(self.samples[0], -1)
+        self.samples.append(sample)
+        self._add(sample, 1)
+        return sample
+
+    def _add(self, sample: Sample, sign: int) -> None:
+        for index, value in enumerate(sample[1:]):
+            self._totals[index] += sign * value
+
+    def summary(self) -> LinkSummary:
+        """Summarise the samples in the window."""
+        acked, lost, retransmits, tx_full, rx_full = self._totals
+        samples = len(self.samples)
+        seconds = (
+            self.samples[-1].time - self.samples[0].time if samples > 1 else 0
+        )
+        packets = acked + lost
+        return LinkSummary(
+            samples,
+            seconds,
+            acked,
+            lost,
+            retransmits,
+            retransmits / acked if acked else 0.0,
+            lost / packets if packets else 0.0,
+            acked / seconds if seconds else 0.0,
+            tx_full / samples if samples else 0.0,
+            rx_full / samples if samples else 0.0,
+        )
+
+
+def format_summary(summary: LinkSummary) -> str:
+    """Format a summary as a single line of key=value pairs."""
+    return (
+        'time={0:.3f} samples={1.samples} seconds={1.seconds:.3f} '
+        'acked={1.acked} lost={1.lost} retransmits={1.retransmits} '
+        'retransmits_per_packet={1.retransmits_per_packet:.3f} '
+        'loss={1.loss:.3f} ack_rate={1.ack_rate:.1f} '
+        'tx_full={1.tx_full:.3f} rx_full={1.rx_full:.3f}'.format(
+            time.time(), summary
+        )
+    )
@@ -0,0 +1,142 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Snapshots of the writable register file ("profiles"), and restoring them.
+#
+# A profile is a JSON object of register names to their contents in
+# hexadecimal, in the order that the bytes are read from the device, e.g.
+#   {"CONFIG": "0E", "EN_AA": "3F", ..., "RX_ADDR_P0": "E7E7E7E7E7", ...}
+# Every register except the status registers (STATUS, OBSERVE_TX, RPD, and
+# FIFO_STATUS) is saved. A profile may leave registers out, in which case
+# they are left as they are when it is applied.
+#
+# Applying a profile reads the whole register file in one batch, and then
+# writes, and reads back only the registers that differ in a second batch, so
+# a radio that is already set up is never written to. A batch can't queue a
+# frame behind the response of a multi-byte register (see `Batch`), so each
+# of the address registers (RX_ADDR_P0, RX_ADDR_P1, and TX_ADDR) ends a round
+# trip, and reading the register file costs 4 of them.
+################################################################################
+import collections
+import json
+from nrf24l01_control import REGISTER_MAP, REGISTERS
+
+
+# The registers that report the state of the radio, rather than configure it.
+STATUS_REGISTERS = ('STATUS', 'OBSERVE_TX', 'RPD', 'FIFO_STATUS')
+PROFILE_REGISTERS = [
+    register_name
+    for register_name in REGISTER_MAP
+    if register_name not in STATUS_REGISTERS
+]
+
+# The outcome of applying a profile. `skipped` is the number of register
+# writes that were skipped because the register already matched, and `failed`
+# lists the registers that didn't read back as written.
+ProfileReport = collections.namedtuple(
+    'ProfileReport', ['written', 'skipped', 'failed']
+)
+
+
+def read_profile(nrf24l01) -> dict:
+    """Read every register of a profile from the device in a batch."""
+    with nrf24l01.batch() as batch:
+        futures = {
+            register_name: batch.r_register(register_name)
+            for register_name in PROFILE_REGISTERS
+        }
+    return {
+        register_name: future.result()
+        for register_name, future in futures.items()
+    }
+
+
+def save_profile(profile: dict, file) -> None:
+    """Write a profile (register names to bytes) to a text file as JSON."""
+    json.dump(
+        {
+            register_name: register_contents.hex().upper()
+            for register_name, register_contents in profile.items()
+        },
+        file,
+        indent=2,
+    )
+    file.write('\n')
+
+
+def load_profile(file) -> dict:
+    """Read a profile from a text file, and check it against REGISTER_MAP."""
+    try:
+        entries = json.load(file)
+    except ValueError as error:
+        raise ValueError("The profile isn't valid JSON ({0}).".format(error))
+    if not isinstance(entries, dict):
+        raise ValueError("The profile must be a JSON object.")
+    profile = {}
+    for register_name, register_contents in entries.items():
+        if register_name not in PROFILE_REGISTERS:
+            raise ValueError(
+                "{0} isn't a register that a profile can set.".format(
+                    register_name
+                )
+            )
+        try:
+            register_contents = bytes.fromhex(register_contents)
+        except (TypeError, ValueError):
+            raise ValueError(
+                "The contents of {0} must be hexadecimal.".format(register_name)
+            ) from None
+        length = REGISTERS[register_name].number_of_data_bytes
+        if len(register_contents) != length:
+            raise ValueError(
+                "{0} must be {1} bytes long.".format(register_name, length)
+            )
+        profile[register_name] = register_contents
+    return profile
+
+
+def apply_profile(nrf24l01, profile: dict) -> ProfileReport:
+    """Write the registers of a profile that differ from the device.
+
+    The registers that differ are written in register order, except CONFIG,
+    which is written last so that the radio is only powered up, or switched
+    between TX, and RX once everything else is set. Each one is read back to
+    verify it. If the interface doesn't answer a read in time, TimeoutError
+    is raised, rather than the register being reported as failed.
+    """
+    current = read_profile(nrf24l01)
+    changed = [
+        register_name
+        for register_name in PROFILE_REGISTERS
+        if register_name in profile
+        and profile[register_name] != current[register_name]
+    ]
+    if 'CONFIG' in changed:
+        changed.remove('CONFIG')
+        changed.append('CONFIG')
+    with nrf24l01.batch() as batch:
+        stored = {}
+        for register_name in changed:
+            batch.w_register(register_name, profile[register_name])
+            stored[register_name] = batch.r_register(register_name)
+    failed = [
+        register_name
+        for register_name, future in stored.items()
+        if future.result() != profile[register_name]
+    ]
+    return ProfileReport(len(changed), len(profile) - len(changed), failed)
@@ -0,0 +1,188 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Recording, and replay of binary traces of UART transactions.
+#
+# A trace file starts with an 8 byte magic number and a version byte, and is
+# followed by one record per transaction:
+#
+#   timestamp (8 bytes) | frame length (2 bytes) | response length (2 bytes)
+#   | length of the response received (2 bytes) | frame | response
+#
+# All integers are little endian. The timestamp is `time.monotonic_ns()` at the
+# start of the transaction. The frame is exactly what was written to the port
+# (which may be several frames for a batch), the response length is the number
+# of bytes that were expected back, and the response is what was actually
+# read. Traces are only ever appended to, so a single file can hold several
+# sessions back to back. Each session starts with a record that has an empty
+# frame, and no response, whose timestamp is the time that the session
+# started.
+################################################################################
+import collections
+import struct
+import time
+from nrf24l01_control import nRF24L01, Transaction
+
+TRACE_MAGIC = b'NRF24TRC'
+TRACE_VERSION = 1
+TRACE_HEADER = struct.Struct('<8sB')
+RECORD_HEADER = struct.Struct('<QHHH')
+
+# A transaction read back from a trace.
+TraceRecord = collections.namedtuple(
+    'TraceRecord', ['timestamp_ns', 'frame', 'response_length', 'response']
+)
+
+# The outcome of replaying a trace. `mismatches` is the number of transactions
+# whose response differed from the recorded one.
+ReplayReport = collections.namedtuple(
+    'ReplayReport', ['transactions', 'mismatches', 'seconds']
+)
+
+
+class TraceWriter:
+    """Record every UART transaction of a device to a trace file.
+
+    e.g.
+
+        with TraceWriter('session.trace') as trace:
+            trace.attach(nrf24l01)
+            ...
+
+    Keyword arguments:
+        path -- The trace file. It is created if it doesn't exist, and
+        appended to if it does.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION))
+        self._file.write(RECORD_HEADER.pack(time.monotonic_ns(), 0, 0, 0))
+        self.records = 0
+        self._devices = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def attach(self, nrf24l01: nRF24L01) -> None:
+        nrf24l01.post_transaction_hooks.append(self.record)
+        self._devices.append(nrf24l01)
+
+    def close(self) -> None:
+        """Detach from every device, and close the trace file."""
+        for nrf24l01 in self._devices:
+            nrf24l01.post_transaction_hooks.remove(self.record)
+        self._devices = []
+        self._file.close()
+
+    def record(self, transaction: Transaction) -> None:
+        """Append a transaction to the trace. This is the post hook."""
+        self._file.write(
+            RECORD_HEADER.pack(
+                transaction.start_ns,
+                len(transaction.frame),
+                transaction.response_length,
+                len(transaction.response),
+            )
+        )
+        self._file.write(transaction.frame)
+        self._file.write(transaction.response)
+        self.records += 1
+
+
+def read_trace(path: str):
+    """Iterate over the TraceRecords in a trace file.
+
+    The start of each session is a TraceRecord with an empty frame.
+    """
+    with open(path, 'rb') as trace:
+        header = trace.read(TRACE_HEADER.size)
+        if len(header) < TRACE_HEADER.size:
+            raise ValueError("{0} is not a trace file.".format(path))
+        magic, version = TRACE_HEADER.unpack(header)
+        if magic != TRACE_MAGIC:
+            raise ValueError("{0} is not a trace file.".format(path))
+        if version != TRACE_VERSION:
+            raise ValueError(
+                "Unsupported trace version {0} in {1}.".format(version, path)
+            )
+        while True:
+            header = trace.read(RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < RECORD_HEADER.size:
+                raise ValueError("{0} is truncated.".format(path))
+            timestamp_ns, frame_length, response_length, received = (
+                RECORD_HEADER.unpack(header)
+            )
+            data = trace.read(frame_length + received)
+            if len(data) < frame_length + received:
+                raise ValueError("{0} is truncated.".format(path))
+            yield TraceRecord(
+                timestamp_ns,
+                data[:frame_length],
+                response_length,
+                data[frame_length:],
+            )
+
+
+def replay(path: str, nrf24l01: nRF24L01, paced: bool = True) -> ReplayReport:
+    """Send every transaction in a trace to a device again.
+
+    Keyword arguments:
+        path -- The trace file.
+        nrf24l01 -- The device to replay the trace against.
+        paced -- Keep to the original time between transactions. Otherwise,
+        the transactions are replayed as fast as possible. The first
+        transaction of each session is not waited for, nor is a transaction
+        that was recorded earlier than the one before it (i.e. in a trace
+        with no session records, after a reboot).
+    """
+    transactions = 0
+    mismatches = 0
+    start = time.monotonic_ns()
+    previous_timestamp = None
+    due = start
+    for record in read_trace(path):
+        if not record.frame:
+            # The start of a session. The time since the previous session is
+            # not part of either one.
+            previous_timestamp = None
+            due = time.monotonic_ns()
+            continue
+        if paced:
+            if previous_timestamp is not None:
+                gap = record.timestamp_ns - previous_timestamp
+                if gap > 0:
+                    due += gap
+            previous_timestamp = record.timestamp_ns
+            delay = due - time.monotonic_ns()
+            if delay > 0:
+                time.sleep(delay / 1e9)
+        response = nrf24l01._exchange(record.frame, record.response_length)
+        transactions += 1
+        if response != record.response:
+            mismatches += 1
+    return ReplayReport(
+        transactions, mismatches, (time.monotonic_ns() - start) / 1e9
+    )
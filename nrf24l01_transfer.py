@@ -0,0 +1,377 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Documentation:
+#   [1] nRF24L01 Single Chip 2.4GHz Transceiver Product Specification v2.0
+################################################################################
+# Reliable transfer of a file between two radios, over a sliding window of
+# sequence numbered packets.
+#
+# The radios' own auto acknowledgement, and retransmission (see [1] Section
+# 7.4) already recover most lost packets: whenever the maximum number of
+# retransmits is reached (MAX_RT), only the packet that failed is sent again.
+# On top of that, the receiver reports which packets it has, end to end, in
+# the ACK payload of each acknowledgement, so that a packet that never made it
+# out of the receiver's RX FIFO is retransmitted on its own, and the file is
+# checked against its length, and CRC-32 at the end.
+#
+# Every packet that the sender transmits starts with its type:
+#   DATA  | type (1) | sequence number (2) | up to 29 bytes of the file
+#   PROBE | type (1)
+#   END   | type (1) | number of DATA packets (2) | length (4) | CRC-32 (4)
+#   CLOSE | type (1)
+# PROBEs carry nothing, and are only sent to collect an ACK payload while the
+# window is full. END is sent once every DATA packet has been acknowledged,
+# until the receiver has checked the file. CLOSE tells the receiver to stop.
+# PROBEs, and repeated ENDs are paced, so that they don't flood the receiver
+# while it catches up.
+#
+# Every ACK payload that the receiver sends back is:
+#   state (1) | next expected sequence number (2) | bitmap
+# where bit n of the bitmap is set if the packet n + 1 after the next expected
+# one has already been received (out of order), and the state is one of the
+# RECEIVING, VERIFIED, or CORRUPTED states below.
+#
+# Sequence numbers are 16 bits, and wrap around, so the window must be smaller
+# than half of the sequence space. All integers are little endian.
+################################################################################
+import collections
+import struct
+import time
+import zlib
+from nrf24l01_control import nRF24L01, REGISTERS
+
+
+# Packet types.
+DATA = 0
+PROBE = 1
+END = 2
+CLOSE = 3
+
+# Receiver states.
+RECEIVING = 0
+VERIFIED = 1
+CORRUPTED = 2
+
+DATA_HEADER = struct.Struct('<BH')
+END_PACKET = struct.Struct('<BHII')
+ACK_HEADER = struct.Struct('<BH')
+# The bytes of the file in each DATA packet.
+DATA_LENGTH = 32 - DATA_HEADER.size
+SEQUENCE_SPACE = 1 << 16
+DEFAULT_WINDOW = 32
+# The bitmap has to fit in an ACK payload.
+MAX_WINDOW = 8 * (32 - ACK_HEADER.size)
+# The number of ACK payloads that arrive after a DATA packet is sent before it
+# is considered lost if the receiver still hasn't reported it. Up to 10 of them
+# can be stale: 3 waiting in the sender's RX FIFO, 3 for the packets ahead of
+# it in the TX FIFO, 1 for the packet itself, and 3 queued in the receiver's TX
+# FIFO before the receiver read the packet.
+RETRANSMIT_AFTER = 11
+# The time (s) to wait before each PROBE, or END, which only collect the
+# receiver's state.
+PROBE_INTERVAL = 0.002
+# The number of MAX_RT events in a row after which the receiver is considered
+# gone. It is much higher than for a plain stream, since the receiver may be
+# slow to start draining its RX FIFO while it is backing off between polls.
+MAX_RT_LIMIT = 1000
+
+# The outcome of a transfer. `packets` counts every packet that was sent
+# (including retransmissions, PROBEs, and the END, and CLOSE packets).
+# `retransmits` is the number of DATA packets that were sent again, `max_rt`
+# the number of times that the radio reached the maximum number of
+# retransmits, and `lost` the lost packet count (PLOS_CNT) of OBSERVE_TX at the
+# end, which saturates at 15.
+TransferReport = collections.namedtuple(
+    'TransferReport',
+    [
+        'payload_bytes',
+        'packets',
+        'retransmits',
+        'max_rt',
+        'lost',
+        'seconds',
+        'crc32',
+        'verified',
+    ],
+)
+
+
+def _check_window(window: int) -> None:
+    if not 1 <= window <= MAX_WINDOW:
+        raise ValueError(
+            "The window must be in the range [1,{0}].".format(MAX_WINDOW)
+        )
+
+
+def ack_payload_width(window: int) -> int:
+    """Return the width of the ACK payloads of a transfer with a window."""
+    return ACK_HEADER.size + (window - 1 + 7) // 8
+
+
+def _distance(sequence_number: int, base: int) -> int:
+    # How far a sequence number is ahead of another, allowing for the wrap
+    # around.
+    return (sequence_number - base) % SEQUENCE_SPACE
+
+
+def send_file(
+    nrf24l01: nRF24L01,
+    stream,
+    window: int = DEFAULT_WINDOW,
+    timeout: float = 10.0,
+) -> TransferReport:
+    """Send a binary stream reliably to a radio that is running `recv_file()`.
+
+    At most `window` DATA packets are in flight beyond the oldest one that the
+    receiver hasn't acknowledged. Packets that the receiver reports missing
+    are retransmitted selectively. Raises a RuntimeError if the receiver
+    stops responding, or reports that the file was corrupted.
+
+    The radio must already be powered up in TX mode, with TX_ADDR equal to
+    RX_ADDR_P0, and with EN_ACK_PAY, and EN_DPL in FEATURE, and DPL_P0 in
+    DYNPD set, so that the ACK payloads can be received.
+
+    Keyword arguments:
+        nrf24l01 -- The transmitting radio.
+        stream -- A binary stream of the file to send.
+        window -- The number of packets that can be in flight. It must match
+        the window of the receiver. [1,MAX_WINDOW]
+        timeout -- The time (s) after which the transfer is abandoned if the
+        receiver doesn't acknowledge anything new.
+    """
+    _check_window(window)
+    read = getattr(stream, 'read1', stream.read)
+    buffer = b''
+    # The DATA packets that haven't been acknowledged, by sequence number.
+    unacknowledged = {}
+    # The number of ACK payloads that had arrived when each of those was last
+    # sent.
+    sent_at = {}
+    base = 0
+    next_sequence_number = 0
+    end_of_file = False
+    payload_bytes = 0
+    crc32 = 0
+    state = RECEIVING
+    packets = 0
+    ack_payloads = 0
+    retransmits = 0
+    # When the receiver last reported anything new.
+    progress = time.perf_counter()
+
+    def acknowledge(sequence_number):
+        nonlocal progress
+        if unacknowledged.pop(sequence_number, None) is not None:
+            del sent_at[sequence_number]
+            progress = time.perf_counter()
+
+    def on_ack_payload(ack_payload):
+        nonlocal base, state, ack_payloads
+        if len(ack_payload) < ACK_HEADER.size:
+            return
+        ack_payloads += 1
+        state, expected = ACK_HEADER.unpack_from(ack_payload)
+        bitmap = int.from_bytes(ack_payload[ACK_HEADER.size :], 'little')
+        # Everything before the next expected packet has been received. (A
+        # stale ACK payload may be behind the base.)
+        advance = _distance(expected, base)
+        if advance <= _distance(next_sequence_number, base):
+            for offset in range(advance):
+                acknowledge((base + offset) % SEQUENCE_SPACE)
+            base = expected
+            # As have the packets after it that are marked in the bitmap.
+            offset = 1
+            while bitmap:
+                if bitmap & 1:
+                    acknowledge((expected + offset) % SEQUENCE_SPACE)
+                bitmap >>= 1
+                offset += 1
+
+    def next_packet():
+        # Pick the next packet to send: a retransmission of a packet that
+        # hasn't been acknowledged in time, a new DATA packet if there is room
+        # in the window, or else a PROBE, or END to collect the receiver's
+        # state.
+        nonlocal buffer, next_sequence_number, end_of_file
+        nonlocal payload_bytes, crc32, retransmits
+        # NOTE: The packets are kept in the order that they were first sent,
+        # so the oldest is always retransmitted first.
+        for sequence_number, packet in unacknowledged.items():
+            if ack_payloads - sent_at[sequence_number] >= RETRANSMIT_AFTER:
+                sent_at[sequence_number] = ack_payloads
+                retransmits += 1
+                return packet
+        if not end_of_file and _distance(next_sequence_number, base) < window:
+            while len(buffer) < DATA_LENGTH:
+                chunk = read(4096)
+                if not chunk:
+                    end_of_file = True
+                    break
+                buffer += chunk
+            if buffer:
+                data = buffer[:DATA_LENGTH]
+                buffer = buffer[DATA_LENGTH:]
+                payload_bytes += len(data)
+                crc32 = zlib.crc32(data, crc32)
+                packet = DATA_HEADER.pack(DATA, next_sequence_number) + data
+                unacknowledged[next_sequence_number] = packet
+                sent_at[next_sequence_number] = ack_payloads
+                next_sequence_number = (
+                    next_sequence_number + 1
+                ) % SEQUENCE_SPACE
+                return packet
+        if end_of_file and not unacknowledged:
+            return END_PACKET.pack(
+                END, next_sequence_number, payload_bytes % (1 << 32), crc32
+            )
+        return bytes([PROBE])
+
+    def packet_stream():
+        nonlocal packets
+        while state == RECEIVING:
+            if time.perf_counter() - progress > timeout:
+                raise RuntimeError(
+                    "The receiver didn't acknowledge anything for {0} "
+                    "s.".format(timeout)
+                )
+            packet = next_packet()
+            if packet[0] in (PROBE, END):
+                time.sleep(PROBE_INTERVAL)
+            yield packet
+            packets += 1
+        yield bytes([CLOSE])
+        packets += 1
+
+    start = time.perf_counter()
+    report = nrf24l01.transmit_stream(
+        packet_stream(),
+        max_rt_limit=MAX_RT_LIMIT,
+        on_ack_payload=on_ack_payload,
+    )
+    observe_tx = int.from_bytes(nrf24l01.r_register('OBSERVE_TX'), 'big')
+    if state == CORRUPTED:
+        raise RuntimeError("The receiver reports that the file was corrupted.")
+    return TransferReport(
+        payload_bytes,
+        packets,
+        retransmits,
+        report.max_rt,
+        REGISTERS['OBSERVE_TX'].fields['PLOS_CNT'].extract(observe_tx),
+        time.perf_counter() - start,
+        crc32,
+        state == VERIFIED,
+    )
+
+
+def recv_file(
+    nrf24l01: nRF24L01,
+    stream,
+    window: int = DEFAULT_WINDOW,
+    pipe: int = 0,
+    **receiver_options,
+) -> TransferReport:
+    """Receive a file that is sent with `send_file()`, and write it to a stream.
+
+    Packets that arrive out of order are held until the ones before them
+    arrive. Returns once the sender has closed the transfer. The report counts
+    the DATA packets that were received more than once as retransmits.
+
+    The radio must already be powered up in RX mode, with EN_ACK_PAY, and
+    EN_DPL in FEATURE, and the DPL_Px bit of the pipe in DYNPD set.
+
+    Keyword arguments:
+        nrf24l01 -- The receiving radio.
+        stream -- A binary stream to write the file to.
+        window -- The number of packets that can be in flight. It must match
+        the window of the sender. [1,MAX_WINDOW]
+        pipe -- The pipe that the sender transmits to.
+        receiver_options -- Passed on to `Receiver` (e.g. the poll intervals).
+    """
+    _check_window(window)
+    bitmap_length = ack_payload_width(window) - ACK_HEADER.size
+    expected = 0
+    # The packets that arrived ahead of the next expected one.
+    held = {}
+    payload_bytes = 0
+    crc32 = 0
+    state = RECEIVING
+    packets = 0
+    retransmits = 0
+    end = None
+
+    def ack_payloads():
+        # The Receiver only pulls an ACK payload once there is room for it in
+        # the TX FIFO, so each one carries the state as of when it was queued,
+        # behind at most 2 others.
+        while True:
+            bitmap = 0
+            for sequence_number in held:
+                bitmap |= 1 << (_distance(sequence_number, expected) - 1)
+            yield ACK_HEADER.pack(state, expected) + bitmap.to_bytes(
+                bitmap_length, 'little'
+            )
+
+    receiver = nrf24l01.receiver(
+        ack_payloads={pipe: ack_payloads()}, **receiver_options
+    )
+    start = None
+    for _, packet in receiver:
+        if not packet:
+            continue
+        if start is None:
+            start = time.perf_counter()
+        packets += 1
+        packet_type = packet[0]
+        if packet_type == DATA and len(packet) >= DATA_HEADER.size:
+            _, sequence_number = DATA_HEADER.unpack_from(packet)
+            distance = _distance(sequence_number, expected)
+            if distance >= window or sequence_number in held:
+                # Already received, and written out.
+                retransmits += 1
+                continue
+            held[sequence_number] = packet[DATA_HEADER.size :]
+            while expected in held:
+                data = held.pop(expected)
+                stream.write(data)
+                payload_bytes += len(data)
+                crc32 = zlib.crc32(data, crc32)
+                expected = (expected + 1) % SEQUENCE_SPACE
+        elif packet_type == END and len(packet) >= END_PACKET.size:
+            end = END_PACKET.unpack_from(packet)
+        elif packet_type == CLOSE:
+            # Drop the ACK payloads that are still queued.
+            nrf24l01.flush_tx()
+            break
+        # Check the file once every DATA packet is in.
+        if state == RECEIVING and end is not None and end[1] == expected:
+            if end[2] == payload_bytes % (1 << 32) and end[3] == crc32:
+                state = VERIFIED
+            else:
+                state = CORRUPTED
+    stream.flush()
+    return TransferReport(
+        payload_bytes,
+        packets,
+        retransmits,
+        0,
+        0,
+        time.perf_counter() - start if start is not None else 0.0,
+        crc32,
+        state == VERIFIED,
+    )
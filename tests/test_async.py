@@ -0,0 +1,102 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Tests of AsyncNRF24L01 against the emulated interface board, which serves a
+# pseudo-terminal just like the real board's serial port.
+#
+# Run with: python -m unittest discover tests
+################################################################################
+import asyncio
+import unittest
+from nrf24l01_control import AsyncNRF24L01
+from nrf24l01_emulator import Emulator
+
+
+class SilentEmulator(Emulator):
+    """An interface board that never answers."""
+
+    def _uart_receive(self, byte: int) -> int:
+        return 0
+
+
+class AsyncNRF24L01Test(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator()
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+
+    def test_register_round_trip(self):
+        async def test():
+            async with AsyncNRF24L01(self.emulator.port) as nrf24l01:
+                await nrf24l01.w_register('RF_CH', b'\x4c')
+                await nrf24l01.w_register('TX_ADDR', b'\x01\x02\x03\x04\x05')
+                return (
+                    await nrf24l01.r_register('RF_CH'),
+                    await nrf24l01.r_register('TX_ADDR'),
+                )
+
+        self.assertEqual(
+            asyncio.run(test()), (b'\x4c', b'\x01\x02\x03\x04\x05')
+        )
+        self.assertEqual(self.emulator.registers['RF_CH'], b'\x4c')
+
+    def test_concurrent_commands_keep_their_order(self):
+        async def test():
+            async with AsyncNRF24L01(self.emulator.port) as nrf24l01:
+                return await asyncio.gather(
+                    nrf24l01.w_register('RF_CH', b'\x10'),
+                    nrf24l01.r_register('RF_CH'),
+                    nrf24l01.w_register('RF_CH', b'\x20'),
+                    nrf24l01.r_register('RF_CH'),
+                )
+
+        self.assertEqual(asyncio.run(test())[1::2], [b'\x10', b'\x20'])
+
+    def test_receive_drains_rx_fifo(self):
+        self.emulator.inject(b'abcd', pipe=1)
+        self.emulator.inject(b'efgh', pipe=2)
+
+        async def test():
+            packets = []
+            async with AsyncNRF24L01(self.emulator.port) as nrf24l01:
+                async for packet in nrf24l01.receive(width=4):
+                    packets.append(packet)
+                    if len(packets) == 2:
+                        break
+            return packets
+
+        self.assertEqual(asyncio.run(test()), [(1, b'abcd'), (2, b'efgh')])
+        self.assertEqual(self.emulator.rx_fifo, [])
+
+    def test_timeout(self):
+        emulator = SilentEmulator()
+        emulator.start()
+        self.addCleanup(emulator.stop)
+
+        async def test():
+            async with AsyncNRF24L01(emulator.port) as nrf24l01:
+                nrf24l01.TIMEOUT = 0.1
+                async for packet in nrf24l01.receive(width=4):
+                    pass
+
+        with self.assertRaises(TimeoutError):
+            asyncio.run(test())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Tests of the compression of `--compress`, from the stream that is read, to
+# the packets that are sent, and back.
+#
+# Run with: python -m unittest discover tests
+################################################################################
+import io
+import unittest
+from nrf24l01_cli import iter_packets
+from nrf24l01_compress import CompressedReader, Decompressor
+
+WIDTH = 32
+DATA = b''.join(
+    "{0:05d}: The quick brown fox jumps over the lazy dog.\n".format(
+        line
+    ).encode()
+    for line in range(1000)
+)
+
+
+class CompressTest(unittest.TestCase):
+    def round_trip(self, method: str, dictionary=None) -> bytes:
+        reader = CompressedReader(
+            io.BytesIO(DATA), method, dictionary=dictionary
+        )
+        decompressor = Decompressor(method, dictionary=dictionary)
+        received = b''
+        for packet in iter_packets(reader, WIDTH):
+            self.assertEqual(len(packet), WIDTH)
+            self.assertFalse(decompressor.eof)
+            received += decompressor.feed(bytes(packet))
+        self.assertTrue(decompressor.eof)
+        # The zeros that pad the last packet aren't counted.
+        self.assertEqual(decompressor.compressed_bytes, reader.compressed_bytes)
+        self.assertEqual(decompressor.raw_bytes, len(DATA))
+        self.assertGreater(reader.ratio, 1)
+        return received
+
+    def test_zlib(self):
+        self.assertEqual(self.round_trip('zlib'), DATA)
+
+    def test_zlib_with_dictionary(self):
+        dictionary = b"The quick brown fox jumps over the lazy dog.\n"
+        self.assertEqual(self.round_trip('zlib', dictionary), DATA)
+
+    def test_lzma(self):
+        self.assertEqual(self.round_trip('lzma'), DATA)
+
+    def test_data_after_the_end_is_ignored(self):
+        reader = CompressedReader(io.BytesIO(DATA), 'zlib')
+        compressed = b''.join(iter(reader.read, b''))
+        decompressor = Decompressor('zlib')
+        self.assertEqual(decompressor.feed(compressed + b'\x00' * WIDTH), DATA)
+        self.assertTrue(decompressor.eof)
+        self.assertEqual(decompressor.compressed_bytes, len(compressed))
+        self.assertEqual(decompressor.feed(b'\x00' * WIDTH), b'')
+
+    def test_corrupt_stream(self):
+        with self.assertRaises(ValueError):
+            Decompressor('zlib').feed(b'\xff' * WIDTH)
+
+    def test_dictionary_requires_zlib(self):
+        with self.assertRaises(ValueError):
+            Decompressor('lzma', dictionary=b'abc')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Tests of the plans of the `config` command, run against the emulated
+# interface board.
+#
+# Run with: python -m unittest discover tests
+################################################################################
+import contextlib
+import io
+import unittest
+from nrf24l01_cli import get_args, plan_config
+from nrf24l01_control import nRF24L01
+from nrf24l01_emulator import Emulator
+
+
+class ConfigPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator()
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+
+    def execute(self, plan):
+        # Execute a plan, and return the number of round trips, and what it
+        # printed.
+        exchanges = []
+        output = io.StringIO()
+        with nRF24L01(self.emulator.port) as nrf24l01:
+            nrf24l01.pre_transaction_hooks.append(
+                lambda *args: exchanges.append(args)
+            )
+            with contextlib.redirect_stdout(output):
+                plan.execute(nrf24l01)
+        return len(exchanges), output.getvalue()
+
+    def test_options_of_a_register_are_merged(self):
+        plan = plan_config(
+            get_args(
+                [
+                    'config',
+                    '--rx-dr-irq',
+                    'disable',
+                    '--tx-ds-irq',
+                    'disable',
+                    '--crc',
+                    '2',
+                    '--ard',
+                    '5',
+                    '--arc',
+                    '3',
+                    '--tx-addr',
+                ]
+            )
+        )
+        self.assertEqual(plan.registers_to_read(), ['TX_ADDR', 'CONFIG'])
+        self.assertEqual(plan.registers_to_write(), ['CONFIG', 'SETUP_RETR'])
+        self.assertEqual(plan.transaction_count(), (2, 2, 3))
+        round_trips, output = self.execute(plan)
+        self.assertEqual(round_trips, 3)
+        self.assertEqual(self.emulator.frame_count, 4)
+        self.assertEqual(output, "E7E7E7E7E7\n")
+        # MASK_RX_DR, MASK_TX_DS, EN_CRC, and CRCO.
+        self.assertEqual(self.emulator.registers['CONFIG'], b'\x6c')
+        self.assertEqual(self.emulator.registers['SETUP_RETR'], b'\x53')
+
+    def test_whole_registers_are_not_read(self):
+        plan = plan_config(get_args(['config', '--tx-addr', 'C2C2C2C2C2']))
+        self.assertEqual(plan.transaction_count(), (0, 1, 1))
+        self.assertEqual(self.execute(plan), (1, ''))
+        self.assertEqual(
+            self.emulator.registers['TX_ADDR'], b'\xc2\xc2\xc2\xc2\xc2'
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Tests of batches, and the register cache of nRF24L01 against the emulated
+# interface board.
+#
+# Run with: python -m unittest discover tests
+################################################################################
+import unittest
+from nrf24l01_control import nRF24L01, split_runs
+from nrf24l01_emulator import Emulator
+
+
+class SilentEmulator(Emulator):
+    """An interface board that never answers."""
+
+    def _uart_receive(self, byte: int) -> int:
+        return 0
+
+
+class SplitRunsTest(unittest.TestCase):
+    def test_runs_end_at_long_responses(self):
+        self.assertEqual(
+            split_runs([1, 1, 6, 1, 33, 1]), [(0, 3), (3, 5), (5, 6)]
+        )
+
+    def test_short_responses_are_one_run(self):
+        self.assertEqual(split_runs([0, 2, 1, 2]), [(0, 4)])
+        self.assertEqual(split_runs([]), [])
+
+
+class BatchTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator()
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+
+    def test_batch(self):
+        with nRF24L01(self.emulator.port) as nrf24l01:
+            with nrf24l01.batch() as batch:
+                batch.w_register('RF_CH', b'\x10')
+                batch.w_register('TX_ADDR', b'\x01\x02\x03\x04\x05')
+                rf_ch = batch.r_register('RF_CH')
+                tx_addr = batch.r_register('TX_ADDR')
+                setup_retr = batch.r_register('SETUP_RETR')
+        self.assertEqual(rf_ch.result(), b'\x10')
+        self.assertEqual(tx_addr.result(), b'\x01\x02\x03\x04\x05')
+        self.assertEqual(setup_retr.result(), b'\x03')
+        self.assertEqual(self.emulator.frame_count, 5)
+        # No frame arrived while a long response was being sent.
+        self.assertEqual(self.emulator.overrun_bytes, 0)
+
+    def test_single_byte_reads_are_one_round_trip(self):
+        exchanges = []
+        with nRF24L01(self.emulator.port) as nrf24l01:
+            nrf24l01.pre_transaction_hooks.append(
+                lambda *args: exchanges.append(args)
+            )
+            with nrf24l01.batch() as batch:
+                for register_name in ('CONFIG', 'EN_AA', 'RF_CH', 'RF_SETUP'):
+                    batch.r_register(register_name)
+        self.assertEqual(len(exchanges), 1)
+
+    def test_timeout(self):
+        emulator = SilentEmulator()
+        emulator.start()
+        self.addCleanup(emulator.stop)
+        with nRF24L01(emulator.port) as nrf24l01:
+            nrf24l01.TIMEOUT = 0.1
+            batch = nrf24l01.batch()
+            rf_ch = batch.r_register('RF_CH')
+            with self.assertRaises(TimeoutError):
+                batch.execute()
+        self.assertIsInstance(rf_ch.exception(), TimeoutError)
+
+
+class CacheTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator()
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+        self.nrf24l01 = nRF24L01(self.emulator.port, cache=True)
+        self.nrf24l01.open()
+        self.addCleanup(self.nrf24l01.close)
+
+    def test_reads_are_served_from_the_cache(self):
+        self.assertEqual(self.nrf24l01.r_register('RF_CH'), b'\x02')
+        frame_count = self.emulator.frame_count
+        self.assertEqual(self.nrf24l01.r_register('RF_CH'), b'\x02')
+        self.assertEqual(self.emulator.frame_count, frame_count)
+        self.assertEqual(
+            (self.nrf24l01.cache_hits, self.nrf24l01.cache_misses), (1, 1)
+        )
+
+    def test_volatile_registers_are_read_from_the_device(self):
+        for _ in range(2):
+            self.nrf24l01.r_register('FIFO_STATUS')
+        self.assertEqual(self.emulator.frame_count, 2)
+        self.emulator.inject(b'abcd', pipe=1)
+        self.assertEqual(self.nrf24l01.r_register('FIFO_STATUS'), b'\x10')
+
+    def test_writes_update_the_cache(self):
+        self.nrf24l01.w_register('RF_CH', b'\x20')
+        self.assertEqual(self.nrf24l01.r_register('RF_CH'), b'\x20')
+        self.assertEqual(self.emulator.frame_count, 1)
+
+    def test_set_fields_skips_unchanged_writes(self):
+        self.nrf24l01.set_fields('CONFIG', PWR_UP=1)
+        frame_count = self.emulator.frame_count
+        self.nrf24l01.set_fields('CONFIG', PWR_UP=1)
+        self.assertEqual(self.emulator.frame_count, frame_count)
+
+    def test_invalidate_cache(self):
+        self.nrf24l01.r_register('RF_CH')
+        self.emulator.registers['RF_CH'][:] = b'\x30'
+        self.assertEqual(self.nrf24l01.r_register('RF_CH'), b'\x02')
+        self.nrf24l01.invalidate_cache()
+        self.assertEqual(self.nrf24l01.r_register('RF_CH'), b'\x30')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Tests of the forward error correction of `--fec`.
+#
+# Run with: python -m unittest discover tests
+################################################################################
+import unittest
+from nrf24l01_fec import FecDecoder, fec_encode
+
+GROUP_SIZE = 4
+
+
+def packets(count: int) -> list:
+    return [bytes([index]) * 8 for index in range(count)]
+
+
+def decode(encoded) -> tuple:
+    decoder = FecDecoder(GROUP_SIZE)
+    data = []
+    for packet in encoded:
+        data += decoder.feed(packet)
+    data += decoder.flush()
+    return data, decoder.report()
+
+
+class FecTest(unittest.TestCase):
+    def test_round_trip(self):
+        data, report = decode(fec_encode(packets(10), GROUP_SIZE))
+        self.assertEqual(data, packets(10))
+        # 10 DATA packets, and a PARITY packet for each of the 3 groups.
+        self.assertEqual(report, (13, 0, 0, False))
+
+    def test_one_lost_packet_per_group_is_recovered(self):
+        encoded = list(fec_encode(packets(8), GROUP_SIZE))
+        # The second packet of the first group, and the first of the second.
+        del encoded[6]
+        del encoded[1]
+        data, report = decode(encoded)
+        self.assertEqual(data, packets(8))
+        self.assertEqual((report.recovered, report.lost), (2, 0))
+
+    def test_two_lost_packets_in_a_group_leave_gaps(self):
+        encoded = list(fec_encode(packets(4), GROUP_SIZE))
+        del encoded[1:3]
+        data, report = decode(encoded)
+        self.assertEqual(data, [packets(4)[0], packets(4)[3]])
+        self.assertEqual((report.recovered, report.lost), (0, 2))
+
+    def test_lost_parity_of_a_full_group(self):
+        # A later group shows that the group was full, so its lost last
+        # packet is counted.
+        encoded = list(fec_encode(packets(8), GROUP_SIZE))
+        del encoded[3:5]
+        data, report = decode(encoded)
+        self.assertEqual(data, packets(8)[:3] + packets(8)[4:])
+        self.assertEqual(report.lost, 1)
+        self.assertFalse(report.lost_unknown)
+
+    def test_lost_parity_of_the_last_group(self):
+        # The length of the last group isn't known without its PARITY packet.
+        encoded = list(fec_encode(packets(6), GROUP_SIZE))
+        del encoded[-2:]
+        data, report = decode(encoded)
+        self.assertEqual(data, packets(5))
+        self.assertEqual(report.lost, 0)
+        self.assertTrue(report.lost_unknown)
+
+    def test_lost_groups(self):
+        encoded = list(fec_encode(packets(12), GROUP_SIZE))
+        del encoded[5:10]
+        data, report = decode(encoded)
+        self.assertEqual(data, packets(4) + packets(12)[8:])
+        self.assertEqual(report.lost, GROUP_SIZE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Tests of register profiles against the emulated interface board.
+#
+# Run with: python -m unittest discover tests
+################################################################################
+import io
+import unittest
+from nrf24l01_control import nRF24L01
+from nrf24l01_emulator import Emulator
+from nrf24l01_profile import (
+    PROFILE_REGISTERS,
+    apply_profile,
+    load_profile,
+    read_profile,
+    save_profile,
+)
+
+
+class ProfileTest(unittest.TestCase):
+    def setUp(self):
+        self.emulator = Emulator()
+        self.emulator.start()
+        self.addCleanup(self.emulator.stop)
+        self.nrf24l01 = nRF24L01(self.emulator.port)
+        self.nrf24l01.open()
+        self.addCleanup(self.nrf24l01.close)
+
+    def test_save_and_load(self):
+        profile = read_profile(self.nrf24l01)
+        self.assertEqual(list(profile), PROFILE_REGISTERS)
+        file = io.StringIO()
+        save_profile(profile, file)
+        file.seek(0)
+        self.assertEqual(load_profile(file), profile)
+
+    def test_load_checks_registers(self):
+        for text in (
+            '{"STATUS": "0E"}',
+            '{"RF_CH": "0102"}',
+            '{"RF_CH": "XY"}',
+            '[]',
+        ):
+            with self.assertRaises(ValueError):
+                load_profile(io.StringIO(text))
+
+    def test_only_differences_are_written(self):
+        profile = read_profile(self.nrf24l01)
+        profile['RF_CH'] = b'\x4c'
+        profile['CONFIG'] = b'\x0e'
+        frame_count = self.emulator.frame_count
+        report = apply_profile(self.nrf24l01, profile)
+        self.assertEqual(report, (2, len(PROFILE_REGISTERS) - 2, []))
+        # The profile is read, and each changed register is written, and
+        # read back.
+        self.assertEqual(
+            self.emulator.frame_count - frame_count,
+            len(PROFILE_REGISTERS) + 4,
+        )
+        self.assertEqual(self.emulator.registers['RF_CH'], b'\x4c')
+        self.assertEqual(self.emulator.registers['CONFIG'], b'\x0e')
+        # Applying it again changes nothing.
+        self.assertEqual(
+            apply_profile(self.nrf24l01, profile),
+            (0, len(PROFILE_REGISTERS), []),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
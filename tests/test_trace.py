@@ -0,0 +1,104 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Tests of recording UART transactions to a trace, and replaying it against
+# the emulated interface board.
+#
+# Run with: python -m unittest discover tests
+################################################################################
+import os
+import tempfile
+import unittest
+from nrf24l01_control import nRF24L01
+from nrf24l01_emulator import Emulator
+from nrf24l01_trace import TraceWriter, read_trace, replay
+
+
+class TraceTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'trace')
+
+    def emulator(self) -> Emulator:
+        emulator = Emulator()
+        emulator.start()
+        self.addCleanup(emulator.stop)
+        return emulator
+
+    def record(self, emulator: Emulator) -> None:
+        with TraceWriter(self.path) as trace, nRF24L01(
+            emulator.port
+        ) as nrf24l01:
+            trace.attach(nrf24l01)
+            nrf24l01.w_register('RF_CH', b'\x10')
+            nrf24l01.r_register('RF_CH')
+            with nrf24l01.batch() as batch:
+                batch.w_register('TX_ADDR', b'\x01\x02\x03\x04\x05')
+                batch.r_register('TX_ADDR')
+            self.assertEqual(trace.records, 3)
+
+    def test_record(self):
+        self.record(self.emulator())
+        records = list(read_trace(self.path))
+        # The session record comes first.
+        self.assertEqual(records[0].frame, b'')
+        self.assertEqual(len(records), 4)
+        self.assertEqual(records[2].response_length, 2)
+        self.assertEqual(records[2].response[1:], b'\x10')
+        timestamps = [record.timestamp_ns for record in records]
+        self.assertEqual(timestamps, sorted(timestamps))
+
+    def test_replay(self):
+        self.record(self.emulator())
+        emulator = self.emulator()
+        with nRF24L01(emulator.port) as nrf24l01:
+            report = replay(self.path, nrf24l01, paced=False)
+        self.assertEqual((report.transactions, report.mismatches), (3, 0))
+        self.assertEqual(emulator.registers['RF_CH'], b'\x10')
+        self.assertEqual(emulator.registers['TX_ADDR'], b'\x01\x02\x03\x04\x05')
+
+    def test_replay_reports_mismatches(self):
+        emulator = self.emulator()
+        emulator.registers['RF_CH'][:] = b'\x10'
+        with TraceWriter(self.path) as trace, nRF24L01(
+            emulator.port
+        ) as nrf24l01:
+            trace.attach(nrf24l01)
+            nrf24l01.r_register('RF_CH')
+            nrf24l01.r_register('SETUP_RETR')
+        with nRF24L01(self.emulator().port) as nrf24l01:
+            report = replay(self.path, nrf24l01, paced=False)
+        self.assertEqual((report.transactions, report.mismatches), (2, 1))
+
+    def test_sessions_are_appended(self):
+        self.record(self.emulator())
+        self.record(self.emulator())
+        records = list(read_trace(self.path))
+        self.assertEqual(len(records), 8)
+        self.assertEqual(records[4].frame, b'')
+
+    def test_not_a_trace(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not a trace')
+        with self.assertRaises(ValueError):
+            list(read_trace(self.path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+################################################################################
+#    This program is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    This program is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with this program.  If not, see <https://www.gnu.org/licenses/>.
+#
+#    Copyright (c) 2021, Kalcifer
+#
+#    For more information, see https://github.com/K4LCIFER/nrf24l01-debugger
+################################################################################
+# Tests of `send-file`, and `recv-file`, each run as its own CLI process on
+# one of a pair of linked emulated interface boards, as they would be run on
+# two real boards.
+#
+# Run with: python -m unittest discover tests
+################################################################################
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from nrf24l01_emulator import Emulator
+
+CLI = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'nrf24l01_cli.py',
+)
+# The longest time (s) that either end of a transfer may take.
+TIMEOUT = 60
+
+
+class TransferTest(unittest.TestCase):
+    def transfer(self, loss: float, length: int = 20000):
+        sender = Emulator(loss=loss, seed=1)
+        receiver = Emulator(seed=2)
+        sender.link(receiver)
+        for emulator in (sender, receiver):
+            emulator.start()
+            self.addCleanup(emulator.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        source = os.path.join(directory.name, 'source')
+        destination = os.path.join(directory.name, 'destination')
+        data = os.urandom(length)
+        with open(source, 'wb') as source_file:
+            source_file.write(data)
+        receiving = subprocess.Popen(
+            [
+                sys.executable,
+                CLI,
+                '--port',
+                receiver.port,
+                '--no-daemon',
+                'recv-file',
+                destination,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+        )
+        self.addCleanup(receiving.kill)
+        # Let the receiver get into RX mode first.
+        time.sleep(1)
+        sending = subprocess.run(
+            [
+                sys.executable,
+                CLI,
+                '--port',
+                sender.port,
+                '--no-daemon',
+                'send-file',
+                '--timeout',
+                '3',
+                source,
+            ],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=TIMEOUT,
+        )
+        receiving_output, _ = receiving.communicate(timeout=TIMEOUT)
+        self.assertEqual(sending.returncode, 0, sending.stdout.decode())
+        self.assertEqual(receiving.returncode, 0, receiving_output.decode())
+        with open(destination, 'rb') as destination_file:
+            self.assertEqual(destination_file.read(), data)
+
+    def test_transfer(self):
+        # A lossless link still fills the receiver's RX FIFO faster than it
+        # is drained, which once kept its ACK payloads from being refreshed.
+        self.transfer(loss=0.0)
+
+    def test_transfer_with_loss(self):
+        self.transfer(loss=0.3)
+
+
+if __name__ == '__main__':
+    unittest.main()